@@ -0,0 +1,185 @@
+import queue
+import threading
+
+
+class Subscription:
+    """One client's view of the alert stream: a bounded queue of events matching its filters.
+
+    A subscriber that falls `queue_size` events behind is marked lagged and gets no
+    more events; it should disconnect and resume from its last event id.
+    """
+
+    def __init__(self, locations=None, severities=None, queue_size=256):
+        self.locations = locations
+        self.severities = severities
+        self.lagged = False
+        self._queue = queue.Queue(queue_size)
+
+    def matches(self, alert):
+        if self.locations and (alert.get('location') or '').lower() not in self.locations:
+            return False
+        if self.severities and alert.get('severity') not in self.severities:
+            return False
+        return True
+
+    def offer(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.lagged = True
+
+    def get(self, timeout):
+        """The next (event_id, alert) pair, or None if nothing arrived within `timeout` seconds"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AlertBroker:
+    """In-process fan-out of new and changed community alerts to stream subscribers.
+
+    A single poller thread per process calls `loader(watermark)` every `poll_interval`
+    seconds while anyone is subscribed, so the database sees one small indexed query
+    per interval however many clients are connected. `loader` returns (event_id,
+    alert) pairs ordered by change time, plus the new watermark; it re-reads an
+    overlap window so rows committed late are not missed, and duplicates are
+    dropped here by event id. `publish` pushes alerts written in this process at once.
+    """
+
+    def __init__(self, loader, poll_interval=2.0, max_subscribers=1000, queue_size=256, seen_size=10000):
+        self.loader = loader
+        self.poll_interval = poll_interval
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.seen_size = seen_size
+
+        self._subscribers = set()
+        self._seen = {}  # recently delivered event ids, in delivery order
+        self._watermark = None
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()  # one loader call at a time, so watermarks only move forward
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+        self.polls = 0
+        self.poll_errors = 0
+        self.delivered = 0
+        self.rejected = 0
+        self.lagged = 0
+
+    def subscribe(self, locations=None, severities=None):
+        """Register a subscriber; returns None if `max_subscribers` are already connected.
+
+        If the poller has no watermark yet, it is set here before returning, so anything
+        changed after the caller goes on to read its backlog is published by the next poll.
+        """
+        subscription = Subscription(locations, severities, self.queue_size)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                self.rejected += 1
+                return None
+            self._subscribers.add(subscription)
+        try:
+            self._establish_watermark()
+        except Exception:
+            self.unsubscribe(subscription)
+            raise
+        with self._lock:
+            self._ensure_started()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+            if subscription.lagged:
+                self.lagged += 1
+
+    def publish(self, events):
+        """Deliver (event_id, alert) pairs to every matching subscriber, skipping ones already sent"""
+        with self._lock:
+            fresh = []
+            for event_id, alert in events:
+                if event_id in self._seen:
+                    continue
+                self._seen[event_id] = True
+                fresh.append((event_id, alert))
+            while len(self._seen) > self.seen_size:
+                del self._seen[next(iter(self._seen))]
+            subscribers = list(self._subscribers)
+
+        delivered = 0
+        for event in fresh:
+            for subscription in subscribers:
+                if not subscription.lagged and subscription.matches(event[1]):
+                    subscription.offer(event)
+                    delivered += 1
+        with self._lock:
+            self.delivered += delivered
+
+    def _establish_watermark(self):
+        """Mark where "new" begins if no watermark is set; the rows read doing so are old news"""
+        with self._poll_lock:
+            with self._lock:
+                if self._watermark is not None:
+                    return
+            events, watermark = self.loader(None)
+            with self._lock:
+                self._watermark = watermark
+                for event_id, _ in events:
+                    self._seen[event_id] = True
+
+    def poll(self):
+        """Fetch changes since the watermark and publish them"""
+        with self._poll_lock:
+            with self._lock:
+                previous = self._watermark
+            if previous is None:
+                return
+            events, watermark = self.loader(previous)
+            with self._lock:
+                self._watermark = watermark
+                self.polls += 1
+        self.publish(events)
+
+    def _ensure_started(self):
+        if self._thread is None:
+            # Started lazily so each forked server worker gets its own poller
+            self._thread = threading.Thread(target=self._run, name='alert-broker-poller', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopping:
+            with self._lock:
+                idle = not self._subscribers
+                if idle:
+                    # Nobody listening: forget the watermark, the next subscriber starts from now
+                    self._watermark = None
+            if not idle:
+                try:
+                    self.poll()
+                except Exception:
+                    with self._lock:
+                        self.poll_errors += 1
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def close(self):
+        self._stopping = True
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 1)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'subscribers': len(self._subscribers),
+                'max_subscribers': self.max_subscribers,
+                'poll_interval': self.poll_interval,
+                'polls': self.polls,
+                'poll_errors': self.poll_errors,
+                'delivered': self.delivered,
+                'rejected': self.rejected,
+                'lagged': self.lagged
+            }
@@ -1,17 +1,90 @@
-from flask import Flask, request, jsonify, session
+from flask import Flask, request, jsonify, send_from_directory, session
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager, jwt_required, create_access_token, get_jwt_identity
-import mysql.connector
-from mysql.connector import Error
-import bcrypt
-from datetime import datetime, timedelta
+from flask_jwt_extended import (
+    JWTManager, jwt_required, create_access_token, get_jwt, get_jwt_identity, get_jwt_request_location
+)
+from mysql.connector import DataError, Error, IntegrityError
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
 import os
+from werkzeug.http import parse_content_range_header
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.utils import secure_filename
 import uuid
 import json
+import hashlib
+import hmac
 import random
+import base64
+import binascii
+import click
+import csv
+import io
+import atexit
+import functools
+import math
+import importlib.util
+import time
+
+from db_pool import ConnectionPool
+from cache import FeedCache, MemoryCacheBackend, PredictionCache, RedisCacheBackend, make_cached_body
+from like_buffer import LikeBuffer
+from prediction_writer import PredictionWriter
+from password_hasher import HasherBusy, PasswordHasher
+from migrate import apply_migrations, find_full_scans
+from outbreaks import (
+    BACKFILL_PREDICTIONS_SQL, BASELINE_SQL, BUCKET_ALERT_SQL, BUCKET_CASES_SQL, NEW_PREDICTIONS_SQL,
+    WATERMARK_NAME as OUTBREAK_WATERMARK, aggregate_outbreaks, backfill_outbreak_cases
+)
+from symptom_engine import SymptomMatcher, age_band, tokenize
+from alert_broker import AlertBroker
+from async_db import AsyncReadPool, AsyncReadUnavailable
+from compression import COMPRESSIBLE_MIMETYPES, ResponseCompressor
+from json_codec import JSONCodec, default as json_default, row_mapper
+from media_store import DigestMismatch, MediaStore, OffsetMismatch, ThumbnailPool, UploadBusy, thumbnail_name
+from rate_limit import Limit, MemoryRateLimitBackend, RateLimiter, RedisRateLimitBackend, RouteLimits
+from metrics import PHASES, QUERY_COUNT_BUCKETS, InstrumentedConnection, MetricsRegistry, end_trace, phase, record_query_batch, start_trace
+
+# JSON encoder for responses and cached bodies: 'auto' uses orjson when it is installed
+JSON_CONFIG = {
+    'encoder': os.environ.get('JSON_ENCODER', 'auto')  # auto, orjson or json
+}
+
+json_codec = JSONCodec(JSON_CONFIG['encoder'])
+
+def dump_json(payload):
+    """Compact JSON bytes on the configured encoder, counted in the request's 'serialize' phase"""
+    with phase('serialize'):
+        return json_codec.dumps(payload)
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider on the configured encoder, with serialization counted in the 'serialize' phase.
+
+    Dates are written in ISO 8601, as the cached bodies are, rather than Flask's HTTP date format.
+    """
+    
+    default = staticmethod(json_default)
+    
+    def dumps(self, obj, **kwargs):
+        with phase('serialize'):
+            if kwargs:
+                return super().dumps(obj, **kwargs)
+            return json_codec.dumps(obj, sort_keys=self.sort_keys).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return json_codec.loads(s) if not kwargs else super().loads(s, **kwargs)
+    
+    def response(self, *args, **kwargs):
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)  # indented for reading
+        obj = self._prepare_response_obj(args, kwargs)
+        with phase('serialize'):
+            body = json_codec.dumps(obj, sort_keys=self.sort_keys)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
 
 app = Flask(__name__)
+app.json = TimedJSONProvider(app)
 app.config['JWT_SECRET_KEY'] = 'my-very-secret-dev-key-123!@#'
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(days=7)
 app.config['UPLOAD_FOLDER'] = 'uploads'
@@ -21,140 +94,626 @@ CORS(app)
 
 # Database configuration
 DB_CONFIG = {
-    'host': 'localhost',
-    'database': 'symptrack_ai',
-    'user': 'root',
-    'password': 'saha@19982005'  # Change this to your MySQL password
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'database': os.environ.get('DB_NAME', 'symptrack_ai'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', 'saha@19982005')  # Change this to your MySQL password
+}
+
+# Connection pool configuration
+DB_POOL_CONFIG = {
+    'size': int(os.environ.get('DB_POOL_SIZE', 10)),
+    'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 5)),
+    'health_check_interval': float(os.environ.get('DB_POOL_HEALTH_CHECK_INTERVAL', 30))
+}
+
+db_pool = ConnectionPool(DB_CONFIG, **DB_POOL_CONFIG)
+
+# Request threads per server worker, as in gunicorn.conf.py
+WEB_THREADS = int(os.environ.get('WEB_THREADS', 4))
+
+# Async read path for the hot read routes (alerts, vlogs, dashboard, health stats): their
+# queries run concurrently on an asyncio pool instead of one by one on a pooled connection.
+# It is opened in every worker alongside db_pool, so each worker may hold DB_POOL_SIZE +
+# ASYNC_DB_POOL_SIZE connections; by default one async connection per request thread.
+ASYNC_DB_CONFIG = {
+    'enabled': os.environ.get('ASYNC_DB') == '1',  # needs the aiomysql package
+    'size': int(os.environ.get('ASYNC_DB_POOL_SIZE', WEB_THREADS)),
+    'timeout': float(os.environ.get('ASYNC_DB_POOL_TIMEOUT', DB_POOL_CONFIG['timeout'])),
+    'query_timeout': float(os.environ.get('ASYNC_DB_QUERY_TIMEOUT', 10)),
+    'retry_interval': float(os.environ.get('ASYNC_DB_RETRY_INTERVAL', 5))  # after a failed pool start
+}
+
+async_read_pool = None
+if ASYNC_DB_CONFIG['enabled'] and importlib.util.find_spec('aiomysql') is None:
+    print("ASYNC_DB=1 needs the aiomysql package; reads run on the connection pool instead")
+elif ASYNC_DB_CONFIG['enabled']:
+    async_read_pool = AsyncReadPool(DB_CONFIG, size=ASYNC_DB_CONFIG['size'], timeout=ASYNC_DB_CONFIG['timeout'],
+                                    query_timeout=ASYNC_DB_CONFIG['query_timeout'],
+                                    retry_interval=ASYNC_DB_CONFIG['retry_interval'])
+
+# Shared cache for the global feeds (/api/alerts, /api/vlogs)
+FEED_CACHE_CONFIG = {
+    'backend': os.environ.get('FEED_CACHE_BACKEND', 'memory'),
+    'ttl': float(os.environ.get('FEED_CACHE_TTL', 30)),
+    'max_entries': int(os.environ.get('FEED_CACHE_MAX_ENTRIES', 1024)),
+    'redis_url': os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+}
+
+if FEED_CACHE_CONFIG['backend'] == 'redis':
+    feed_cache_backend = RedisCacheBackend(FEED_CACHE_CONFIG['redis_url'])
+else:
+    feed_cache_backend = MemoryCacheBackend(FEED_CACHE_CONFIG['max_entries'])
+
+feed_cache = FeedCache(feed_cache_backend, ttl=FEED_CACHE_CONFIG['ttl'], dumps=dump_json)
+
+# Per-user cache for /api/auth/me and profile reads, invalidated when the profile is updated.
+# With the memory backend each server worker invalidates only its own copy, so other
+# workers could serve a stale profile until it expires; entries there live at most
+# `local_ttl` seconds. The redis backend is shared, so its invalidation reaches every worker.
+PROFILE_CACHE_CONFIG = {
+    'ttl': float(os.environ.get('PROFILE_CACHE_TTL', 60)),
+    'local_ttl': float(os.environ.get('PROFILE_CACHE_LOCAL_TTL', 5)),
+    'max_entries': int(os.environ.get('PROFILE_CACHE_MAX_ENTRIES', 10000))
 }
 
+if FEED_CACHE_CONFIG['backend'] == 'redis':
+    profile_cache_backend = feed_cache_backend
+else:
+    profile_cache_backend = MemoryCacheBackend(PROFILE_CACHE_CONFIG['max_entries'])
+    PROFILE_CACHE_CONFIG['ttl'] = min(PROFILE_CACHE_CONFIG['ttl'], PROFILE_CACHE_CONFIG['local_ttl'])
+
+profile_cache = FeedCache(profile_cache_backend, ttl=PROFILE_CACHE_CONFIG['ttl'], dumps=dump_json)
+
+# Write-behind buffer for vlog likes
+LIKE_BUFFER_CONFIG = {
+    'flush_interval': float(os.environ.get('LIKE_FLUSH_INTERVAL', 2)),
+    'flush_threshold': int(os.environ.get('LIKE_FLUSH_THRESHOLD', 500))
+}
+
+# Password hashing pool; each server worker starts its own, so BCRYPT_WORKERS is per worker
+PASSWORD_HASHER_CONFIG = {
+    'rounds': int(os.environ.get('BCRYPT_ROUNDS', 12)),
+    'workers': int(os.environ.get('BCRYPT_WORKERS', min(4, os.cpu_count() or 1))),
+    'max_queue': int(os.environ.get('BCRYPT_MAX_QUEUE', 16))
+}
+
+password_hasher = PasswordHasher(**PASSWORD_HASHER_CONFIG)
+
 # Create uploads directory if it doesn't exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
-def get_db_connection():
-    """Create database connection"""
+@contextmanager
+def db_connection():
+    """Check out a pooled database connection, yielding None if none is available"""
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        return connection
+        with phase('connect'):
+            connection = db_pool.acquire()
     except Error as e:
         print(f"Error connecting to MySQL: {e}")
-        return None
+        yield None
+        return
+    try:
+        yield InstrumentedConnection(connection)
+    finally:
+        db_pool.release(connection)
+
+# Every query the API routes run, for the check-query-plans command. Each entry is registered
+# next to the query it covers as (label, build), build() returning (sql, params) from the
+# route's own query builder with representative parameters.
+ROUTE_QUERIES = []
+
+def route_query(label, build):
+    ROUTE_QUERIES.append((label, build))
+
+def run_read_queries(queries):
+    """Rows of each (sql, params) in `queries`, or None if the database is unavailable.
+
+    With the async read path enabled the queries run concurrently; otherwise, or if
+    the async pool is unavailable, fails or times out, one after another on a pooled connection.
+    """
+    if async_read_pool:
+        started = time.perf_counter()
+        try:
+            results = async_read_pool.fetch(queries)
+        except AsyncReadUnavailable as e:
+            print(f"{e}; reading from the connection pool instead")
+        else:
+            record_query_batch([(sql, seconds) for (sql, _), (_, seconds) in zip(queries, results)],
+                               time.perf_counter() - started)
+            return [rows for rows, _ in results]
+    
+    with db_connection() as connection:
+        if not connection:
+            return None
+        cursor = connection.cursor()
+        results = []
+        for sql, params in queries:
+            cursor.execute(sql, params)
+            results.append(cursor.fetchall())
+        cursor.close()
+    return results
+
+# Response compression, for bodies of at least min_size bytes; 0 disables it
+COMPRESSION_CONFIG = {
+    'min_size': int(os.environ.get('COMPRESS_MIN_SIZE', 1024)),
+    'gzip_level': int(os.environ.get('COMPRESS_GZIP_LEVEL', 6)),
+    'brotli_quality': int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4)),  # used when the brotli package is installed
+    'memo_entries': int(os.environ.get('COMPRESS_MEMO_ENTRIES', 256))
+}
+
+response_compressor = ResponseCompressor(**COMPRESSION_CONFIG)
+
+def cached_json_response(cached):
+    """Serve a cached JSON body with its ETag, answering 304 when the client already has it"""
+    response = app.response_class(cached.body, status=200, mimetype='application/json')
+    response.set_etag(cached.etag)
+    return response.make_conditional(request)
+
+# Request metrics, served in the Prometheus text format at /metrics
+METRICS_CONFIG = {
+    'slow_request_ms': float(os.environ.get('SLOW_REQUEST_MS', 0)),  # 0 disables the slow-request log
+    'token': os.environ.get('METRICS_TOKEN')  # if set, /metrics requires it as a bearer token
+}
+
+request_metrics = MetricsRegistry()
+request_metrics.counter('symptrack_http_requests_total', 'Requests handled, by route and status.')
+request_metrics.histogram('symptrack_http_request_duration_seconds', 'Request latency by route.')
+request_metrics.histogram('symptrack_request_phase_seconds',
+                          'Time per request spent connecting, querying, hashing passwords, serializing JSON '
+                          'and compressing responses.')
+request_metrics.histogram('symptrack_db_queries_per_request', 'Database queries issued per request.',
+                          buckets=QUERY_COUNT_BUCKETS)
+request_metrics.counter('symptrack_db_queries_total', 'Database queries issued while handling requests.')
+
+@app.before_request
+def start_request_trace():
+    start_trace(keep_statements=METRICS_CONFIG['slow_request_ms'] > 0)
+
+@app.after_request
+def record_request_status(response):
+    trace = end_trace()
+    if trace:
+        finish_request_trace(trace, response.status_code)
+    return response
+
+@app.teardown_request
+def finish_failed_request(error=None):
+    # after_request is skipped when a handler raises
+    trace = end_trace()
+    if trace:
+        finish_request_trace(trace, 500)
+
+@app.after_request
+def compress_response(response):
+    """Brotli/gzip-encode large buffered responses for clients that accept it.
+
+    Registered after record_request_status, so it runs first and its time is
+    part of the request's latency. Streamed responses are left alone.
+    """
+    if (not response_compressor.min_size or response.status_code != 200 or response.is_streamed
+            or response.direct_passthrough or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    if response.content_length is None or response.content_length < response_compressor.min_size:
+        return response
+    encoding = response_compressor.choose_encoding(request.accept_encodings)
+    if not encoding:
+        return response
+    
+    etag, weak = response.get_etag()
+    with phase('compress'):
+        body = response_compressor.compress(response.get_data(), encoding, None if weak else etag)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    if etag:
+        # The encoded bytes differ from the identity body; a weak tag still validates If-None-Match
+        response.set_etag(etag, weak=True)
+    return response
+
+def finish_request_trace(trace, status):
+    """Record a finished request's latency, phase breakdown and query count; log it if slow.
+
+    Streamed responses are measured up to the first chunk.
+    """
+    elapsed = time.perf_counter() - trace.started
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    labels = (('method', request.method), ('route', route))
+
+    request_metrics.inc('symptrack_http_requests_total', labels + (('status', str(status)),))
+    request_metrics.observe('symptrack_http_request_duration_seconds', elapsed, labels)
+    for name in PHASES:
+        if trace.phases[name]:
+            request_metrics.observe('symptrack_request_phase_seconds', trace.phases[name], labels + (('phase', name),))
+    request_metrics.observe('symptrack_db_queries_per_request', trace.queries, labels)
+    if trace.queries:
+        request_metrics.inc('symptrack_db_queries_total', amount=trace.queries)
+
+    slow_request_ms = METRICS_CONFIG['slow_request_ms']
+    if slow_request_ms and elapsed * 1000 >= slow_request_ms:
+        breakdown = ', '.join(f'{name} {trace.phases[name] * 1000:.1f}ms' for name in PHASES)
+        print(f"Slow request: {request.method} {route} -> {status} in {elapsed * 1000:.1f}ms "
+              f"({breakdown}; {trace.queries} queries)")
+        for statement, seconds in trace.statements:
+            print(f"    {seconds * 1000:8.1f}ms  {statement}")
 
 def init_database():
     """Initialize database tables"""
-    connection = get_db_connection()
-    if not connection:
-        return
+    with db_connection() as connection:
+        if not connection:
+            return
     
-    cursor = connection.cursor()
+        cursor = connection.cursor()
     
-    # Users table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            name VARCHAR(255) NOT NULL,
-            email VARCHAR(255) UNIQUE NOT NULL,
-            password_hash VARCHAR(255) NOT NULL,
-            phone VARCHAR(20),
-            age INT,
-            gender ENUM('male', 'female', 'other'),
-            medical_history TEXT,
-            lifestyle TEXT,
-            emergency_contact VARCHAR(255),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-        )
-    ''')
+        # Users table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                email VARCHAR(255) UNIQUE NOT NULL,
+                password_hash VARCHAR(255) NOT NULL,
+                phone VARCHAR(20),
+                age INT,
+                gender ENUM('male', 'female', 'other'),
+                medical_history TEXT,
+                lifestyle TEXT,
+                emergency_contact VARCHAR(255),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            )
+        ''')
     
-    # Predictions table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS predictions (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            user_id INT,
-            symptoms TEXT NOT NULL,
-            additional_data JSON,
-            prediction_result JSON,
-            risk_score INT,
-            risk_level ENUM('low', 'medium', 'high', 'critical'),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-        )
-    ''')
+        # Predictions table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS predictions (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                user_id INT,
+                symptoms TEXT NOT NULL,
+                additional_data JSON,
+                prediction_result JSON,
+                risk_score INT,
+                risk_level ENUM('low', 'medium', 'high', 'critical'),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            )
+        ''')
     
-    # Vlogs table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS vlogs (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            user_id INT,
-            title VARCHAR(255) NOT NULL,
-            description TEXT,
-            disease VARCHAR(100),
-            video_url VARCHAR(500),
-            thumbnail VARCHAR(500),
-            medicines TEXT,
-            hospitals TEXT,
-            likes INT DEFAULT 0,
-            comments INT DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-        )
-    ''')
+        # Vlogs table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS vlogs (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                user_id INT,
+                title VARCHAR(255) NOT NULL,
+                description TEXT,
+                disease VARCHAR(100),
+                video_url VARCHAR(500),
+                thumbnail VARCHAR(500),
+                medicines TEXT,
+                hospitals TEXT,
+                likes INT DEFAULT 0,
+                comments INT DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            )
+        ''')
+    
+        # Community alerts table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS community_alerts (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                type ENUM('Disease Outbreak', 'Environmental', 'Hospital Updates', 'Public Health', 'Emergency'),
+                title VARCHAR(255) NOT NULL,
+                description TEXT,
+                severity ENUM('Low', 'Medium', 'High', 'Critical'),
+                location VARCHAR(255),
+                affected_count INT,
+                source VARCHAR(255),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+    
+        # Per-user stats rollup, kept in step with predictions writes and, by triggers, vlogs rows
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS user_stats (
+                user_id INT PRIMARY KEY,
+                prediction_count INT NOT NULL DEFAULT 0,
+                risk_score_sum BIGINT NOT NULL DEFAULT 0,
+                vlog_count INT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            )
+        ''')
+    
+        connection.commit()
+    
+        # Indexes and later schema changes
+        apply_migrations(connection)
     
-    # Community alerts table
+        # Backfill the rollups the first time they are created on an existing database
+        cursor.execute('SELECT EXISTS(SELECT 1 FROM user_stats)')
+        if not cursor.fetchone()[0]:
+            rebuild_user_stats(connection)
+        cursor.execute('SELECT EXISTS(SELECT 1 FROM user_risk_series), EXISTS(SELECT 1 FROM predictions)')
+        series_exists, predictions_exist = cursor.fetchone()
+        if predictions_exist and not series_exists:
+            rebuild_risk_series(connection)
+    
+        cursor.close()
+    print("Database initialized successfully")
+
+def record_user_stats(cursor, user_id, predictions=0, risk_score_sum=0, vlogs=0):
+    """Add deltas to a user's stats rollup; call inside the transaction that writes the rows"""
     cursor.execute('''
-        CREATE TABLE IF NOT EXISTS community_alerts (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            type ENUM('Disease Outbreak', 'Environmental', 'Hospital Updates', 'Public Health', 'Emergency'),
-            title VARCHAR(255) NOT NULL,
-            description TEXT,
-            severity ENUM('Low', 'Medium', 'High', 'Critical'),
-            location VARCHAR(255),
-            affected_count INT,
-            source VARCHAR(255),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
+        INSERT INTO user_stats (user_id, prediction_count, risk_score_sum, vlog_count)
+        VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            prediction_count = prediction_count + VALUES(prediction_count),
+            risk_score_sum = risk_score_sum + VALUES(risk_score_sum),
+            vlog_count = vlog_count + VALUES(vlog_count)
+    ''', (user_id, predictions, risk_score_sum, vlogs))
+
+def rebuild_user_stats(connection):
+    """Recompute every user's stats rollup from the predictions and vlogs tables"""
+    cursor = connection.cursor()
+    cursor.execute('DELETE FROM user_stats')
+    cursor.execute('''
+        INSERT INTO user_stats (user_id, prediction_count, risk_score_sum, vlog_count)
+        SELECT u.id, COALESCE(p.prediction_count, 0), COALESCE(p.risk_score_sum, 0), COALESCE(v.vlog_count, 0)
+        FROM users u
+        LEFT JOIN (
+            SELECT user_id, COUNT(*) AS prediction_count, SUM(risk_score) AS risk_score_sum
+            FROM predictions GROUP BY user_id
+        ) p ON p.user_id = u.id
+        LEFT JOIN (
+            SELECT user_id, COUNT(*) AS vlog_count
+            FROM vlogs GROUP BY user_id
+        ) v ON v.user_id = u.id
     ''')
-    
+    rebuilt = cursor.rowcount
     connection.commit()
     cursor.close()
-    connection.close()
-    print("Database initialized successfully")
+    return rebuilt
+
+# Week buckets start on Monday
+RISK_SERIES_BUCKETS = {
+    'day': 'DATE({column})',
+    'week': 'DATE_SUB(DATE({column}), INTERVAL WEEKDAY({column}) DAY)'
+}
+
+def risk_series_bucket_starts(day):
+    """{granularity: bucket_start} of the buckets `day` falls in, matching RISK_SERIES_BUCKETS"""
+    return {'day': day, 'week': day - timedelta(days=day.weekday())}
+
+def record_risk_series(cursor, rows, today=None):
+    """Fold prediction_row() tuples into today's day and week buckets; call inside the writing transaction.
+
+    Today is the app's date.today(), which health_trend_range reads buckets by;
+    the database's CURDATE() may be another day if it runs in another time zone.
+    """
+    bucket_starts = risk_series_bucket_starts(today or date.today())
+    totals = {}
+    for row in rows:
+        count, risk_score_sum, risk_score_max, high_risk = totals.get(row[0], (0, 0, 0, 0))
+        totals[row[0]] = (
+            count + 1, risk_score_sum + row[4], max(risk_score_max, row[4]), high_risk + (row[5] == 'high')
+        )
+    for granularity, bucket_start in bucket_starts.items():
+        cursor.executemany('''
+            INSERT INTO user_risk_series
+                (user_id, granularity, bucket_start, prediction_count, risk_score_sum, risk_score_max, high_risk_count)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                prediction_count = prediction_count + VALUES(prediction_count),
+                risk_score_sum = risk_score_sum + VALUES(risk_score_sum),
+                risk_score_max = GREATEST(risk_score_max, VALUES(risk_score_max)),
+                high_risk_count = high_risk_count + VALUES(high_risk_count)
+        ''', [(user_id, granularity, bucket_start, *total) for user_id, total in totals.items()])
+
+def app_utc_offset():
+    """The app's current UTC offset as a MySQL time zone, e.g. '+05:30'"""
+    minutes = int(datetime.now().astimezone().utcoffset().total_seconds() // 60)
+    sign = '-' if minutes < 0 else '+'
+    return f'{sign}{abs(minutes) // 60:02d}:{abs(minutes) % 60:02d}'
+
+def rebuild_risk_series(connection):
+    """Recompute every user's risk time series from the predictions table.
+
+    Buckets are the app's dates, as in record_risk_series: the session time zone is
+    set to the app's UTC offset while rebuilding, so DATE(created_at) is the app's
+    date whatever the server's time zone. The offset is today's, so rows from the
+    other side of a DST change are bucketed an hour off.
+    """
+    cursor = connection.cursor()
+    cursor.execute('SELECT @@session.time_zone')
+    session_time_zone = cursor.fetchone()[0]
+    cursor.execute('SET time_zone = %s', (app_utc_offset(),))
+    try:
+        cursor.execute('DELETE FROM user_risk_series')
+        rebuilt = 0
+        for granularity, bucket in RISK_SERIES_BUCKETS.items():
+            cursor.execute(f'''
+                INSERT INTO user_risk_series
+                    (user_id, granularity, bucket_start, prediction_count, risk_score_sum, risk_score_max, high_risk_count)
+                SELECT user_id, '{granularity}', {bucket.format(column='created_at')} AS bucket,
+                       COUNT(*), COALESCE(SUM(risk_score), 0), COALESCE(MAX(risk_score), 0), SUM(risk_level = 'high')
+                FROM predictions
+                WHERE user_id IS NOT NULL AND created_at IS NOT NULL
+                GROUP BY user_id, bucket
+            ''')
+            rebuilt += cursor.rowcount
+        connection.commit()
+    finally:
+        cursor.execute('SET time_zone = %s', (session_time_zone,))
+        cursor.close()
+    return rebuilt
+
+@app.cli.command('rebuild-user-stats')
+def rebuild_user_stats_command():
+    """Recompute the user_stats rollup and risk time series from scratch"""
+    with db_connection() as connection:
+        if not connection:
+            print("Database connection failed")
+            return
+        rebuilt = rebuild_user_stats(connection)
+        buckets = rebuild_risk_series(connection)
+    print(f"Rebuilt stats for {rebuilt} users and {buckets} risk series buckets")
+
+RECENT_ALERTS_COUNT_SQL = 'SELECT COUNT(*) FROM community_alerts WHERE created_at >= DATE_SUB(NOW(), INTERVAL 7 DAY)'
+
+def user_stats_query(user_id, with_alerts_count=False):
+    """(sql, params) of one query for the user's stats; read its row with user_stats_from_row.
+
+    The user's figures come from a user_stats primary-key lookup; alerts_count
+    (community alerts from the last 7 days) is only computed when asked for.
+    """
+    alerts_count_column = f'({RECENT_ALERTS_COUNT_SQL})' if with_alerts_count else '0'
+    return f'''
+        SELECT s.prediction_count, s.risk_score_sum, s.vlog_count,
+               {alerts_count_column} AS alerts_count
+        FROM (SELECT %s AS user_id) AS u
+        LEFT JOIN user_stats s ON s.user_id = u.user_id
+    ''', (user_id,)
+
+route_query('user.stats', lambda: user_stats_query(1))
+route_query('dashboard.stats', lambda: user_stats_query(1, with_alerts_count=True))
+
+def user_stats_from_row(row):
+    """Return (prediction_count, avg_risk_score, vlog_count, alerts_count)"""
+    prediction_count, risk_score_sum, vlog_count, alerts_count = row
+    prediction_count = prediction_count or 0
+    avg_risk_score = risk_score_sum // prediction_count if prediction_count else 0
+    return prediction_count, avg_risk_score, vlog_count or 0, alerts_count or 0
+
+# Symptom rule table, compiled once at startup into a single keyword index
+SYMPTOM_KEYWORDS = {
+    'fever': ['fever', 'temperature', 'hot'],
+    'respiratory': ['cough', 'throat', 'sore'],
+    'systemic': ['headache', 'body ache', 'tired'],
+    'headache': ['headache', 'head pain', 'migraine'],
+    'migraine_signs': ['nausea', 'light sensitivity'],
+    'cardiac': ['chest pain', 'heart', 'breathing'],
+    'digestive': ['stomach', 'nausea', 'vomiting', 'diarrhea']
+}
+
+SYMPTOM_RULES = [
+    {'name': 'Common Cold/Flu', 'probability': 75, 'risk_level': 'low',
+     'requires': ['fever', 'respiratory'], 'risk_score': 30},
+    {'name': 'Viral Infection', 'probability': 65, 'risk_level': 'medium',
+     'requires': ['fever', 'systemic'], 'excludes': ['respiratory'], 'risk_score': 45},
+    {'name': 'Tension Headache', 'probability': 60, 'risk_level': 'low',
+     'requires': ['headache'], 'risk_score': None},
+    {'name': 'Migraine', 'probability': 70, 'risk_level': 'medium',
+     'requires': ['headache', 'migraine_signs'], 'risk_score': 40},
+    {'name': 'Possible Cardiac Issue', 'probability': 50, 'risk_level': 'high',
+     'requires': ['cardiac'], 'risk_score': 75},
+    {'name': 'Gastroenteritis', 'probability': 65, 'risk_level': 'medium',
+     'requires': ['digestive'], 'risk_score': 35}
+]
+
+symptom_matcher = SymptomMatcher(SYMPTOM_KEYWORDS, SYMPTOM_RULES)
+
+# Optional trained model; predictions fall back to the rule table when none is configured
+PREDICTION_MODEL_PATH = os.environ.get('PREDICTION_MODEL_PATH')
+
+symptom_model = None
+if PREDICTION_MODEL_PATH:
+    from symptom_model import SymptomModel  # needs numpy and scipy
+    symptom_model = SymptomModel.load(PREDICTION_MODEL_PATH)
+    print(f"Loaded symptom model {symptom_model.version} in {symptom_model.load_seconds * 1000:.1f}ms")
+
+def score_symptoms(items):
+    """(conditions, risk_score or None) for each input dict, using the model if one is loaded.
+
+    Each item has the predict_disease arguments as keys. With a model the whole list
+    is scored in one matrix multiply.
+    """
+    if symptom_model is not None:
+        return symptom_model.predict(items)
+    return [symptom_matcher.evaluate(item['symptoms']) for item in items]
+
+def prediction_engine_fingerprint():
+    return f'model:{symptom_model.version}' if symptom_model is not None else f'rules:{symptom_matcher.fingerprint}'
+
+prediction_cache = PredictionCache(
+    prediction_engine_fingerprint, max_entries=int(os.environ.get('PREDICTION_CACHE_SIZE', 10000))
+)
+
+def canonical_prediction_input(item):
+    """Prediction input as it is scored plus its memo key; raises ValueError for a bad age.
+
+    The symptoms are scored exactly as written; the key only drops what the engine
+    ignores, so inputs that share a key are guaranteed to share a result. For the
+    rule table that is the set of keyword groups found and the age band ("fever and
+    cough", "Coughing, fever"); the model reads word order, so its key keeps the
+    token stream.
+    """
+    canonical = {
+        'symptoms': item['symptoms'],
+        'age': item.get('age'),
+        'gender': str(item.get('gender') or '').lower() or None,
+        'lifestyle': None,
+        'medical_history': None
+    }
+    band = age_band(canonical['age'])
+    if symptom_model is None:
+        return canonical, (tuple(sorted(symptom_matcher.match_groups(canonical['symptoms']))), band)
+    
+    # Only the model reads gender and the free-text profile fields
+    canonical['lifestyle'] = item.get('lifestyle') or ''
+    canonical['medical_history'] = item.get('medical_history') or ''
+    key = (band, canonical['gender']) + tuple(
+        ' '.join(tokenize(canonical[field])) for field in ('symptoms', 'lifestyle', 'medical_history')
+    )
+    return canonical, key
+
+def predict_many(items):
+    """Predictions for a list of input dicts, in order; an item that fails gets its exception.
+
+    Memoized results are reused and all the misses are scored together.
+    """
+    results = [None] * len(items)
+    misses = []
+    for index, item in enumerate(items):
+        try:
+            canonical, key = canonical_prediction_input(item)
+        except (TypeError, ValueError) as e:
+            results[index] = e
+            continue
+        
+        cached = prediction_cache.get(key)
+        if cached is not None:
+            results[index] = cached
+        else:
+            misses.append((index, canonical, key))
+    
+    if misses:
+        scores = score_symptoms([canonical for _, canonical, _ in misses])
+        for (index, canonical, key), (conditions, condition_risk_score) in zip(misses, scores):
+            results[index] = build_prediction(conditions, condition_risk_score, age_band(canonical['age']))
+            prediction_cache.set(key, results[index])
+    return results
 
-# Simple ML prediction function (placeholder)
 def predict_disease(symptoms, age=None, gender=None, lifestyle=None, medical_history=None):
-    """Simple rule-based disease prediction"""
-    symptoms_lower = symptoms.lower()
-    conditions = []
-    risk_score = 20  # Base low risk
-    
-    # Common conditions based on symptoms
-    if any(word in symptoms_lower for word in ['fever', 'temperature', 'hot']):
-        if any(word in symptoms_lower for word in ['cough', 'throat', 'sore']):
-            conditions.append({'name': 'Common Cold/Flu', 'probability': 75, 'risk_level': 'low'})
-            risk_score = 30
-        elif any(word in symptoms_lower for word in ['headache', 'body ache', 'tired']):
-            conditions.append({'name': 'Viral Infection', 'probability': 65, 'risk_level': 'medium'})
-            risk_score = 45
-    
-    if any(word in symptoms_lower for word in ['headache', 'head pain', 'migraine']):
-        conditions.append({'name': 'Tension Headache', 'probability': 60, 'risk_level': 'low'})
-        if any(word in symptoms_lower for word in ['nausea', 'light sensitivity']):
-            conditions.append({'name': 'Migraine', 'probability': 70, 'risk_level': 'medium'})
-            risk_score = 40
-    
-    if any(word in symptoms_lower for word in ['chest pain', 'heart', 'breathing']):
-        conditions.append({'name': 'Possible Cardiac Issue', 'probability': 50, 'risk_level': 'high'})
-        risk_score = 75
-    
-    if any(word in symptoms_lower for word in ['stomach', 'nausea', 'vomiting', 'diarrhea']):
-        conditions.append({'name': 'Gastroenteritis', 'probability': 65, 'risk_level': 'medium'})
-        risk_score = 35
+    """Disease prediction from the trained model, or the rule table if no model is loaded"""
+    result = predict_many([{
+        'symptoms': symptoms, 'age': age, 'gender': gender,
+        'lifestyle': lifestyle, 'medical_history': medical_history
+    }])[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+def build_prediction(conditions, condition_risk_score, band=None):
+    """Turn scored conditions and the patient's age band into the prediction response"""
+    risk_score = condition_risk_score if condition_risk_score is not None else 20  # Base low risk
     
     # Adjust risk based on age
-    if age:
-        if int(age) > 60:
-            risk_score += 10
-        elif int(age) < 18:
-            risk_score += 5
+    if band == 'over60':
+        risk_score += 10
+    elif band == 'under18':
+        risk_score += 5
     
     # Default recommendations
     recommendations = [
@@ -175,7 +734,201 @@ def predict_disease(symptoms, age=None, gender=None, lifestyle=None, medical_his
     }
 
 # Authentication routes
+USER_EXISTS_SQL = 'SELECT id FROM users WHERE email = %s'
+LOGIN_SQL = 'SELECT id, name, email, password_hash FROM users WHERE email = %s'
+
+route_query('auth.register', lambda: (USER_EXISTS_SQL, ('user@example.com',)))
+route_query('auth.login', lambda: (LOGIN_SQL, ('user@example.com',)))
+
+# Rate limiting and admission control for the expensive routes: token buckets per JWT
+# identity and per client IP, and a cap on each route class's requests in flight
+RATE_LIMIT_CONFIG = {
+    'enabled': os.environ.get('RATE_LIMIT_ENABLED', '1') == '1',
+    'backend': os.environ.get('RATE_LIMIT_BACKEND', 'memory'),  # memory (per worker) or redis (shared)
+    'redis_url': FEED_CACHE_CONFIG['redis_url'],
+    'max_keys': int(os.environ.get('RATE_LIMIT_MAX_KEYS', 100000)),
+    'proxy_hops': int(os.environ.get('TRUSTED_PROXY_HOPS', 0))  # proxies whose X-Forwarded-For is trusted
+}
+
+def env_limit(prefix, per_minute, burst):
+    """Limit from <prefix>_PER_MINUTE and <prefix>_BURST; a rate of 0 disables it"""
+    per_minute = float(os.environ.get(f'{prefix}_PER_MINUTE', per_minute))
+    return Limit(per_minute, int(os.environ.get(f'{prefix}_BURST', burst))) if per_minute > 0 else None
+
+RATE_LIMITS = {
+    # Login and registration each cost a bcrypt hash; there is no identity yet, so only the IP is limited
+    'auth': RouteLimits(
+        identity=None,
+        ip=env_limit('RATE_LIMIT_AUTH_IP', 30, 10),
+        concurrency=int(os.environ.get('RATE_LIMIT_AUTH_CONCURRENCY', 16))
+    ),
+    # Predictions write a row each; the per-IP limit is looser as clients behind NAT share an address
+    'predict': RouteLimits(
+        identity=env_limit('RATE_LIMIT_PREDICT_USER', 60, 20),
+        ip=env_limit('RATE_LIMIT_PREDICT_IP', 300, 60),
+        concurrency=int(os.environ.get('RATE_LIMIT_PREDICT_CONCURRENCY', 32))
+    ),
+    # Batches are charged one token per item, so their buckets hold a full default-size batch
+    'predict_batch': RouteLimits(
+        identity=env_limit('RATE_LIMIT_PREDICT_BATCH_USER', 600, 500),
+        ip=env_limit('RATE_LIMIT_PREDICT_BATCH_IP', 3000, 1000),
+        concurrency=int(os.environ.get('RATE_LIMIT_PREDICT_BATCH_CONCURRENCY', 8))
+    ),
+    # An export holds a pooled connection until the download ends, so few may run at once
+    'export': RouteLimits(
+        identity=env_limit('RATE_LIMIT_EXPORT_USER', 6, 3),
+        ip=None,
+        concurrency=int(os.environ.get('RATE_LIMIT_EXPORT_CONCURRENCY', 2))
+    )
+}
+
+if RATE_LIMIT_CONFIG['proxy_hops']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=RATE_LIMIT_CONFIG['proxy_hops'])
+
+rate_limiter = None
+if RATE_LIMIT_CONFIG['enabled']:
+    if RATE_LIMIT_CONFIG['backend'] == 'redis':
+        rate_limit_backend = RedisRateLimitBackend(RATE_LIMIT_CONFIG['redis_url'])
+    else:
+        rate_limit_backend = MemoryRateLimitBackend(RATE_LIMIT_CONFIG['max_keys'])
+    rate_limiter = RateLimiter(rate_limit_backend, RATE_LIMITS)
+
+request_metrics.counter('symptrack_rate_limited_total', 'Requests rejected by rate limits or concurrency caps.')
+
+def rate_limited(route_class, cost=None):
+    """Admit a view's requests under `route_class`'s limits, answering 429 or 503 with Retry-After.
+
+    `cost`, if given, returns the tokens the current request takes; otherwise it takes one.
+
+    Goes below @jwt_required(), so the identity is verified before it is counted. A
+    streamed response stays in flight until its body has been sent or abandoned.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def admitted_view(*args, **kwargs):
+            if not rate_limiter:
+                return view(*args, **kwargs)
+            
+            identity = get_jwt_identity() if RATE_LIMITS[route_class].identity else None
+            rejection = rate_limiter.check(route_class, identity=identity, ip=request.remote_addr,
+                                           cost=cost() if cost else 1)
+            if rejection:
+                reason, wait = rejection
+                request_metrics.inc('symptrack_rate_limited_total', (('route_class', route_class), ('reason', reason)))
+                response = jsonify({'message': 'Too many requests, slow down'})
+                response.headers['Retry-After'] = str(math.ceil(wait))
+                return response, 429
+            
+            if not rate_limiter.enter(route_class):
+                request_metrics.inc('symptrack_rate_limited_total', (('route_class', route_class), ('reason', 'concurrency')))
+                response = jsonify({'message': 'Too many requests in progress, try again shortly'})
+                response.headers['Retry-After'] = '1'
+                return response, 503
+            try:
+                response = view(*args, **kwargs)
+            except BaseException:
+                rate_limiter.leave(route_class)
+                raise
+            if isinstance(response, app.response_class) and response.is_streamed:
+                response.call_on_close(lambda: rate_limiter.leave(route_class))
+            else:
+                rate_limiter.leave(route_class)
+            return response
+        return admitted_view
+    return decorator
+
+def hasher_busy_response(error):
+    response = jsonify({'message': str(error)})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+class UserNotFound(Exception):
+    """Raised by the profile loaders when the token's user no longer exists"""
+
+def profile_namespace(user_id):
+    return f'user:{user_id}'
+
+CURRENT_USER_SQL = 'SELECT id, name, email, phone, age, gender FROM users WHERE id = %s'
+
+route_query('auth.me', lambda: (CURRENT_USER_SQL, (1,)))
+
+def load_current_user(user_id):
+    """/api/auth/me payload, or None if the database is unavailable; raises UserNotFound"""
+    with db_connection() as connection:
+        if not connection:
+            return None
+    
+        cursor = connection.cursor()
+        cursor.execute(CURRENT_USER_SQL, (user_id,))
+        user = cursor.fetchone()
+        cursor.close()
+    
+    if not user:
+        raise UserNotFound('User not found')
+    
+    return {
+        'user': {
+            'id': user[0],
+            'name': user[1],
+            'email': user[2],
+            'phone': user[3],
+            'age': user[4],
+            'gender': user[5]
+        }
+    }
+
+USER_PROFILE_SQL = '''
+    SELECT name, email, phone, age, gender, medical_history, lifestyle, emergency_contact
+    FROM users WHERE id = %s
+'''
+
+route_query('user.profile', lambda: (USER_PROFILE_SQL, (1,)))
+
+def load_user_profile(user_id):
+    """/api/user/profile payload, or None if the database is unavailable; raises UserNotFound"""
+    with db_connection() as connection:
+        if not connection:
+            return None
+    
+        cursor = connection.cursor()
+        cursor.execute(USER_PROFILE_SQL, (user_id,))
+        user = cursor.fetchone()
+        cursor.close()
+    
+    if not user:
+        raise UserNotFound('User not found')
+    
+    return {
+        'profile': {
+            'name': user[0],
+            'email': user[1],
+            'phone': user[2],
+            'age': user[3],
+            'gender': user[4],
+            'medical_history': user[5],
+            'lifestyle': user[6],
+            'emergency_contact': user[7]
+        }
+    }
+
+def upgrade_password_hash(user_id, password):
+    """Re-hash a verified password at the configured cost; skipped if hashing is saturated"""
+    try:
+        with phase('hash'):
+            password_hash = password_hasher.hash(password)
+    except HasherBusy:
+        return
+    
+    with db_connection() as connection:
+        if not connection:
+            return
+        cursor = connection.cursor()
+        cursor.execute('UPDATE users SET password_hash = %s WHERE id = %s', (password_hash, user_id))
+        connection.commit()
+        cursor.close()
+
 @app.route('/api/auth/register', methods=['POST'])
+@rate_limited('auth')
 def register():
     try:
         data = request.get_json()
@@ -189,45 +942,48 @@ def register():
         if not all([name, email, password]):
             return jsonify({'message': 'Name, email and password are required'}), 400
         
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'message': 'Database connection failed'}), 500
+        # Hash password before checking out a connection, so none is held during the work
+        with phase('hash'):
+            password_hash = password_hasher.hash(password)
         
-        cursor = connection.cursor()
+        with db_connection() as connection:
+            if not connection:
+                return jsonify({'message': 'Database connection failed'}), 500
         
-        # Check if user already exists
-        cursor.execute("SELECT id FROM users WHERE email = %s", (email,))
-        if cursor.fetchone():
-            return jsonify({'message': 'User already exists'}), 400
+            cursor = connection.cursor()
         
-        # Hash password
-        password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+            # Check if user already exists
+            cursor.execute(USER_EXISTS_SQL, (email,))
+            if cursor.fetchone():
+                return jsonify({'message': 'User already exists'}), 400
         
-        # Insert user
-        cursor.execute('''
-            INSERT INTO users (name, email, password_hash, phone, age, gender)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        ''', (name, email, password_hash, phone, age, gender))
+            # Insert user
+            cursor.execute('''
+                INSERT INTO users (name, email, password_hash, phone, age, gender)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            ''', (name, email, password_hash, phone, age, gender))
         
-        user_id = cursor.lastrowid
-        connection.commit()
+            user_id = cursor.lastrowid
+            connection.commit()
+        
+            cursor.close()
         
         # Create access token
         access_token = create_access_token(identity=user_id)
         
-        cursor.close()
-        connection.close()
-        
         return jsonify({
             'message': 'User created successfully',
             'token': access_token,
             'user': {'id': user_id, 'name': name, 'email': email}
         }), 201
         
+    except HasherBusy as e:
+        return hasher_busy_response(e)
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
 @app.route('/api/auth/login', methods=['POST'])
+@rate_limited('auth')
 def login():
     try:
         data = request.get_json()
@@ -237,21 +993,25 @@ def login():
         if not all([email, password]):
             return jsonify({'message': 'Email and password are required'}), 400
         
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'message': 'Database connection failed'}), 500
+        with db_connection() as connection:
+            if not connection:
+                return jsonify({'message': 'Database connection failed'}), 500
         
-        cursor = connection.cursor()
-        cursor.execute("SELECT id, name, email, password_hash FROM users WHERE email = %s", (email,))
-        user = cursor.fetchone()
+            cursor = connection.cursor()
+            cursor.execute(LOGIN_SQL, (email,))
+            user = cursor.fetchone()
+            cursor.close()
         
-        if not user or not bcrypt.checkpw(password.encode('utf-8'), user[3].encode('utf-8')):
+        with phase('hash'):
+            verified = user is not None and password_hasher.verify(password, user[3])
+        if not verified:
             return jsonify({'message': 'Invalid credentials'}), 401
         
-        access_token = create_access_token(identity=user[0])
+        # Upgrade the stored hash when the configured work factor has changed
+        if password_hasher.needs_rehash(user[3]):
+            upgrade_password_hash(user[0], password)
         
-        cursor.close()
-        connection.close()
+        access_token = create_access_token(identity=user[0])
         
         return jsonify({
             'message': 'Login successful',
@@ -259,6 +1019,8 @@ def login():
             'user': {'id': user[0], 'name': user[1], 'email': user[2]}
         }), 200
         
+    except HasherBusy as e:
+        return hasher_busy_response(e)
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
@@ -267,38 +1029,84 @@ def login():
 def get_current_user():
     try:
         user_id = get_jwt_identity()
-        
-        connection = get_db_connection()
-        if not connection:
+        cached = profile_cache.get_or_load(profile_namespace(user_id), 'me', lambda: load_current_user(user_id))
+        if cached is None:
             return jsonify({'message': 'Database connection failed'}), 500
         
-        cursor = connection.cursor()
-        cursor.execute("SELECT id, name, email, phone, age, gender FROM users WHERE id = %s", (user_id,))
-        user = cursor.fetchone()
-        
-        if not user:
-            return jsonify({'message': 'User not found'}), 404
-        
-        cursor.close()
-        connection.close()
-        
-        return jsonify({
-            'user': {
-                'id': user[0],
-                'name': user[1],
-                'email': user[2],
-                'phone': user[3],
-                'age': user[4],
-                'gender': user[5]
-            }
-        }), 200
+        return cached_json_response(cached)
         
+    except UserNotFound as e:
+        return jsonify({'message': str(e)}), 404
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
 # Prediction routes
+PREDICTION_INSERT_SQL = '''
+    INSERT INTO predictions (user_id, symptoms, additional_data, prediction_result, risk_score, risk_level)
+    VALUES (%s, %s, %s, %s, %s, %s)
+'''
+
+MAX_PREDICTION_BATCH_SIZE = int(os.environ.get('MAX_PREDICTION_BATCH_SIZE', 500))
+
+# 'sync' writes each prediction before responding; 'async' queues it for the background writer
+PREDICTION_DURABILITY = os.environ.get('PREDICTION_DURABILITY', 'sync')
+
+PREDICTION_WRITER_CONFIG = {
+    'max_queue': int(os.environ.get('PREDICTION_QUEUE_SIZE', 10000)),
+    'batch_size': int(os.environ.get('PREDICTION_WRITE_BATCH_SIZE', 500)),
+    'max_retry_interval': float(os.environ.get('PREDICTION_WRITE_MAX_RETRY_INTERVAL', 30)),
+    # Rows failing these (a deleted user, an oversized field) will never be written; anything else is retried
+    'permanent_errors': (IntegrityError, DataError)
+}
+
+def prediction_row(user_id, symptoms, age, gender, lifestyle, medical_history, prediction_result, location=None):
+    """Build the predictions INSERT parameters for one prediction"""
+    return (
+        user_id,
+        symptoms,
+        json.dumps({
+            'age': age, 'gender': gender, 'lifestyle': lifestyle, 'medical_history': medical_history,
+            'location': location
+        }),
+        json.dumps(prediction_result),
+        prediction_result['risk_score'],
+        prediction_result['risk_level']
+    )
+
+def prediction_location(data):
+    """The optional region a prediction was made from, as used by outbreak detection"""
+    location = data.get('location')
+    if not isinstance(location, str):
+        return None
+    return location.strip()[:255] or None
+
+def save_predictions(cursor, rows):
+    """Insert prediction_row() tuples in one statement and fold them into the user_stats and risk series rollups"""
+    cursor.executemany(PREDICTION_INSERT_SQL, rows)
+    
+    totals = {}
+    for row in rows:
+        count, risk_score_sum = totals.get(row[0], (0, 0))
+        totals[row[0]] = (count + 1, risk_score_sum + row[4])
+    for user_id, (count, risk_score_sum) in totals.items():
+        record_user_stats(cursor, user_id, predictions=count, risk_score_sum=risk_score_sum)
+    record_risk_series(cursor, rows)
+
+def write_prediction_batch(rows):
+    """PredictionWriter writer: persist a batch of queued prediction rows in one transaction"""
+    with db_connection() as connection:
+        if not connection:
+            raise Error('Database connection failed')
+        cursor = connection.cursor()
+        save_predictions(cursor, rows)
+        connection.commit()
+        cursor.close()
+
+prediction_writer = PredictionWriter(write_prediction_batch, **PREDICTION_WRITER_CONFIG)
+
 @app.route('/api/predictions/predict', methods=['POST'])
 @jwt_required()
+@rate_limited('predict')
 def make_prediction():
     try:
         user_id = get_jwt_identity()
@@ -309,6 +1117,7 @@ def make_prediction():
         gender = data.get('gender')
         lifestyle = data.get('lifestyle')
         medical_history = data.get('medicalHistory')
+        location = prediction_location(data)
         
         if not symptoms:
             return jsonify({'message': 'Symptoms are required'}), 400
@@ -316,168 +1125,1280 @@ def make_prediction():
         # Make prediction
         prediction_result = predict_disease(symptoms, age, gender, lifestyle, medical_history)
         
+        row = prediction_row(user_id, symptoms, age, gender, lifestyle, medical_history, prediction_result, location)
+        
+        # In async mode the background writer saves it; a full queue falls back to a direct write
+        if PREDICTION_DURABILITY == 'async' and prediction_writer.submit(row):
+            return jsonify(prediction_result), 200
+        
         # Save to database
-        connection = get_db_connection()
-        if connection:
-            cursor = connection.cursor()
-            cursor.execute('''
-                INSERT INTO predictions (user_id, symptoms, additional_data, prediction_result, risk_score, risk_level)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            ''', (
-                user_id,
-                symptoms,
-                json.dumps({'age': age, 'gender': gender, 'lifestyle': lifestyle, 'medical_history': medical_history}),
-                json.dumps(prediction_result),
-                prediction_result['risk_score'],
-                prediction_result['risk_level']
-            ))
-            connection.commit()
-            cursor.close()
-            connection.close()
+        with db_connection() as connection:
+            if connection:
+                cursor = connection.cursor()
+                save_predictions(cursor, [row])
+                connection.commit()
+                cursor.close()
         
         return jsonify(prediction_result), 200
         
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
-@app.route('/api/predictions/history', methods=['GET'])
+def prediction_batch_cost():
+    """Rate limit cost of a batch request: one token per item, capped at the batch size limit"""
+    data = request.get_json(silent=True)
+    items = data.get('items') if isinstance(data, dict) else data
+    return min(len(items), MAX_PREDICTION_BATCH_SIZE) if isinstance(items, list) and items else 1
+
+@app.route('/api/predictions/predict/batch', methods=['POST'])
 @jwt_required()
-def get_prediction_history():
+@rate_limited('predict_batch', cost=prediction_batch_cost)
+def make_batch_prediction():
     try:
         user_id = get_jwt_identity()
+        data = request.get_json()
+        items = data.get('items') if isinstance(data, dict) else data
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({'message': 'A non-empty array of items is required'}), 400
+        
+        if len(items) > MAX_PREDICTION_BATCH_SIZE:
+            return jsonify({'message': f'At most {MAX_PREDICTION_BATCH_SIZE} items are allowed per batch'}), 400
+        
+        # Validate items, collecting per-item errors without aborting the batch
+        results = [None] * len(items)
+        inputs = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or not item.get('symptoms') or not isinstance(item['symptoms'], str):
+                results[index] = {'index': index, 'error': 'Symptoms are required'}
+                continue
+            
+            inputs.append((index, {
+                'symptoms': item['symptoms'],
+                'age': item.get('age'),
+                'gender': item.get('gender'),
+                'lifestyle': item.get('lifestyle'),
+                'medical_history': item.get('medicalHistory')
+            }))
+        
+        # Predict every valid item at once
+        predictions = predict_many([prediction_input for _, prediction_input in inputs])
+        
+        rows = []
+        for (index, prediction_input), prediction_result in zip(inputs, predictions):
+            if isinstance(prediction_result, Exception):
+                results[index] = {'index': index, 'error': str(prediction_result)}
+                continue
+            
+            results[index] = {'index': index, 'result': prediction_result}
+            rows.append(prediction_row(
+                user_id, prediction_input['symptoms'], prediction_input['age'], prediction_input['gender'],
+                prediction_input['lifestyle'], prediction_input['medical_history'], prediction_result,
+                prediction_location(items[index])
+            ))
         
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'message': 'Database connection failed'}), 500
+        # Save all successful predictions in one multi-row insert
+        if rows:
+            with db_connection() as connection:
+                if not connection:
+                    return jsonify({'message': 'Database connection failed'}), 500
+                
+                cursor = connection.cursor()
+                save_predictions(cursor, rows)
+                connection.commit()
+                cursor.close()
         
-        cursor = connection.cursor()
-        cursor.execute('''
-            SELECT symptoms, risk_score, risk_level, created_at
-            FROM predictions 
-            WHERE user_id = %s 
-            ORDER BY created_at DESC 
-            LIMIT 10
-        ''', (user_id,))
-        
-        predictions = []
-        for row in cursor.fetchall():
-            predictions.append({
-                'symptoms': row[0],
-                'risk_score': row[1],
-                'risk_level': row[2],
-                'created_at': row[3].isoformat() if row[3] else None
-            })
+        return jsonify({
+            'results': results,
+            'succeeded': len(rows),
+            'failed': len(results) - len(rows)
+        }), 200
         
-        cursor.close()
-        connection.close()
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+
+PREDICTION_HISTORY_SQL = '''
+    SELECT symptoms, risk_score, risk_level, created_at
+    FROM predictions
+    WHERE user_id = %s
+    ORDER BY created_at DESC
+    LIMIT 10
+'''
+
+route_query('predictions.history', lambda: (PREDICTION_HISTORY_SQL, (1,)))
+
+prediction_from_row = row_mapper('symptoms', 'risk_score', 'risk_level', 'created_at')
+
+def recent_predictions(cursor, user_id):
+    """The user's latest predictions, newest first"""
+    cursor.execute(PREDICTION_HISTORY_SQL, (user_id,))
+    return list(map(prediction_from_row, cursor.fetchall()))
+
+@app.route('/api/predictions/history', methods=['GET'])
+@jwt_required()
+def get_prediction_history():
+    try:
+        user_id = get_jwt_identity()
+        
+        with db_connection() as connection:
+            if not connection:
+                return jsonify({'message': 'Database connection failed'}), 500
+        
+            cursor = connection.cursor()
+            predictions = recent_predictions(cursor, user_id)
+            cursor.close()
         
         return jsonify({'predictions': predictions}), 200
         
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
+# Prediction export
+PREDICTION_EXPORT_COLUMNS = ['id', 'user_id', 'symptoms', 'additional_data', 'prediction_result',
+                             'risk_score', 'risk_level', 'created_at']
+PREDICTION_EXPORT_CHUNK_SIZE = int(os.environ.get('PREDICTION_EXPORT_CHUNK_SIZE', 1000))
+
+def prediction_export_query(user_id=None, start=None, end=None, after_id=None):
+    """Export query in id order, so `after_id` (the last id received) resumes an interrupted export"""
+    conditions = []
+    params = []
+    if user_id is not None:
+        conditions.append('user_id = %s')
+        params.append(user_id)
+    if after_id:
+        conditions.append('id > %s')
+        params.append(after_id)
+    if start:
+        conditions.append('created_at >= %s')
+        params.append(start)
+    if end:
+        conditions.append('created_at < %s')
+        params.append(end)
+    
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    return f'''
+        SELECT {', '.join(PREDICTION_EXPORT_COLUMNS)}
+        FROM predictions
+        {where}
+        ORDER BY id
+    ''', tuple(params)
+
+route_query('predictions.export', lambda: prediction_export_query(user_id=1))
+route_query('predictions.export_after', lambda: prediction_export_query(user_id=1, after_id=1000))
+
+def stream_predictions(export_format, user_id=None, start=None, end=None, after_id=None):
+    """Yield an export of predictions as NDJSON or CSV text chunks, holding one chunk of rows at a time.
+
+    Rows are read from an unbuffered cursor, so neither the worker nor the driver
+    materializes the full result.
+    """
+    sql, params = prediction_export_query(user_id, start, end, after_id)
+    with phase('connect'):
+        connection = db_pool.acquire()
+    finished = False
+    try:
+        cursor = InstrumentedConnection(connection).cursor()
+        cursor.execute(sql, params)
+        
+        if export_format == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(PREDICTION_EXPORT_COLUMNS)
+            yield buffer.getvalue()
+        
+        while True:
+            rows = cursor.fetchmany(PREDICTION_EXPORT_CHUNK_SIZE)
+            if not rows:
+                break
+            
+            if export_format == 'csv':
+                buffer.seek(0)
+                buffer.truncate()
+                for row in rows:
+                    writer.writerow(row[:7] + (row[7].isoformat() if row[7] else None,))
+                yield buffer.getvalue()
+            else:
+                yield ''.join(json.dumps({
+                    'id': row[0],
+                    'user_id': row[1],
+                    'symptoms': row[2],
+                    'additional_data': json.loads(row[3]) if row[3] else None,
+                    'prediction_result': json.loads(row[4]) if row[4] else None,
+                    'risk_score': row[5],
+                    'risk_level': row[6],
+                    'created_at': row[7].isoformat() if row[7] else None
+                }) + '\n' for row in rows)
+        
+        cursor.close()
+        finished = True
+    finally:
+        # An abandoned export would leave unread rows behind; drop the connection rather than drain them
+        db_pool.release(connection, discard=not finished)
+
+def parse_export_args(args):
+    """(format, start, end, after_id) from export query arguments; raises ValueError if invalid"""
+    export_format = args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        raise ValueError('format must be ndjson or csv')
+    start = datetime.fromisoformat(args['from']) if args.get('from') else None
+    end = datetime.fromisoformat(args['to']) if args.get('to') else None
+    after_id = int(args['after_id']) if args.get('after_id') else None
+    return export_format, start, end, after_id
+
+@app.route('/api/predictions/export', methods=['GET'])
+@jwt_required()
+@rate_limited('export')
+def export_predictions():
+    try:
+        user_id = get_jwt_identity()
+        
+        try:
+            export_format, start, end, after_id = parse_export_args(request.args)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        
+        # Run the query and read the first chunk up front, so database errors still get a normal response
+        chunks = stream_predictions(export_format, user_id, start, end, after_id)
+        first_chunk = next(chunks, '')
+        
+        def body():
+            try:
+                yield first_chunk
+                yield from chunks
+            finally:
+                chunks.close()
+        
+        mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+        response = app.response_class(body(), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename=predictions.{export_format}'
+        return response
+        
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+
+@app.cli.command('export-predictions')
+@click.option('--format', 'export_format', type=click.Choice(['ndjson', 'csv']), default='ndjson', show_default=True)
+@click.option('--user-id', type=int, help='Only this user\'s predictions (default: all users).')
+@click.option('--from', 'start', help='Only predictions created at or after this ISO date/time.')
+@click.option('--to', 'end', help='Only predictions created before this ISO date/time.')
+@click.option('--after-id', type=int, help='Resume after this prediction id.')
+@click.option('--output', type=click.File('w'), default='-', help='Output file (default: stdout).')
+def export_predictions_command(export_format, user_id, start, end, after_id, output):
+    """Stream predictions for research extracts"""
+    start = datetime.fromisoformat(start) if start else None
+    end = datetime.fromisoformat(end) if end else None
+    for chunk in stream_predictions(export_format, user_id, start, end, after_id):
+        output.write(chunk)
+
 # Vlog routes
+VLOG_FEED_DEFAULT_LIMIT = 20
+VLOG_FEED_MAX_LIMIT = 100
+
+def vlog_feed_query(limit, after=None, disease=None, author_id=None):
+    """Build the keyset-paginated vlog feed query, newest first.
+
+    `after` is a (created_at, id) pair from the last row of the previous page. The
+    equality filters are served by the (disease, created_at, id) and
+    (user_id, created_at, id) indexes.
+    """
+    conditions = []
+    params = []
+    if disease:
+        conditions.append('v.disease = %s')
+        params.append(disease)
+    if author_id:
+        conditions.append('v.user_id = %s')
+        params.append(author_id)
+    if after:
+        conditions.append('(v.created_at < %s OR (v.created_at = %s AND v.id < %s))')
+        params.extend([after[0], after[0], after[1]])
+    
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    sql = f'''
+        SELECT v.id, v.title, v.description, v.disease, v.video_url, v.thumbnail,
+               v.medicines, v.hospitals, v.likes, v.comments, v.created_at,
+               u.name as author_name
+        FROM vlogs v
+        JOIN users u ON v.user_id = u.id
+        {where}
+        ORDER BY v.created_at DESC, v.id DESC
+        LIMIT %s
+    '''
+    params.append(limit)
+    return sql, tuple(params)
+
+for feed, filters in (('', {}), ('_by_disease', {'disease': 'Flu'}), ('_by_author', {'author_id': 1})):
+    route_query(f'vlogs.feed{feed}', lambda filters=filters: vlog_feed_query(VLOG_FEED_DEFAULT_LIMIT + 1, **filters))
+    route_query(f'vlogs.feed{feed}_after', lambda filters=filters: vlog_feed_query(
+        VLOG_FEED_DEFAULT_LIMIT + 1, after=(datetime(2024, 1, 1), 1000), **filters
+    ))
+
+# Feed rows to response dicts; timestamps are left for the JSON encoder to format
+VLOG_FEED_COLUMNS = ('id', 'title', 'description', 'disease', 'video_url', 'thumbnail', 'medicines', 'hospitals',
+                     'likes', 'comments', 'created_at', 'author_name')
+
+vlog_from_row = row_mapper(*VLOG_FEED_COLUMNS)
+
+def encode_vlog_cursor(created_at, vlog_id):
+    """Opaque pagination cursor for the row (created_at, id)"""
+    return base64.urlsafe_b64encode(f'{created_at.isoformat()}|{vlog_id}'.encode('utf-8')).decode('ascii')
+
+def decode_vlog_cursor(cursor):
+    """Inverse of encode_vlog_cursor; raises ValueError for malformed cursors"""
+    try:
+        created_at, vlog_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+        return datetime.fromisoformat(created_at), int(vlog_id)
+    except (UnicodeError, TypeError, ValueError, binascii.Error):
+        raise ValueError('Invalid cursor')
+
+def load_vlog_page(limit, after, disease, author_id):
+    """One page of the vlog feed with its next cursor, or None if the database is unavailable"""
+    results = run_read_queries([vlog_feed_query(limit + 1, after=after, disease=disease, author_id=author_id)])
+    if results is None:
+        return None
+    rows = results[0]
+    
+    # One extra row is fetched to tell whether another page exists
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_vlog_cursor(rows[-1][10], rows[-1][0])
+    
+    return {'vlogs': list(map(vlog_from_row, rows)), 'next_cursor': next_cursor}
+
 @app.route('/api/vlogs', methods=['GET'])
 @jwt_required()
 def get_vlogs():
     try:
-        connection = get_db_connection()
-        if not connection:
+        limit = request.args.get('limit', VLOG_FEED_DEFAULT_LIMIT, type=int)
+        if limit < 1:
+            return jsonify({'message': 'limit must be positive'}), 400
+        limit = min(limit, VLOG_FEED_MAX_LIMIT)
+        
+        after = request.args.get('after')
+        if after:
+            try:
+                after = decode_vlog_cursor(after)
+            except ValueError as e:
+                return jsonify({'message': str(e)}), 400
+        
+        disease = request.args.get('disease')
+        author_id = request.args.get('author_id', type=int)
+        
+        cache_key = f"{limit}:{request.args.get('after') or ''}:{disease or ''}:{author_id or ''}"
+        cached = feed_cache.get_or_load(
+            'vlogs', cache_key, lambda: load_vlog_page(limit, after, disease, author_id)
+        )
+        if cached is None:
             return jsonify({'message': 'Database connection failed'}), 500
         
-        cursor = connection.cursor()
-        cursor.execute('''
-            SELECT v.id, v.title, v.description, v.disease, v.video_url, v.thumbnail,
-                   v.medicines, v.hospitals, v.likes, v.comments, v.created_at,
-                   u.name as author_name
-            FROM vlogs v
-            JOIN users u ON v.user_id = u.id
-            ORDER BY v.created_at DESC
-        ''')
+        # Likes still in the write-behind buffer are added on top of the cached counts
+        pending_likes = like_buffer.pending_deltas()
+        if pending_likes:
+            cached = apply_pending_likes(cached, pending_likes)
         
-        vlogs = []
-        for row in cursor.fetchall():
-            vlogs.append({
-                'id': row[0],
-                'title': row[1],
-                'description': row[2],
-                'disease': row[3],
-                'video_url': row[4],
-                'thumbnail': row[5],
-                'medicines': row[6],
-                'hospitals': row[7],
-                'likes': row[8],
-                'comments': row[9],
-                'created_at': row[10].isoformat() if row[10] else None,
-                'author_name': row[11]
-            })
+        return cached_json_response(cached)
         
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+
+# Vlog search, served by the FULLTEXT index from migration 0007
+VLOG_SEARCH_MAX_TERMS = 8
+VLOG_SEARCH_MIN_TERM_LENGTH = 3  # InnoDB's default innodb_ft_min_token_size
+VLOG_SEARCH_TIMEOUT_MS = int(os.environ.get('VLOG_SEARCH_TIMEOUT_MS', 500))
+
+# InnoDB's default full-text stopwords; required (+) terms must not be among them
+VLOG_SEARCH_STOP_WORDS = frozenset([
+    'a', 'about', 'an', 'are', 'as', 'at', 'be', 'by', 'com', 'de', 'en', 'for', 'from', 'how', 'i', 'in',
+    'is', 'it', 'la', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'what', 'when', 'where', 'who',
+    'will', 'with', 'und', 'www'
+])
+
+VLOG_SEARCH_MATCH = 'MATCH(v.title, v.description, v.disease, v.medicines, v.hospitals) AGAINST (%s IN BOOLEAN MODE)'
+
+def vlog_search_terms(text):
+    """Searchable words of a query, deduplicated in order; operators and short or stop words are dropped"""
+    terms = []
+    for token in tokenize(text):
+        if len(token) >= VLOG_SEARCH_MIN_TERM_LENGTH and token not in VLOG_SEARCH_STOP_WORDS and token not in terms:
+            terms.append(token)
+    return terms[:VLOG_SEARCH_MAX_TERMS]
+
+def vlog_search_query(terms, limit, after=None, disease=None):
+    """Build the ranked vlog search query: every term must match, each as a prefix.
+
+    `after` is a (score, id) pair from the last row of the previous page; the score
+    is recomputed identically on every page, so the ordering is stable.
+    """
+    expression = ' '.join(f'+{term}*' for term in terms)
+    conditions = [VLOG_SEARCH_MATCH]
+    params = [expression, expression]
+    if disease:
+        conditions.append('v.disease = %s')
+        params.append(disease)
+    if after:
+        conditions.append(f'({VLOG_SEARCH_MATCH} < %s OR ({VLOG_SEARCH_MATCH} = %s AND v.id < %s))')
+        params.extend([expression, after[0], expression, after[0], after[1]])
+    
+    sql = f'''
+        SELECT /*+ MAX_EXECUTION_TIME({VLOG_SEARCH_TIMEOUT_MS}) */
+               v.id, v.title, v.description, v.disease, v.video_url, v.thumbnail,
+               v.medicines, v.hospitals, v.likes, v.comments, v.created_at,
+               u.name as author_name, {VLOG_SEARCH_MATCH} AS score
+        FROM vlogs v
+        JOIN users u ON v.user_id = u.id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY score DESC, v.id DESC
+        LIMIT %s
+    '''
+    params.append(limit)
+    return sql, tuple(params)
+
+route_query('vlogs.search', lambda: vlog_search_query(['flu'], VLOG_FEED_DEFAULT_LIMIT + 1))
+route_query('vlogs.search_after', lambda: vlog_search_query(['flu'], VLOG_FEED_DEFAULT_LIMIT + 1, after=(1.5, 1000)))
+
+vlog_search_result_from_row = row_mapper(*VLOG_FEED_COLUMNS, 'score', score=lambda score: round(score, 4))
+
+def encode_search_cursor(score, vlog_id):
+    return base64.urlsafe_b64encode(f'{score!r}|{vlog_id}'.encode('utf-8')).decode('ascii')
+
+def decode_search_cursor(cursor):
+    """Inverse of encode_search_cursor; raises ValueError for malformed cursors"""
+    try:
+        score, vlog_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+        return float(score), int(vlog_id)
+    except (UnicodeError, TypeError, ValueError, binascii.Error):
+        raise ValueError('Invalid cursor')
+
+def load_vlog_search_page(terms, limit, after, disease):
+    """One page of search results with its next cursor, or None if the database is unavailable"""
+    sql, params = vlog_search_query(terms, limit + 1, after=after, disease=disease)
+    
+    with db_connection() as connection:
+        if not connection:
+            return None
+    
+        cursor = connection.cursor()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
         cursor.close()
-        connection.close()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_search_cursor(rows[-1][12], rows[-1][0])
+    
+    return {'vlogs': list(map(vlog_search_result_from_row, rows)), 'next_cursor': next_cursor}
+
+@app.route('/api/vlogs/search', methods=['GET'])
+@jwt_required()
+def search_vlogs():
+    try:
+        terms = vlog_search_terms(request.args.get('q', ''))
+        if not terms:
+            return jsonify({'message': f'q needs a word of at least {VLOG_SEARCH_MIN_TERM_LENGTH} characters'}), 400
+        
+        limit = request.args.get('limit', VLOG_FEED_DEFAULT_LIMIT, type=int)
+        if limit < 1:
+            return jsonify({'message': 'limit must be positive'}), 400
+        limit = min(limit, VLOG_FEED_MAX_LIMIT)
+        
+        after = request.args.get('after')
+        if after:
+            try:
+                after = decode_search_cursor(after)
+            except ValueError as e:
+                return jsonify({'message': str(e)}), 400
+        
+        disease = request.args.get('disease')
+        
+        # Cached alongside the feed pages, so anything that invalidates the feed invalidates searches too
+        cache_key = f"search:{limit}:{request.args.get('after') or ''}:{disease or ''}:{' '.join(terms)}"
+        try:
+            cached = feed_cache.get_or_load(
+                'vlogs', cache_key, lambda: load_vlog_search_page(terms, limit, after, disease)
+            )
+        except Error as e:
+            if e.errno == 3024:  # MAX_EXECUTION_TIME exceeded
+                return jsonify({'message': 'Search took too long, try more specific terms'}), 503
+            raise
+        if cached is None:
+            return jsonify({'message': 'Database connection failed'}), 500
         
-        return jsonify({'vlogs': vlogs}), 200
+        pending_likes = like_buffer.pending_deltas()
+        if pending_likes:
+            cached = apply_pending_likes(cached, pending_likes)
+        
+        return cached_json_response(cached)
         
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
+def write_vlog_likes(likes_by_vlog, commit):
+    """LikeBuffer writer: record the likes and bump each vlog's counter by the new ones only.
+
+    Retrying a batch is harmless: likes already recorded are ignored and add nothing.
+    """
+    with db_connection() as connection:
+        if not connection:
+            raise Error('Database connection failed')
+    
+        cursor = connection.cursor()
+        for vlog_id, user_ids in likes_by_vlog.items():
+            # Likes the user already made (or for vlogs that no longer exist) are ignored
+            cursor.execute(
+                'INSERT IGNORE INTO vlog_likes (vlog_id, user_id) VALUES ' + ', '.join(['(%s, %s)'] * len(user_ids)),
+                [value for user_id in user_ids for value in (vlog_id, user_id)]
+            )
+            if cursor.rowcount > 0:
+                cursor.execute('UPDATE vlogs SET likes = likes + %s WHERE id = %s', (cursor.rowcount, vlog_id))
+        commit(connection.commit)
+        cursor.close()
+
+like_buffer = LikeBuffer(write_vlog_likes, on_applied=lambda: feed_cache.invalidate('vlogs'), **LIKE_BUFFER_CONFIG)
+
+def apply_pending_likes(cached, pending_likes):
+    """Return `cached` with buffered like deltas added to the matching vlogs"""
+    payload = json_codec.loads(cached.body)
+    changed = False
+    for vlog in payload['vlogs']:
+        delta = pending_likes.get(vlog['id'])
+        if delta:
+            vlog['likes'] = (vlog['likes'] or 0) + delta
+            changed = True
+    return make_cached_body(payload, dump_json) if changed else cached
+
 @app.route('/api/vlogs/<int:vlog_id>/like', methods=['POST'])
 @jwt_required()
 def like_vlog(vlog_id):
     try:
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'message': 'Database connection failed'}), 500
+        user_id = get_jwt_identity()
         
+        if not like_buffer.record(user_id, vlog_id):
+            return jsonify({'message': 'Vlog already liked'}), 200
+        
+        return jsonify({'message': 'Vlog liked successfully'}), 200
+        
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+
+# Vlog media uploads: resumable chunked uploads into content-addressed files under UPLOAD_FOLDER
+MEDIA_UPLOAD_CONFIG = {
+    'max_video_bytes': int(os.environ.get('UPLOAD_MAX_VIDEO_BYTES', 1024 ** 3)),
+    'max_thumbnail_bytes': int(os.environ.get('UPLOAD_MAX_THUMBNAIL_BYTES', 10 * 1024 ** 2)),
+    'chunk_size': int(os.environ.get('UPLOAD_CHUNK_SIZE', 8 * 1024 ** 2)),  # the most one request may carry
+    'thumbnail_workers': int(os.environ.get('THUMBNAIL_WORKERS', 2)),
+    'thumbnail_width': int(os.environ.get('THUMBNAIL_WIDTH', 480)),
+    'max_age': int(os.environ.get('MEDIA_MAX_AGE', 365 * 24 * 3600))
+}
+
+MEDIA_EXTENSIONS = {
+    'video': ('.mp4', '.webm', '.mov', '.m4v'),
+    'thumbnail': ('.jpg', '.jpeg', '.png', '.webp')
+}
+
+MEDIA_URL_PREFIX = '/media/'
+
+UPLOAD_SQL = '''
+    SELECT id, user_id, vlog_id, kind, filename, size, sha256, media_name, status
+    FROM media_uploads
+    WHERE id = %s AND user_id = %s
+'''
+
+route_query('uploads.by_id', lambda: (UPLOAD_SQL, ('0' * 32, 1)))
+
+upload_from_row = row_mapper('id', 'user_id', 'vlog_id', 'kind', 'filename', 'size', 'sha256', 'media_name', 'status')
+
+media_store = MediaStore(os.path.join(app.root_path, app.config['UPLOAD_FOLDER']))
+
+def media_url(name):
+    return MEDIA_URL_PREFIX + name
+
+def attach_thumbnail(video_name, thumbnail):
+    """ThumbnailPool callback: set the thumbnail of vlogs showing the video, where they have none"""
+    with db_connection() as connection:
+        if not connection:
+            raise Error('Database connection failed')
+    
         cursor = connection.cursor()
-        cursor.execute('UPDATE vlogs SET likes = likes + 1 WHERE id = %s', (vlog_id,))
+        cursor.execute('''
+            UPDATE vlogs v
+            JOIN media_uploads m ON m.vlog_id = v.id
+            SET v.thumbnail = %s
+            WHERE m.media_name = %s AND m.kind = 'video' AND (v.thumbnail IS NULL OR v.thumbnail = '')
+        ''', (media_url(thumbnail), video_name))
+        changed = cursor.rowcount
         connection.commit()
         cursor.close()
-        connection.close()
+    
+    if changed:
+        feed_cache.invalidate('vlogs')
+
+thumbnail_pool = ThumbnailPool(
+    media_store, attach_thumbnail,
+    workers=MEDIA_UPLOAD_CONFIG['thumbnail_workers'], width=MEDIA_UPLOAD_CONFIG['thumbnail_width']
+)
+
+def upload_status(upload, offset, deduplicated=None):
+    status = {
+        'upload_id': upload['id'],
+        'kind': upload['kind'],
+        'status': upload['status'],
+        'size': upload['size'],
+        'offset': offset,
+        'chunk_size': MEDIA_UPLOAD_CONFIG['chunk_size'],
+        'url': media_url(upload['media_name']) if upload['media_name'] else None
+    }
+    if deduplicated is not None:
+        status['deduplicated'] = deduplicated
+    return status
+
+def load_upload(upload_id, user_id):
+    """The user's upload `upload_id` as a dict, None if there is no such upload; raises Error if the database is down"""
+    with db_connection() as connection:
+        if not connection:
+            raise Error('Database connection failed')
+    
+        cursor = connection.cursor()
+        cursor.execute(UPLOAD_SQL, (upload_id, user_id))
+        row = cursor.fetchone()
+        cursor.close()
+    
+    return upload_from_row(row) if row else None
+
+def complete_upload(cursor, upload, name, digest):
+    """Record a stored upload and attach it to its vlog; the caller commits, then calls after_upload_complete"""
+    cursor.execute(
+        "UPDATE media_uploads SET status = 'complete', sha256 = %s, media_name = %s WHERE id = %s",
+        (digest, name, upload['id'])
+    )
+    upload.update(status='complete', sha256=digest, media_name=name)
+    if not upload['vlog_id']:
+        return
+    
+    column = 'video_url' if upload['kind'] == 'video' else 'thumbnail'
+    cursor.execute(
+        f'UPDATE vlogs SET {column} = %s WHERE id = %s AND user_id = %s',
+        (media_url(name), upload['vlog_id'], upload['user_id'])
+    )
+    if upload['kind'] == 'video' and media_store.exists(thumbnail_name(name)):
+        # The same video was uploaded before; its thumbnail is already rendered
+        cursor.execute(
+            "UPDATE vlogs SET thumbnail = %s WHERE id = %s AND (thumbnail IS NULL OR thumbnail = '')",
+            (media_url(thumbnail_name(name)), upload['vlog_id'])
+        )
+
+def upload_proof_nonce(upload_id):
+    """Per-upload key for the content proof that claims an already stored file; derived, so nothing is stored"""
+    return hmac.new(app.config['JWT_SECRET_KEY'].encode('utf-8'), upload_id.encode('ascii'), hashlib.sha256).digest()
+
+def stored_duplicate(upload):
+    """Name of the stored file the upload's declared sha256 and size match, or None"""
+    if not upload['sha256']:
+        return None
+    name = media_store.blob_name(upload['sha256'], os.path.splitext(upload['filename'])[1].lower())
+    if media_store.exists(name) and os.path.getsize(media_store.path(name)) == upload['size']:
+        return name
+    return None
+
+def after_upload_complete(upload):
+    if upload['vlog_id']:
+        feed_cache.invalidate('vlogs')
+    if upload['kind'] == 'video' and not media_store.exists(thumbnail_name(upload['media_name'])):
+        thumbnail_pool.submit(upload['media_name'])
+
+@app.route('/api/uploads', methods=['POST'])
+@jwt_required()
+def create_upload():
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json() or {}
+        
+        kind = data.get('kind')
+        if kind not in MEDIA_EXTENSIONS:
+            return jsonify({'message': f"kind must be one of {', '.join(MEDIA_EXTENSIONS)}"}), 400
+        
+        filename = secure_filename(data.get('filename') or '')
+        ext = os.path.splitext(filename)[1].lower()
+        if ext not in MEDIA_EXTENSIONS[kind]:
+            return jsonify({'message': f"{kind} files must be one of {', '.join(MEDIA_EXTENSIONS[kind])}"}), 400
+        
+        size = data.get('size')
+        max_size = MEDIA_UPLOAD_CONFIG[f'max_{kind}_bytes']
+        if not isinstance(size, int) or isinstance(size, bool) or not 0 < size <= max_size:
+            return jsonify({'message': f'size must be between 1 and {max_size} bytes'}), 400
+        
+        sha256 = (data.get('sha256') or '').lower() or None
+        if sha256 and (len(sha256) != 64 or sha256.strip('0123456789abcdef')):
+            return jsonify({'message': 'sha256 must be a hex SHA-256 digest'}), 400
+        
+        vlog_id = data.get('vlog_id')
+        upload = {
+            'id': uuid.uuid4().hex, 'user_id': user_id, 'vlog_id': vlog_id, 'kind': kind, 'filename': filename,
+            'size': size, 'sha256': sha256, 'media_name': None, 'status': 'uploading'
+        }
         
-        return jsonify({'message': 'Vlog liked successfully'}), 200
+        with db_connection() as connection:
+            if not connection:
+                return jsonify({'message': 'Database connection failed'}), 500
+        
+            cursor = connection.cursor()
+            if vlog_id is not None:
+                cursor.execute('SELECT user_id FROM vlogs WHERE id = %s', (vlog_id,))
+                owner = cursor.fetchone()
+                if not owner or str(owner[0]) != str(user_id):
+                    cursor.close()
+                    return jsonify({'message': 'Vlog not found'}), 404
+        
+            cursor.execute('''
+                INSERT INTO media_uploads (id, user_id, vlog_id, kind, filename, size, sha256)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ''', (upload['id'], user_id, vlog_id, kind, filename, size, sha256))
+            connection.commit()
+            cursor.close()
+        
+        status = upload_status(upload, 0)
+        if stored_duplicate(upload):
+            # The file is already stored; the client may skip sending it by proving it has the bytes
+            status['proof_nonce'] = upload_proof_nonce(upload['id']).hex()
+        return jsonify(status), 201
+        
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+@jwt_required()
+def get_upload(upload_id):
+    try:
+        upload = load_upload(upload_id, get_jwt_identity())
+        if upload is None:
+            return jsonify({'message': 'Upload not found'}), 404
+        
+        offset = upload['size'] if upload['status'] == 'complete' else media_store.received(upload_id)
+        return jsonify(upload_status(upload, offset)), 200
         
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
+@app.route('/api/uploads/<upload_id>', methods=['PUT'])
+@jwt_required()
+def upload_chunk(upload_id):
+    """Append the request body, raw bytes described by a `Content-Range: bytes start-end/size` header"""
+    try:
+        content_range = parse_content_range_header(request.headers.get('Content-Range'))
+        if content_range is None or content_range.units != 'bytes' or content_range.length is None:
+            return jsonify({'message': 'Content-Range: bytes start-end/size is required'}), 400
+        
+        length = request.content_length
+        if length is None:
+            return jsonify({'message': 'Content-Length is required'}), 411
+        if length > MEDIA_UPLOAD_CONFIG['chunk_size']:
+            return jsonify({'message': f"Chunks may be at most {MEDIA_UPLOAD_CONFIG['chunk_size']} bytes"}), 413
+        if content_range.stop - content_range.start != length:
+            return jsonify({'message': 'Content-Range does not match Content-Length'}), 400
+        
+        # Looked up on its own connection, so none is held while the chunk streams in
+        upload = load_upload(upload_id, get_jwt_identity())
+        if upload is None:
+            return jsonify({'message': 'Upload not found'}), 404
+        if upload['status'] == 'complete':
+            return jsonify(upload_status(upload, upload['size'])), 200
+        if content_range.length != upload['size']:
+            return jsonify({'message': f"Content-Range size must be {upload['size']}"}), 400
+        
+        try:
+            offset = media_store.append(upload_id, request.stream, content_range.start, length)
+        except OffsetMismatch as e:
+            return jsonify({'message': str(e), 'offset': e.offset}), 409
+        except UploadBusy as e:
+            return jsonify({'message': str(e)}), 409
+        
+        if offset < upload['size']:
+            return jsonify(upload_status(upload, offset)), 200
+        
+        try:
+            digest, name, deduplicated = media_store.finish(
+                upload_id, os.path.splitext(upload['filename'])[1].lower(), upload['sha256']
+            )
+        except DigestMismatch as e:
+            # The received bytes are dropped; the upload starts over from offset 0
+            return jsonify({'message': str(e), 'offset': 0}), 422
+        with db_connection() as connection:
+            if not connection:
+                return jsonify({'message': 'Database connection failed'}), 500
+        
+            cursor = connection.cursor()
+            complete_upload(cursor, upload, name, digest)
+            connection.commit()
+            cursor.close()
+        
+        after_upload_complete(upload)
+        return jsonify(upload_status(upload, offset, deduplicated=deduplicated)), 200
+        
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+
+@app.route('/api/uploads/<upload_id>/proof', methods=['POST'])
+@jwt_required()
+def prove_upload(upload_id):
+    """Complete an upload of an already stored file from `{hmac}`: HMAC-SHA256 of the file keyed with proof_nonce"""
+    try:
+        upload = load_upload(upload_id, get_jwt_identity())
+        if upload is None:
+            return jsonify({'message': 'Upload not found'}), 404
+        if upload['status'] == 'complete':
+            return jsonify(upload_status(upload, upload['size'])), 200
+        
+        name = stored_duplicate(upload)
+        if name is None:
+            return jsonify({'message': 'No stored file matches this upload, send its chunks instead'}), 409
+        if not media_store.verify_proof(name, upload_proof_nonce(upload_id), (request.get_json() or {}).get('hmac')):
+            return jsonify({'message': 'Proof does not match the stored file'}), 400
+        
+        with db_connection() as connection:
+            if not connection:
+                return jsonify({'message': 'Database connection failed'}), 500
+        
+            cursor = connection.cursor()
+            complete_upload(cursor, upload, name, upload['sha256'])
+            connection.commit()
+            cursor.close()
+        
+        media_store.discard(upload_id)
+        after_upload_complete(upload)
+        return jsonify(upload_status(upload, upload['size'], deduplicated=True)), 200
+        
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+
+@app.route('/media/<path:name>', methods=['GET'])
+def get_media(name):
+    """Serve a stored media file, answering Range requests with 206 so video seeking fetches only what it needs"""
+    if name.startswith('.'):
+        return jsonify({'message': 'Not found'}), 404
+    response = send_from_directory(media_store.root, name, conditional=True, max_age=MEDIA_UPLOAD_CONFIG['max_age'])
+    # Content-addressed: a name never changes content
+    response.cache_control.immutable = True
+    return response
+
+@app.cli.command('prune-uploads')
+@click.option('--older-than-hours', default=24, show_default=True,
+              help='Prune incomplete uploads that have received nothing for this long.')
+def prune_uploads_command(older_than_hours):
+    """Delete incomplete uploads and their partial files"""
+    cutoff = time.time() - older_than_hours * 3600
+    with db_connection() as connection:
+        if not connection:
+            raise click.ClickException('Database connection failed')
+    
+        cursor = connection.cursor()
+        cursor.execute('''
+            SELECT id FROM media_uploads
+            WHERE status = 'uploading' AND created_at < DATE_SUB(NOW(), INTERVAL %s HOUR)
+        ''', (older_than_hours,))
+        stale = []
+        for (upload_id,) in cursor.fetchall():
+            partial = media_store.partial_path(upload_id)
+            if not os.path.exists(partial) or os.path.getmtime(partial) < cutoff:
+                stale.append(upload_id)
+        
+        for upload_id in stale:
+            cursor.execute("DELETE FROM media_uploads WHERE id = %s AND status = 'uploading'", (upload_id,))
+            media_store.discard(upload_id)
+        connection.commit()
+        cursor.close()
+    
+    print(f"Pruned {len(stale)} incomplete uploads")
+
 # Community alerts routes
+COMMUNITY_ALERTS_SQL = '''
+    SELECT id, type, title, description, severity, location, affected_count, source, created_at, updated_at
+    FROM community_alerts
+    ORDER BY created_at DESC
+    LIMIT 20
+'''
+
+ALERT_SEVERITIES = ('Low', 'Medium', 'High', 'Critical')
+
+# API representation of a community_alerts row selected with its updated_at
+alert_from_row = row_mapper('id', 'type', 'title', 'description', 'severity', 'location', 'affected_count',
+                            'source', 'created_at', 'updated_at')
+
+# Where a client holding the alerts snapshot should resume /api/alerts/stream
+LATEST_ALERT_CHANGE_SQL = 'SELECT updated_at, id FROM community_alerts ORDER BY updated_at DESC, id DESC LIMIT 1'
+
+route_query('alerts.feed', lambda: (COMMUNITY_ALERTS_SQL, ()))
+route_query('alerts.latest_change', lambda: (LATEST_ALERT_CHANGE_SQL, ()))
+
+def load_community_alerts():
+    """Latest community alerts payload, or None if the database is unavailable"""
+    results = run_read_queries([(COMMUNITY_ALERTS_SQL, ()), (LATEST_ALERT_CHANGE_SQL, ())])
+    if results is None:
+        return None
+    
+    alert_rows, latest = results
+    return {
+        'alerts': [alert_from_row(row) for row in alert_rows],
+        'last_event_id': encode_alert_event_id(*latest[0]) if latest else None
+    }
+
 @app.route('/api/alerts', methods=['GET'])
 @jwt_required()
 def get_community_alerts():
     try:
-        connection = get_db_connection()
-        if not connection:
+        cached = feed_cache.get_or_load('alerts', 'latest', load_community_alerts)
+        if cached is None:
             return jsonify({'message': 'Database connection failed'}), 500
         
-        cursor = connection.cursor()
-        cursor.execute('''
-            SELECT id, type, title, description, severity, location, affected_count, source, created_at
-            FROM community_alerts
-            ORDER BY created_at DESC
-            LIMIT 20
-        ''')
-        
-        alerts = []
-        for row in cursor.fetchall():
-            alerts.append({
-                'id': row[0],
-                'type': row[1],
-                'title': row[2],
-                'description': row[3],
-                'severity': row[4],
-                'location': row[5],
-                'affected_count': row[6],
-                'source': row[7],
-                'created_at': row[8].isoformat() if row[8] else None
-            })
+        return cached_json_response(cached)
         
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+
+# Alert push: /api/alerts/stream sends new and changed alerts as Server-Sent Events.
+# Each open stream holds one of the gthread worker's threads for up to max_duration,
+# so streams may only take all but one of them; dashboards over the cap poll /api/alerts.
+def alert_stream_max_subscribers():
+    thread_budget = max(0, WEB_THREADS - 1)
+    configured = os.environ.get('ALERT_STREAM_MAX_SUBSCRIBERS')
+    if configured is None:
+        return max(0, WEB_THREADS // 2)
+    if int(configured) > thread_budget:
+        print(f"ALERT_STREAM_MAX_SUBSCRIBERS={configured} would starve the {WEB_THREADS} worker threads; "
+              f"capping it at {thread_budget}")
+        return thread_budget
+    return int(configured)
+
+ALERT_STREAM_CONFIG = {
+    'poll_interval': float(os.environ.get('ALERT_STREAM_POLL_INTERVAL', 2)),
+    'overlap': float(os.environ.get('ALERT_STREAM_OVERLAP', 5)),  # seconds re-read for late commits
+    'max_subscribers': alert_stream_max_subscribers(),
+    # EventSource cannot send headers, so streams authenticate with a short-lived ticket in the URL
+    'ticket_ttl': int(os.environ.get('ALERT_STREAM_TICKET_TTL', 60)),
+    'heartbeat': float(os.environ.get('ALERT_STREAM_HEARTBEAT', 15)),
+    'max_duration': float(os.environ.get('ALERT_STREAM_MAX_DURATION', 300)),
+    'backlog_limit': int(os.environ.get('ALERT_STREAM_BACKLOG_LIMIT', 500))
+}
+
+ALERT_CHANGES_COLUMNS = '''
+    SELECT id, type, title, description, severity, location, affected_count, source, created_at, updated_at
+    FROM community_alerts
+'''
+
+ALERT_WATERMARK_SQL = 'SELECT COALESCE(MAX(updated_at), NOW(6)) FROM community_alerts'
+ALERT_CHANGES_SQL = ALERT_CHANGES_COLUMNS + ' WHERE updated_at >= %s ORDER BY updated_at, id'
+ALERT_BACKLOG_SQL = ALERT_CHANGES_COLUMNS + '''
+    WHERE updated_at > %s OR (updated_at = %s AND id > %s)
+    ORDER BY updated_at, id
+    LIMIT %s
+'''
+
+route_query('alerts.stream_watermark', lambda: (ALERT_WATERMARK_SQL, ()))
+route_query('alerts.stream_changes', lambda: (ALERT_CHANGES_SQL, (datetime.now() - timedelta(seconds=30),)))
+route_query('alerts.stream_backlog', lambda: (
+    ALERT_BACKLOG_SQL, (datetime(2024, 1, 1), datetime(2024, 1, 1), 1000, ALERT_STREAM_CONFIG['backlog_limit'] + 1)
+))
+
+def encode_alert_event_id(updated_at, alert_id):
+    """SSE event id for one version of an alert, in the same opaque (timestamp, id) form as vlog cursors"""
+    return encode_vlog_cursor(updated_at, alert_id)
+
+def alert_event(row):
+    return encode_alert_event_id(row[9], row[0]), alert_from_row(row)
+
+def load_alert_changes(watermark):
+    """AlertBroker loader: alerts changed since `watermark`, re-reading the overlap window, and the new watermark.
+
+    With no watermark yet, it starts from the latest change in the table.
+    """
+    with db_connection() as connection:
+        if not connection:
+            raise Error('Database connection failed')
+    
+        cursor = connection.cursor()
+        if watermark is None:
+            cursor.execute(ALERT_WATERMARK_SQL)
+            watermark = cursor.fetchone()[0]
+        cursor.execute(ALERT_CHANGES_SQL, (watermark - timedelta(seconds=ALERT_STREAM_CONFIG['overlap']),))
+        rows = cursor.fetchall()
         cursor.close()
-        connection.close()
-        
-        return jsonify({'alerts': alerts}), 200
+    
+    if rows:
+        watermark = max(watermark, rows[-1][9])
+    return [alert_event(row) for row in rows], watermark
+
+def load_alert_backlog(after, limit):
+    """Up to `limit` (event_id, alert) pairs changed after the (updated_at, id) key `after`, oldest first"""
+    with db_connection() as connection:
+        if not connection:
+            raise Error('Database connection failed')
+    
+        cursor = connection.cursor()
+        cursor.execute(ALERT_BACKLOG_SQL, (after[0], after[0], after[1], limit))
+        rows = cursor.fetchall()
+        cursor.close()
+    
+    return [alert_event(row) for row in rows]
+
+alert_broker = AlertBroker(
+    load_alert_changes,
+    poll_interval=ALERT_STREAM_CONFIG['poll_interval'],
+    max_subscribers=ALERT_STREAM_CONFIG['max_subscribers']
+)
+
+def format_alert_event(event_id, alert):
+    return f"id: {event_id}\nevent: alert\ndata: {json_codec.dumps(alert).decode('utf-8')}\n\n"
+
+ALERT_STREAM_TICKET_SCOPE = 'alert_stream'
+
+@jwt.token_verification_loader
+def verify_token_scope(jwt_header, jwt_data):
+    """Stream tickets are only good for opening an alert stream"""
+    return jwt_data.get('scope') != ALERT_STREAM_TICKET_SCOPE or request.endpoint == 'stream_community_alerts'
+
+@app.route('/api/alerts/stream/ticket', methods=['POST'])
+@jwt_required()
+def issue_alert_stream_ticket():
+    """Short-lived token for ?jwt=, so the long-lived access token never appears in a URL"""
+    ticket = create_access_token(
+        identity=get_jwt_identity(),
+        expires_delta=timedelta(seconds=ALERT_STREAM_CONFIG['ticket_ttl']),
+        additional_claims={'scope': ALERT_STREAM_TICKET_SCOPE}
+    )
+    return jsonify({'ticket': ticket, 'expires_in': ALERT_STREAM_CONFIG['ticket_ttl']}), 200
+
+@app.route('/api/alerts/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])  # EventSource cannot send headers; pass ?jwt=<ticket>
+def stream_community_alerts():
+    try:
+        if get_jwt_request_location() == 'query_string' and get_jwt().get('scope') != ALERT_STREAM_TICKET_SCOPE:
+            return jsonify({'message': 'Pass a stream ticket from /api/alerts/stream/ticket, not an access token'}), 401
+        
+        locations = {location.strip().lower() for location in request.args.get('location', '').split(',') if location.strip()}
+        severities = {severity.strip() for severity in request.args.get('severity', '').split(',') if severity.strip()}
+        if severities - set(ALERT_SEVERITIES):
+            return jsonify({'message': f"severity must be one of {', '.join(ALERT_SEVERITIES)}"}), 400
+        
+        # Browsers resend the last id they saw on reconnect; first connections can pass /api/alerts' last_event_id
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        try:
+            after = decode_vlog_cursor(last_event_id) if last_event_id else None
+        except ValueError:
+            return jsonify({'message': 'Invalid Last-Event-ID'}), 400
+        
+        subscription = alert_broker.subscribe(locations or None, severities or None)
+        if subscription is None:
+            response = jsonify({'message': 'Too many open alert streams, poll /api/alerts instead'})
+            response.headers['Retry-After'] = '30'
+            return response, 503
+        
+        # Subscribed before reading the backlog, so nothing changed in between is missed
+        try:
+            backlog = load_alert_backlog(after, ALERT_STREAM_CONFIG['backlog_limit'] + 1) if after else []
+        except Exception:
+            alert_broker.unsubscribe(subscription)
+            raise
+        
+        def body():
+            try:
+                yield 'retry: 3000\n\n'
+                if len(backlog) > ALERT_STREAM_CONFIG['backlog_limit']:
+                    # Too far behind to replay: the client should reload /api/alerts
+                    yield 'event: reset\ndata: {}\n\n'
+                    return
+                
+                replayed = set()
+                for event_id, alert in backlog:
+                    replayed.add(event_id)
+                    if subscription.matches(alert):
+                        yield format_alert_event(event_id, alert)
+                
+                deadline = time.monotonic() + ALERT_STREAM_CONFIG['max_duration']
+                while time.monotonic() < deadline and not subscription.lagged:
+                    event = subscription.get(timeout=ALERT_STREAM_CONFIG['heartbeat'])
+                    if event is None:
+                        yield ': keepalive\n\n'
+                    elif event[0] not in replayed:
+                        yield format_alert_event(*event)
+                # Ending the stream makes the client reconnect and resume from its last event id
+            finally:
+                alert_broker.unsubscribe(subscription)
+        
+        # Started here so closing the response always runs its cleanup, even before the first read
+        events = body()
+        first_chunk = next(events)
+        
+        def stream():
+            try:
+                yield first_chunk
+                yield from events
+            finally:
+                events.close()
+        
+        response = app.response_class(stream(), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
         
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
+# Outbreak detection: folds new predictions into outbreak_rollup and raises community alerts
+OUTBREAK_CONFIG = {
+    'bucket_minutes': int(os.environ.get('OUTBREAK_BUCKET_MINUTES', 60)),
+    'baseline_buckets': int(os.environ.get('OUTBREAK_BASELINE_BUCKETS', 168)),
+    'threshold_ratio': float(os.environ.get('OUTBREAK_THRESHOLD_RATIO', 3)),
+    'min_cases': int(os.environ.get('OUTBREAK_MIN_CASES', 10)),
+    'settle_seconds': int(os.environ.get('OUTBREAK_SETTLE_SECONDS', 10)),
+    'batch_size': int(os.environ.get('OUTBREAK_BATCH_SIZE', 5000)),
+    # Regions alerts may name, matched case-insensitively against each prediction's free-text location
+    'regions': [region.strip() for region in os.environ.get('OUTBREAK_REGIONS', '').split(',') if region.strip()]
+}
+
+OUTBREAK_SAMPLE_BUCKET = ('Migraine', 'Downtown District', datetime(2024, 1, 1, 10))
+
+route_query('outbreaks.new_predictions', lambda: (NEW_PREDICTIONS_SQL, (1000, OUTBREAK_CONFIG['batch_size'])))
+route_query('outbreaks.backfill_predictions', lambda: (BACKFILL_PREDICTIONS_SQL, (0, 1000, OUTBREAK_CONFIG['batch_size'])))
+route_query('outbreaks.bucket_cases', lambda: (BUCKET_CASES_SQL, OUTBREAK_SAMPLE_BUCKET))
+route_query('outbreaks.bucket_alert', lambda: (BUCKET_ALERT_SQL, OUTBREAK_SAMPLE_BUCKET))
+route_query('outbreaks.baseline', lambda: (BASELINE_SQL, OUTBREAK_SAMPLE_BUCKET[:2] + (
+    OUTBREAK_SAMPLE_BUCKET[2] - timedelta(minutes=OUTBREAK_CONFIG['bucket_minutes'] * OUTBREAK_CONFIG['baseline_buckets']),
+    OUTBREAK_SAMPLE_BUCKET[2]
+)))
+
+def run_outbreak_aggregation():
+    """One aggregation pass; returns its summary, or None if the database is unavailable"""
+    with db_connection() as connection:
+        if not connection:
+            return None
+        summary = aggregate_outbreaks(connection, **OUTBREAK_CONFIG)
+    
+    if summary['alerts_raised'] or summary['alerts_updated']:
+        feed_cache.invalidate('alerts')
+    return summary
+
+@app.cli.command('aggregate-outbreaks')
+@click.option('--follow', is_flag=True, help='Keep running, polling for new predictions.')
+@click.option('--interval', default=30.0, show_default=True, help='Seconds between polls once caught up.')
+def aggregate_outbreaks_command(follow, interval):
+    """Fold new predictions into the outbreak rollup and raise alerts"""
+    while True:
+        summary = run_outbreak_aggregation()
+        if summary is None:
+            print("Database connection failed")
+        elif summary['processed']:
+            print(f"Processed {summary['processed']} predictions up to id {summary['watermark']}: "
+                  f"{summary['buckets']} buckets, {summary['alerts_raised']} alerts raised, "
+                  f"{summary['alerts_updated']} updated")
+        
+        if not follow:
+            return
+        # Caught up (or failing): wait; otherwise go straight on to the next batch
+        if summary is None or summary['processed'] < OUTBREAK_CONFIG['batch_size']:
+            time.sleep(interval)
+
+@app.cli.command('backfill-outbreak-cases')
+def backfill_outbreak_cases_command():
+    """Record distinct-user cases for predictions aggregated before migration 0010, batch by batch"""
+    config = {key: OUTBREAK_CONFIG[key] for key in ('bucket_minutes', 'batch_size', 'regions')}
+    while True:
+        with db_connection() as connection:
+            if not connection:
+                print("Database connection failed")
+                return
+            summary = backfill_outbreak_cases(connection, **config)
+        
+        if not summary['processed']:
+            print(f"Backfilled every prediction up to id {summary['until']}")
+            return
+        print(f"Backfilled {summary['processed']} predictions up to id {summary['watermark']} of {summary['until']}: "
+              f"{summary['buckets']} buckets recounted")
+
+# Health trends, read from the user_risk_series rollup
+HEALTH_TREND_DEFAULT_DAYS = 30
+HEALTH_TREND_MAX_DAYS = 3660
+HEALTH_TREND_DAILY_MAX_DAYS = 90  # 'auto' switches to weekly buckets beyond this
+HEALTH_TREND_DEFAULT_POINTS = 60
+HEALTH_TREND_MAX_POINTS = 366
+
+RISK_SERIES_SQL = '''
+    SELECT bucket_start, prediction_count, risk_score_sum, risk_score_max, high_risk_count
+    FROM user_risk_series
+    WHERE user_id = %s AND granularity = %s AND bucket_start >= %s
+    ORDER BY bucket_start
+'''
+
+def parse_health_trend_args(args):
+    """(days, granularity, points) from query arguments; raises ValueError if invalid"""
+    days = args.get('days', HEALTH_TREND_DEFAULT_DAYS, type=int)
+    if not 1 <= days <= HEALTH_TREND_MAX_DAYS:
+        raise ValueError(f'days must be between 1 and {HEALTH_TREND_MAX_DAYS}')
+    granularity = args.get('granularity', 'auto')
+    if granularity not in ('auto', 'day', 'week'):
+        raise ValueError('granularity must be auto, day or week')
+    points = args.get('points', HEALTH_TREND_DEFAULT_POINTS, type=int)
+    if not 1 <= points <= HEALTH_TREND_MAX_POINTS:
+        raise ValueError(f'points must be between 1 and {HEALTH_TREND_MAX_POINTS}')
+    return days, granularity, points
+
+def health_trend_range(days=HEALTH_TREND_DEFAULT_DAYS, granularity='auto'):
+    """(granularity, start, end) of a trend over the last `days` days, 'auto' resolved"""
+    if granularity == 'auto':
+        granularity = 'day' if days <= HEALTH_TREND_DAILY_MAX_DAYS else 'week'
+    
+    today = date.today()
+    start = today - timedelta(days=days - 1)
+    if granularity == 'week':
+        start -= timedelta(days=start.weekday())
+    return granularity, start, today
+
+def health_trend_query(user_id, trend_range):
+    granularity, start, _ = trend_range
+    return RISK_SERIES_SQL, (user_id, granularity, start)
+
+route_query('user.risk_series', lambda: health_trend_query(1, health_trend_range(HEALTH_TREND_DEFAULT_DAYS, 'auto')))
+route_query('user.risk_series_weekly', lambda: health_trend_query(1, health_trend_range(365, 'week')))
+
+def load_health_trend(cursor, user_id, days=HEALTH_TREND_DEFAULT_DAYS, granularity='auto',
+                      points=HEALTH_TREND_DEFAULT_POINTS):
+    """A user's risk trend over the last `days` days, with at most `points` points"""
+    trend_range = health_trend_range(days, granularity)
+    cursor.execute(*health_trend_query(user_id, trend_range))
+    return health_trend_from_rows(cursor.fetchall(), trend_range, points)
+
+def health_trend_from_rows(rows, trend_range, points=HEALTH_TREND_DEFAULT_POINTS):
+    """Trend payload from user_risk_series rows.
+
+    Buckets are read in one primary-key range. When the range holds more buckets
+    than `points`, consecutive buckets are merged into equal-width windows, so
+    averages stay exact and each point covers the same span of time.
+    """
+    granularity, start, today = trend_range
+    bucket_days = 1 if granularity == 'day' else 7
+    
+    buckets = ((today - start).days // bucket_days) + 1
+    window = -(-buckets // points)
+    merged = {}
+    for bucket_start, count, risk_score_sum, risk_score_max, high_risk in rows:
+        index = (bucket_start - start).days // bucket_days // window
+        totals = merged.setdefault(index, [0, 0, 0, 0])
+        totals[0] += count
+        totals[1] += risk_score_sum
+        totals[2] = max(totals[2], risk_score_max)
+        totals[3] += high_risk
+    
+    return {
+        'granularity': granularity,
+        'bucket_days': bucket_days * window,
+        'points': [{
+            'date': (start + timedelta(days=index * window * bucket_days)).isoformat(),
+            'predictions': count,
+            'avg_risk_score': round(risk_score_sum / count, 1) if count else None,
+            'max_risk_score': risk_score_max,
+            'high_risk': high_risk
+        } for index, (count, risk_score_sum, risk_score_max, high_risk) in sorted(merged.items())]
+    }
+
 # Dashboard route
 @app.route('/api/dashboard', methods=['GET'])
 @jwt_required()
@@ -485,31 +2406,32 @@ def get_dashboard_data():
     try:
         user_id = get_jwt_identity()
         
-        connection = get_db_connection()
-        if not connection:
+        try:
+            days, granularity, points = parse_health_trend_args(request.args)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        
+        # The stats rollup with the recent community alerts count, the trend and the
+        # latest predictions are independent, so they can be queried concurrently
+        trend_range = health_trend_range(days, granularity)
+        results = run_read_queries([
+            user_stats_query(user_id, with_alerts_count=True),
+            health_trend_query(user_id, trend_range),
+            (PREDICTION_HISTORY_SQL, (user_id,))
+        ])
+        if results is None:
             return jsonify({'message': 'Database connection failed'}), 500
         
-        cursor = connection.cursor()
-        
-        # Get user's average risk score
-        cursor.execute('SELECT AVG(risk_score) FROM predictions WHERE user_id = %s', (user_id,))
-        avg_risk = cursor.fetchone()[0] or 85
-        
-        # Get recent predictions count
-        cursor.execute('SELECT COUNT(*) FROM predictions WHERE user_id = %s', (user_id,))
-        prediction_count = cursor.fetchone()[0] or 0
-        
-        # Get community alerts count
-        cursor.execute('SELECT COUNT(*) FROM community_alerts WHERE created_at >= DATE_SUB(NOW(), INTERVAL 7 DAY)')
-        alerts_count = cursor.fetchone()[0] or 0
-        
-        cursor.close()
-        connection.close()
+        stats_rows, trend_rows, prediction_rows = results
+        prediction_count, avg_risk, _, alerts_count = user_stats_from_row(stats_rows[0])
+        health_trend = health_trend_from_rows(trend_rows, trend_range, points)
+        predictions = list(map(prediction_from_row, prediction_rows))
         
         return jsonify({
-            'riskScore': int(avg_risk),
-            'recentPredictions': [],
-            'healthTrends': [],
+            'riskScore': avg_risk or 85,
+            'recentPredictions': predictions,
+            'healthTrends': health_trend['points'],
+            'healthTrendGranularity': health_trend['granularity'],
             'communityAlerts': [],
             'predictionCount': prediction_count,
             'alertsCount': alerts_count
@@ -525,36 +2447,14 @@ def get_user_profile():
     try:
         user_id = get_jwt_identity()
         
-        connection = get_db_connection()
-        if not connection:
+        cached = profile_cache.get_or_load(profile_namespace(user_id), 'profile', lambda: load_user_profile(user_id))
+        if cached is None:
             return jsonify({'message': 'Database connection failed'}), 500
         
-        cursor = connection.cursor()
-        cursor.execute('''
-            SELECT name, email, phone, age, gender, medical_history, lifestyle, emergency_contact
-            FROM users WHERE id = %s
-        ''', (user_id,))
-        
-        user = cursor.fetchone()
-        if not user:
-            return jsonify({'message': 'User not found'}), 404
-        
-        profile = {
-            'name': user[0],
-            'email': user[1],
-            'phone': user[2],
-            'age': user[3],
-            'gender': user[4],
-            'medical_history': user[5],
-            'lifestyle': user[6],
-            'emergency_contact': user[7]
-        }
-        
-        cursor.close()
-        connection.close()
-        
-        return jsonify({'profile': profile}), 200
+        return cached_json_response(cached)
         
+    except UserNotFound as e:
+        return jsonify({'message': str(e)}), 404
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
@@ -565,68 +2465,79 @@ def update_user_profile():
         user_id = get_jwt_identity()
         data = request.get_json()
         
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'message': 'Database connection failed'}), 500
+        with db_connection() as connection:
+            if not connection:
+                return jsonify({'message': 'Database connection failed'}), 500
         
-        cursor = connection.cursor()
-        cursor.execute('''
-            UPDATE users SET 
-                name = %s, email = %s, phone = %s, age = %s, gender = %s,
-                medical_history = %s, lifestyle = %s, emergency_contact = %s
-            WHERE id = %s
-        ''', (
-            data.get('name'),
-            data.get('email'),
-            data.get('phone'),
-            data.get('age'),
-            data.get('gender'),
-            data.get('medical_history'),
-            data.get('lifestyle'),
-            data.get('emergency_contact'),
-            user_id
-        ))
+            cursor = connection.cursor()
+            cursor.execute('''
+                UPDATE users SET 
+                    name = %s, email = %s, phone = %s, age = %s, gender = %s,
+                    medical_history = %s, lifestyle = %s, emergency_contact = %s
+                WHERE id = %s
+            ''', (
+                data.get('name'),
+                data.get('email'),
+                data.get('phone'),
+                data.get('age'),
+                data.get('gender'),
+                data.get('medical_history'),
+                data.get('lifestyle'),
+                data.get('emergency_contact'),
+                user_id
+            ))
         
-        connection.commit()
-        cursor.close()
-        connection.close()
+            connection.commit()
+            cursor.close()
+        
+        profile_cache.invalidate(profile_namespace(user_id))
         
         return jsonify({'message': 'Profile updated successfully'}), 200
         
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
-@app.route('/api/user/health-stats', methods=['GET'])
+@app.route('/api/user/health-trends', methods=['GET'])
 @jwt_required()
-def get_health_stats():
+def get_health_trends():
     try:
         user_id = get_jwt_identity()
         
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'message': 'Database connection failed'}), 500
+        try:
+            days, granularity, points = parse_health_trend_args(request.args)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
         
-        cursor = connection.cursor()
+        with db_connection() as connection:
+            if not connection:
+                return jsonify({'message': 'Database connection failed'}), 500
         
-        # Get predictions count
-        cursor.execute('SELECT COUNT(*) FROM predictions WHERE user_id = %s', (user_id,))
-        predictions_made = cursor.fetchone()[0] or 0
+            cursor = connection.cursor()
+            health_trend = load_health_trend(cursor, user_id, days, granularity, points)
+            cursor.close()
         
-        # Get average risk score
-        cursor.execute('SELECT AVG(risk_score) FROM predictions WHERE user_id = %s', (user_id,))
-        avg_risk_score = cursor.fetchone()[0] or 0
+        return jsonify(health_trend), 200
         
-        # Get vlogs count
-        cursor.execute('SELECT COUNT(*) FROM vlogs WHERE user_id = %s', (user_id,))
-        vlogs_shared = cursor.fetchone()[0] or 0
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+
+@app.route('/api/user/health-stats', methods=['GET'])
+@jwt_required()
+def get_health_stats():
+    try:
+        user_id = get_jwt_identity()
         
-        cursor.close()
-        connection.close()
+        results = run_read_queries([user_stats_query(user_id)])
+        if results is None:
+            return jsonify({'message': 'Database connection failed'}), 500
+        
+        # Get user's stats rollup
+        predictions_made, avg_risk_score, vlogs_shared, _ = user_stats_from_row(results[0][0])
         
         return jsonify({
             'stats': {
                 'predictions_made': predictions_made,
-                'avg_risk_score': int(avg_risk_score),
+                'avg_risk_score': avg_risk_score,
                 'vlogs_shared': vlogs_shared,
                 'community_score': random.randint(70, 95)  # Mock community score
             }
@@ -635,6 +2546,225 @@ def get_health_stats():
     except Exception as e:
         return jsonify({'message': str(e)}), 500
 
+# System routes
+@app.route('/api/system/db-pool', methods=['GET'])
+@jwt_required()
+def get_db_pool_stats():
+    return jsonify({'pool': db_pool.stats()}), 200
+
+@app.route('/api/system/async-db', methods=['GET'])
+@jwt_required()
+def get_async_db_stats():
+    return jsonify({'enabled': bool(async_read_pool), 'pool': async_read_pool.stats() if async_read_pool else None}), 200
+
+@app.route('/api/system/cache', methods=['GET'])
+@jwt_required()
+def get_cache_stats():
+    return jsonify({'feed_cache': feed_cache.stats(), 'prediction_cache': prediction_cache.stats()}), 200
+
+@app.route('/api/system/compression', methods=['GET'])
+@jwt_required()
+def get_compression_stats():
+    return jsonify({'json_encoder': json_codec.encoder, 'compression': response_compressor.stats()}), 200
+
+@app.route('/api/system/media', methods=['GET'])
+@jwt_required()
+def get_media_stats():
+    return jsonify({'thumbnail_pool': thumbnail_pool.stats()}), 200
+
+@app.route('/api/system/rate-limits', methods=['GET'])
+@jwt_required()
+def get_rate_limit_stats():
+    return jsonify({'enabled': bool(rate_limiter), 'rate_limits': rate_limiter.stats() if rate_limiter else None}), 200
+
+@app.route('/api/system/like-buffer', methods=['GET'])
+@jwt_required()
+def get_like_buffer_stats():
+    return jsonify({'like_buffer': like_buffer.stats()}), 200
+
+@app.route('/api/system/password-hasher', methods=['GET'])
+@jwt_required()
+def get_password_hasher_stats():
+    return jsonify({'password_hasher': password_hasher.stats()}), 200
+
+@app.route('/api/system/prediction-writer', methods=['GET'])
+@jwt_required()
+def get_prediction_writer_stats():
+    return jsonify({'durability': PREDICTION_DURABILITY, 'prediction_writer': prediction_writer.stats()}), 200
+
+@app.route('/api/system/alert-stream', methods=['GET'])
+@jwt_required()
+def get_alert_stream_stats():
+    return jsonify({'alert_broker': alert_broker.stats()}), 200
+
+@app.route('/api/system/outbreaks', methods=['GET'])
+@jwt_required()
+def get_outbreak_aggregation_stats():
+    try:
+        with db_connection() as connection:
+            if not connection:
+                return jsonify({'message': 'Database connection failed'}), 500
+            
+            cursor = connection.cursor()
+            cursor.execute('SELECT last_id, updated_at FROM aggregation_watermarks WHERE name = %s', (OUTBREAK_WATERMARK,))
+            watermark = cursor.fetchone()
+            cursor.execute('SELECT COALESCE(MAX(id), 0) FROM predictions')
+            latest_id = cursor.fetchone()[0]
+            cursor.close()
+        
+        last_id = watermark[0] if watermark else 0
+        return jsonify({
+            'config': OUTBREAK_CONFIG,
+            'watermark': last_id,
+            'last_advanced': watermark[1].isoformat() if watermark and watermark[1] else None,
+            'pending_predictions': latest_id - last_id
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'message': str(e)}), 500
+
+@app.route('/api/system/model', methods=['GET'])
+@jwt_required()
+def get_model_info():
+    if symptom_model is None:
+        return jsonify({'engine': 'rules', 'rules': len(SYMPTOM_RULES)}), 200
+    return jsonify({
+        'engine': 'model',
+        'version': symptom_model.version,
+        'vocabulary_size': len(symptom_model.vocabulary),
+        'conditions': len(symptom_model.conditions),
+        'load_ms': round(symptom_model.load_seconds * 1000, 3)
+    }), 200
+
+def component_gauges():
+    """Numeric stats of the pool, caches, buffers and hasher as symptrack_<component>_<stat> gauges"""
+    components = {
+        'db_pool': db_pool.stats(),
+        'feed_cache': feed_cache.stats(),
+        'prediction_cache': prediction_cache.stats(),
+        'like_buffer': like_buffer.stats(),
+        'password_hasher': password_hasher.stats(),
+        'prediction_writer': prediction_writer.stats(),
+        'alert_broker': alert_broker.stats(),
+        'response_compressor': response_compressor.stats(),
+        'thumbnail_pool': thumbnail_pool.stats()
+    }
+    if async_read_pool:
+        components['async_db_pool'] = async_read_pool.stats()
+    if rate_limiter:
+        components['rate_limiter'] = rate_limiter.stats()
+    return {
+        f'symptrack_{component}_{name}': value
+        for component, stats in components.items()
+        for name, value in stats.items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+
+request_metrics.add_collector(component_gauges)
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    if METRICS_CONFIG['token'] and request.headers.get('Authorization') != f"Bearer {METRICS_CONFIG['token']}":
+        return jsonify({'message': 'Invalid metrics token'}), 401
+    return app.response_class(request_metrics.render(), mimetype='text/plain; version=0.0.4')
+
+# Model training
+def rule_bootstrap_examples(count, seed=0):
+    """Synthetic (input, condition names) pairs labelled by the rule table"""
+    rng = random.Random(seed)
+    keywords = sorted({keyword for group in SYMPTOM_KEYWORDS.values() for keyword in group})
+    fillers = ['and', 'since', 'yesterday', 'mild', 'severe', 'some', 'back', 'pain', 'with', 'a']
+    examples = []
+    for _ in range(count):
+        words = rng.sample(keywords, rng.randint(1, 4)) + rng.sample(fillers, rng.randint(0, 3))
+        rng.shuffle(words)
+        item = {
+            'symptoms': ' '.join(words),
+            'age': rng.choice([None, rng.randint(1, 95)]),
+            'gender': rng.choice([None, 'male', 'female', 'other']),
+            'lifestyle': None,
+            'medical_history': None
+        }
+        conditions, _ = symptom_matcher.evaluate(item['symptoms'])
+        examples.append((item, [condition['name'] for condition in conditions]))
+    return examples
+
+@app.cli.command('train-symptom-model')
+@click.argument('output', type=click.Path(file_okay=False))
+@click.option('--version', 'model_version', required=True, help='Version string stored in the artifact.')
+@click.option('--examples', type=click.Path(exists=True, dir_okay=False),
+              help='JSONL of labelled inputs: predict fields plus a "conditions" list of names.')
+@click.option('--bootstrap', default=0, show_default=True,
+              help='Number of synthetic examples to generate from the rule table.')
+@click.option('--epochs', default=300, show_default=True)
+def train_symptom_model_command(output, model_version, examples, bootstrap, epochs):
+    """Train a symptom model artifact for PREDICTION_MODEL_PATH"""
+    from symptom_model import train  # needs numpy and scipy
+    
+    labelled = rule_bootstrap_examples(bootstrap) if bootstrap else []
+    if examples:
+        with open(examples) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    labelled.append(({
+                        'symptoms': record['symptoms'],
+                        'age': record.get('age'),
+                        'gender': record.get('gender'),
+                        'lifestyle': record.get('lifestyle'),
+                        'medical_history': record.get('medicalHistory')
+                    }, record.get('conditions', [])))
+    if not labelled:
+        raise click.ClickException('No training examples; pass --examples and/or --bootstrap')
+    
+    conditions = [
+        {'name': rule['name'], 'risk_level': rule['risk_level'], 'risk_score': rule.get('risk_score')}
+        for rule in SYMPTOM_RULES
+    ]
+    try:
+        model = train([item for item, _ in labelled], [names for _, names in labelled], conditions,
+                      model_version, epochs=epochs)
+    except (ImportError, ValueError) as e:
+        raise click.ClickException(str(e))
+    model.save(output)
+    print(f"Trained model {model_version} on {len(labelled)} examples ({len(model.vocabulary)} terms) -> {output}")
+
+# Query plan check
+def route_queries():
+    """(label, sql, params) for every registered route query, with representative parameters"""
+    return [(label, *build()) for label, build in ROUTE_QUERIES]
+
+@app.cli.command('check-query-plans')
+@click.option('--min-rows', default=100, show_default=True,
+              help='Ignore full scans of tables estimated below this many rows.')
+def check_query_plans_command(min_rows):
+    """EXPLAIN every route query and fail if any of them full-scans a table"""
+    with db_connection() as connection:
+        if not connection:
+            raise click.ClickException('Database connection failed')
+        full_scans = find_full_scans(connection, route_queries(), min_rows=min_rows)
+    
+    for scan in full_scans:
+        print(f"{scan['query']}: full scan of {scan['table']} (~{scan['rows']} rows)")
+    if full_scans:
+        raise click.ClickException(f'{len(full_scans)} route queries do a full table scan')
+    print("No full table scans in route queries")
+
+# Shutdown
+def shutdown():
+    """Flush buffered writes and release worker resources; safe to call more than once"""
+    like_buffer.close()
+    prediction_writer.close()
+    alert_broker.close()
+    thumbnail_pool.close()
+    password_hasher.close()
+    if async_read_pool:
+        async_read_pool.close()
+    db_pool.close()
+
+atexit.register(shutdown)
+
 if __name__ == '__main__':
+    # Development server only; production runs under gunicorn (see gunicorn.conf.py)
     init_database()
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,184 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+
+class AsyncReadUnavailable(Exception):
+    """Raised when the async pool could not be started or reached, or a batch failed or timed out"""
+
+
+class AsyncReadPool:
+    """Read queries on an asyncio MySQL pool, callable from synchronous request handlers.
+
+    One event loop thread per process owns an aiomysql pool. `fetch` hands it a batch
+    of (sql, params) queries and blocks the calling request thread until all of them
+    have finished; the batch runs concurrently, one pooled connection per query, and
+    the loop keeps the queries of every waiting request in flight at once over at
+    most `size` connections. Connections run in autocommit mode, so each query sees
+    the latest committed data rather than a snapshot held over from an earlier one.
+
+    The pool is started by the first request that needs it, outside the lock, so
+    requests arriving meanwhile fall back at once instead of queueing behind the
+    connect. After a failed start none is attempted for `retry_interval` seconds.
+    """
+
+    def __init__(self, db_config, size=20, timeout=5.0, query_timeout=10.0, retry_interval=5.0):
+        self.db_config = db_config
+        self.size = size
+        self.timeout = timeout
+        self.query_timeout = query_timeout
+        self.retry_interval = retry_interval
+
+        self._loop = None
+        self._pool = None
+        self._thread = None
+        self._starting = False
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+        self.batches = 0
+        self.queries = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._pool is not None:
+                return
+            if self._starting:
+                raise AsyncReadUnavailable("The async database pool is still starting")
+            if time.monotonic() < self._retry_at:
+                raise AsyncReadUnavailable("The async database pool failed to start recently")
+            self._starting = True
+
+        try:
+            loop, thread, pool = self._start()
+        except AsyncReadUnavailable:
+            with self._lock:
+                self._starting = False
+                self._retry_at = time.monotonic() + self.retry_interval
+            raise
+        with self._lock:
+            self._starting = False
+            self._loop, self._thread, self._pool = loop, thread, pool
+
+    def _start(self):
+        try:
+            import aiomysql  # optional dependency, only needed for the async read path
+        except ImportError as e:
+            raise AsyncReadUnavailable(f"The async read path needs the aiomysql package: {e}")
+
+        # Started lazily so each forked server worker gets its own loop and connections
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name='async-read-loop', daemon=True)
+        thread.start()
+        create_pool = aiomysql.create_pool(
+            minsize=0,
+            maxsize=self.size,
+            autocommit=True,
+            host=self.db_config['host'],
+            user=self.db_config['user'],
+            password=self.db_config['password'],
+            db=self.db_config['database']
+        )
+        try:
+            pool = asyncio.run_coroutine_threadsafe(create_pool, loop).result(self.timeout)
+        except Exception as e:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=1)
+            raise AsyncReadUnavailable(f"Could not start the async database pool: {e}")
+        return loop, thread, pool
+
+    async def _run(self, sql, params):
+        started = time.perf_counter()
+        try:
+            connection = await asyncio.wait_for(self._pool.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise AsyncReadUnavailable(f"No async database connection available after {self.timeout}s")
+        except Exception as e:
+            self.errors += 1
+            raise AsyncReadUnavailable(f"Error connecting to MySQL: {e}")
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            async with connection.cursor() as cursor:
+                await cursor.execute(sql, params)
+                rows = await cursor.fetchall()
+        except BaseException:
+            # The connection may be mid-result; drop it rather than hand it to the next query
+            self.errors += 1
+            connection.close()
+            raise
+        finally:
+            self.in_flight -= 1
+            self._pool.release(connection)
+        return list(rows), time.perf_counter() - started
+
+    async def _run_batch(self, queries):
+        return await asyncio.gather(*(self._run(sql, params) for sql, params in queries))
+
+    def fetch(self, queries):
+        """Run (sql, params) queries concurrently; returns [(rows, seconds), ...] in query order"""
+        self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(self._run_batch(queries), self._loop)
+        try:
+            results = future.result(self.query_timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise AsyncReadUnavailable(f"Queries did not finish within {self.query_timeout}s")
+        except (asyncio.TimeoutError, TimeoutError) as e:
+            # Raised inside the loop, e.g. by the driver; distinct from the above before Python 3.11
+            with self._lock:
+                self.timeouts += 1
+            raise AsyncReadUnavailable(f"Async database query timed out: {e}")
+        except AsyncReadUnavailable:
+            raise
+        except Exception as e:
+            # Driver errors (a dropped connection, the server going away) are retried on the
+            # connection pool like timeouts; a bad query fails there again with its real error
+            raise AsyncReadUnavailable(f"Async database query failed: {e}") from e
+        with self._lock:
+            self.batches += 1
+            self.queries += len(queries)
+        return results
+
+    def close(self):
+        with self._lock:
+            loop, pool, thread = self._loop, self._pool, self._thread
+            self._loop = self._pool = self._thread = None
+        if pool is None:
+            return
+
+        async def close_pool():
+            pool.close()
+            await pool.wait_closed()
+
+        try:
+            asyncio.run_coroutine_threadsafe(close_pool(), loop).result(self.timeout)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=self.timeout)
+
+    def stats(self):
+        with self._lock:
+            pool = self._pool
+            return {
+                'size': self.size,
+                'started': pool is not None,
+                'open': pool.size if pool else 0,
+                'idle': pool.freesize if pool else 0,
+                'in_flight': self.in_flight,
+                'max_in_flight': self.max_in_flight,
+                'batches': self.batches,
+                'queries': self.queries,
+                'timeouts': self.timeouts,
+                'errors': self.errors
+            }
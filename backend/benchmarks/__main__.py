@@ -0,0 +1,183 @@
+"""Benchmark suite for the API and the prediction engine.
+
+Run from backend/:
+    python -m benchmarks seed --users 200 --predictions 50000
+    python -m benchmarks routes --url http://localhost:5000 --output results.json
+    python -m benchmarks predict --baseline benchmarks/baseline-predict.json
+
+Every command prints its results as JSON. With --baseline, a p95 or throughput
+regression beyond --tolerance makes the command exit with status 1;
+--save-baseline writes the results as the new baseline instead.
+"""
+import json
+import random
+import sys
+import time
+import urllib.request
+
+import click
+
+from benchmarks.harness import HttpClient, compare, drive, time_calls
+
+
+def report(results, output, baseline, save_baseline, tolerance):
+    text = json.dumps(results, indent=2)
+    click.echo(text)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text + '\n')
+    if save_baseline:
+        with open(save_baseline, 'w') as f:
+            f.write(text + '\n')
+        click.echo(f'Saved baseline to {save_baseline}', err=True)
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare(results, json.load(f), tolerance)
+        for regression in regressions:
+            click.echo(f'REGRESSION {regression}', err=True)
+        if regressions:
+            sys.exit(1)
+        click.echo(f'No regressions against {baseline} (tolerance {tolerance:.0%})', err=True)
+
+
+def reporting_options(command):
+    command = click.option('--output', type=click.Path(dir_okay=False), help='Also write results to this file.')(command)
+    command = click.option('--baseline', type=click.Path(exists=True, dir_okay=False),
+                           help='Fail on regressions against this results file.')(command)
+    command = click.option('--save-baseline', type=click.Path(dir_okay=False),
+                           help='Write results as the new baseline.')(command)
+    command = click.option('--tolerance', default=0.2, show_default=True,
+                           help='Allowed relative slowdown before a result counts as a regression.')(command)
+    return command
+
+
+@click.group()
+def cli():
+    pass
+
+
+@cli.command()
+@click.option('--users', default=100, show_default=True)
+@click.option('--predictions', default=10000, show_default=True)
+@click.option('--vlogs', default=1000, show_default=True)
+@click.option('--alerts', default=200, show_default=True)
+@click.option('--days', default=90, show_default=True, help='Spread created_at over this many past days.')
+def seed(users, predictions, vlogs, alerts, days):
+    """Seed the DB_* database with synthetic users, predictions, vlogs and alerts"""
+    from benchmarks.seed import seed as seed_database
+
+    started = time.perf_counter()
+    seeded = seed_database(users, predictions, vlogs, alerts, days)
+    click.echo(json.dumps({
+        'users': len(seeded),
+        'first_user': seeded[0][0] if seeded else None,
+        'predictions': predictions,
+        'vlogs': vlogs,
+        'alerts': alerts,
+        'seconds': round(time.perf_counter() - started, 2)
+    }))
+
+
+def route_scenarios(vlog_ids):
+    """name -> scenario(client, n) for every /api route"""
+    run_id = int(time.time())
+    symptoms = ['fever and cough', 'headache with nausea', 'chest pain', 'stomach ache', 'tired and hot']
+    return {
+        'POST /api/auth/register': lambda client, n: HttpClient(client.base_url).request('POST', '/api/auth/register', {
+            'name': 'Bench', 'email': f'bench-register-{run_id}-{n}@example.com', 'password': 'bench-password'
+        }),
+        'POST /api/auth/login': lambda client, n: HttpClient(client.base_url).request('POST', '/api/auth/login', {
+            'email': client.email, 'password': 'bench-password'
+        }),
+        'GET /api/auth/me': lambda client, n: client.request('GET', '/api/auth/me'),
+        'POST /api/predictions/predict': lambda client, n: client.request('POST', '/api/predictions/predict', {
+            'symptoms': symptoms[n % len(symptoms)], 'age': 20 + n % 60
+        }),
+        'POST /api/predictions/predict/batch': lambda client, n: client.request('POST', '/api/predictions/predict/batch', [
+            {'symptoms': symptoms[(n + i) % len(symptoms)], 'age': 20 + i} for i in range(50)
+        ]),
+        'GET /api/predictions/history': lambda client, n: client.request('GET', '/api/predictions/history'),
+        'GET /api/predictions/export': lambda client, n: client.request('GET', '/api/predictions/export'),
+        'GET /api/vlogs': lambda client, n: client.request('GET', '/api/vlogs'),
+        'POST /api/vlogs/<id>/like': lambda client, n: client.request(
+            'POST', f'/api/vlogs/{vlog_ids[n % len(vlog_ids)]}/like'
+        ) if vlog_ids else 200,
+        'GET /api/alerts': lambda client, n: client.request('GET', '/api/alerts'),
+        'GET /api/dashboard': lambda client, n: client.request('GET', '/api/dashboard'),
+        'GET /api/user/profile': lambda client, n: client.request('GET', '/api/user/profile'),
+        'PUT /api/user/profile': lambda client, n: client.request('PUT', '/api/user/profile', {
+            'name': client.name, 'email': client.email, 'age': 40
+        }),
+        'GET /api/user/health-stats': lambda client, n: client.request('GET', '/api/user/health-stats')
+    }
+
+
+@cli.command()
+@click.option('--url', default='http://localhost:5000', show_default=True, help='Running server to drive.')
+@click.option('--first-user', default=1, show_default=True,
+              help='Number in the email of the first seeded user to log in as (printed by seed).')
+@click.option('--concurrency', default=16, show_default=True)
+@click.option('--requests', 'requests_per_client', default=50, show_default=True,
+              help='Requests per concurrent client, per route.')
+@click.option('--route', 'only_routes', multiple=True, help='Only benchmark routes containing this text.')
+@reporting_options
+def routes(url, first_user, concurrency, requests_per_client, only_routes, output, baseline, save_baseline, tolerance):
+    """Drive every /api route with concurrent clients against a seeded server"""
+    clients = []
+    for offset in range(concurrency):
+        email = f'bench-user-{first_user + offset}@example.com'
+        client = HttpClient(url).login(email, 'bench-password')
+        client.email = email
+        client.name = f'Bench User {first_user + offset}'
+        clients.append(client)
+
+    request = urllib.request.Request(url.rstrip('/') + '/api/vlogs?limit=100')
+    request.add_header('Authorization', f'Bearer {clients[0].token}')
+    with urllib.request.urlopen(request) as response:
+        vlog_ids = [vlog['id'] for vlog in json.loads(response.read())['vlogs']]
+
+    results = {}
+    for name, scenario in route_scenarios(vlog_ids).items():
+        if only_routes and not any(text in name for text in only_routes):
+            continue
+        click.echo(f'Benchmarking {name}', err=True)
+        results[name] = drive(clients, scenario, concurrency, requests_per_client)
+    report(results, output, baseline, save_baseline, tolerance)
+
+
+@cli.command()
+@click.option('--iterations', default=20000, show_default=True)
+@click.option('--batch-size', default=500, show_default=True)
+@reporting_options
+def predict(iterations, batch_size, output, baseline, save_baseline, tolerance):
+    """Microbenchmark predict_disease and the scoring engine without a database"""
+    import app
+    from benchmarks.seed import SYMPTOM_SAMPLES
+
+    rng = random.Random(0)
+    words = sorted({word for sample in SYMPTOM_SAMPLES for word in sample.replace(',', '').split()})
+    unique_inputs = [' '.join(rng.sample(words, rng.randint(2, 6))) for _ in range(iterations)]
+    inputs = iter(unique_inputs)
+
+    def scoring_only():
+        app.score_symptoms([{'symptoms': next(inputs), 'age': 40, 'gender': None,
+                             'lifestyle': None, 'medical_history': None}])
+
+    items = [{'symptoms': symptoms, 'age': 40} for symptoms in unique_inputs[:batch_size]]
+
+    def batch():
+        app.prediction_cache = app.PredictionCache(app.prediction_engine_fingerprint)
+        app.predict_many(items)
+
+    results = {'score_symptoms': time_calls(scoring_only, iterations)}
+
+    app.prediction_cache = app.PredictionCache(app.prediction_engine_fingerprint, max_entries=iterations)
+    inputs = iter(unique_inputs)
+    results['predict_disease (memo miss)'] = time_calls(lambda: app.predict_disease(next(inputs), 40), iterations)
+    results['predict_disease (memo hit)'] = time_calls(lambda: app.predict_disease(unique_inputs[0], 40), iterations)
+    results[f'predict_many ({batch_size} items)'] = time_calls(batch, max(1, iterations // batch_size))
+    report(results, output, baseline, save_baseline, tolerance)
+
+
+if __name__ == '__main__':
+    cli()
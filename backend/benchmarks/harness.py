@@ -0,0 +1,118 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, elapsed, errors=0):
+    """Latency percentiles (ms) and throughput for one benchmark"""
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else 0.0
+    }
+
+
+def time_calls(fn, iterations):
+    """Call fn() `iterations` times on this thread and summarize the latencies"""
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+class HttpClient:
+    """Minimal JSON client for driving a running server"""
+
+    def __init__(self, base_url, token=None):
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+
+    def request(self, method, path, body=None):
+        """Send a request and return the status code; the body is read and discarded"""
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method)
+        request.add_header('Content-Type', 'application/json')
+        if self.token:
+            request.add_header('Authorization', f'Bearer {self.token}')
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+    def login(self, email, password):
+        request = urllib.request.Request(
+            self.base_url + '/api/auth/login',
+            data=json.dumps({'email': email, 'password': password}).encode('utf-8'),
+            method='POST'
+        )
+        request.add_header('Content-Type', 'application/json')
+        with urllib.request.urlopen(request) as response:
+            self.token = json.loads(response.read())['token']
+        return self
+
+
+def drive(clients, scenario, concurrency, requests_per_client):
+    """Run `scenario(client, n)` -> status from `concurrency` threads and summarize.
+
+    Each thread uses its own client (cycling through `clients`) and sends
+    `requests_per_client` requests; any status of 400 or above counts as an error.
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker(worker_index):
+        client = clients[worker_index % len(clients)]
+        local = []
+        local_errors = 0
+        for n in range(requests_per_client):
+            started = time.perf_counter()
+            status = scenario(client, worker_index * requests_per_client + n)
+            local.append(time.perf_counter() - started)
+            if status >= 400:
+                local_errors += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, errors[0])
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of `results` against `baseline`: p95 slower or throughput lower by more than `tolerance`"""
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if not expected:
+            continue
+        if expected['p95_ms'] and result['p95_ms'] > expected['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95_ms']}ms vs baseline {expected['p95_ms']}ms")
+        if expected['throughput_rps'] and result['throughput_rps'] < expected['throughput_rps'] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {result['throughput_rps']} rps vs baseline {expected['throughput_rps']} rps"
+            )
+    return regressions
@@ -0,0 +1,122 @@
+"""Seed the configured MySQL database (DB_* environment variables) with synthetic data.
+
+Point DB_NAME at a scratch database: seeding appends rows to every table.
+"""
+import json
+import random
+from datetime import datetime, timedelta
+
+import app
+
+SEED_PASSWORD = 'bench-password'
+SEED_EMAIL = 'bench-user-{}@example.com'
+
+SYMPTOM_SAMPLES = [
+    'fever and cough', 'Fever, sore throat', 'headache with nausea', 'chest pain when breathing',
+    'stomach ache and vomiting', 'tired with body ache and fever', 'migraine and light sensitivity',
+    'diarrhea since yesterday', 'mild headache', 'back pain'
+]
+DISEASES = ['Flu', 'Migraine', 'Diabetes', 'Asthma', 'Hypertension', 'Gastroenteritis']
+ALERT_TYPES = ['Disease Outbreak', 'Environmental', 'Hospital Updates', 'Public Health', 'Emergency']
+SEVERITIES = ['Low', 'Medium', 'High', 'Critical']
+LOCATIONS = ['Hyderabad', 'Chennai', 'Bengaluru', 'Mumbai', 'Delhi']
+
+BATCH_SIZE = 1000
+
+
+def _insert(connection, sql, rows):
+    cursor = connection.cursor()
+    for start in range(0, len(rows), BATCH_SIZE):
+        cursor.executemany(sql, rows[start:start + BATCH_SIZE])
+        connection.commit()
+    cursor.close()
+
+
+def _read_user_ids(connection, labels):
+    """[(n, user id)] for the users seeded as SEED_EMAIL.format(n)"""
+    ids = {}
+    cursor = connection.cursor()
+    for start in range(0, len(labels), BATCH_SIZE):
+        emails = [SEED_EMAIL.format(n) for n in labels[start:start + BATCH_SIZE]]
+        cursor.execute(
+            f"SELECT id, email FROM users WHERE email IN ({', '.join(['%s'] * len(emails))})", emails
+        )
+        ids.update((email, user_id) for user_id, email in cursor.fetchall())
+    cursor.close()
+    return [(n, ids[SEED_EMAIL.format(n)]) for n in labels]
+
+
+def _random_time(rng, days):
+    return datetime.now() - timedelta(seconds=rng.randint(0, days * 86400))
+
+
+def seed(users=100, predictions=10000, vlogs=1000, alerts=200, days=90, seed_value=0):
+    """Create the schema and append synthetic rows; returns (n, user id) for every seeded user.
+
+    Every seeded user can log in as SEED_EMAIL.format(n) with SEED_PASSWORD. The
+    labels n start above the highest existing user id, so they never repeat an
+    earlier seed's; the ids are read back, as the server need not hand out
+    consecutive ones.
+    """
+    rng = random.Random(seed_value)
+    app.init_database()
+
+    with app.db_connection() as connection:
+        if not connection:
+            raise RuntimeError('Database connection failed')
+
+        # One hash shared by every seeded user keeps seeding fast at any cost factor
+        password_hash = app.password_hasher.hash(SEED_PASSWORD)
+        cursor = connection.cursor()
+        cursor.execute('SELECT COALESCE(MAX(id), 0) FROM users')
+        first_label = cursor.fetchone()[0] + 1
+        cursor.close()
+        labels = range(first_label, first_label + users)
+
+        _insert(connection, '''
+            INSERT INTO users (name, email, password_hash, age, gender)
+            VALUES (%s, %s, %s, %s, %s)
+        ''', [
+            (f'Bench User {n}', SEED_EMAIL.format(n), password_hash,
+             rng.randint(5, 90), rng.choice(['male', 'female', 'other']))
+            for n in labels
+        ])
+        seeded = _read_user_ids(connection, labels)
+        user_ids = [user_id for _, user_id in seeded]
+
+        prediction_rows = []
+        for _ in range(predictions):
+            symptoms = rng.choice(SYMPTOM_SAMPLES)
+            age = rng.randint(5, 90)
+            result = app.predict_disease(symptoms, age)
+            prediction_rows.append((
+                rng.choice(user_ids), symptoms, json.dumps({'age': age}), json.dumps(result),
+                result['risk_score'], result['risk_level'], _random_time(rng, days)
+            ))
+        _insert(connection, '''
+            INSERT INTO predictions (user_id, symptoms, additional_data, prediction_result, risk_score, risk_level, created_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ''', prediction_rows)
+
+        _insert(connection, '''
+            INSERT INTO vlogs (user_id, title, description, disease, medicines, hospitals, likes, created_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ''', [
+            (rng.choice(user_ids), f'My experience with {disease}', f'How I managed {disease.lower()} day to day',
+             disease, 'Paracetamol', 'City Hospital', rng.randint(0, 500), _random_time(rng, days))
+            for disease in (rng.choice(DISEASES) for _ in range(vlogs))
+        ])
+
+        _insert(connection, '''
+            INSERT INTO community_alerts (type, title, description, severity, location, affected_count, source, created_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ''', [
+            (rng.choice(ALERT_TYPES), f'Alert {n}', 'Synthetic benchmark alert', rng.choice(SEVERITIES),
+             rng.choice(LOCATIONS), rng.randint(1, 1000), 'benchmark', _random_time(rng, days))
+            for n in range(alerts)
+        ])
+
+        app.rebuild_user_stats(connection)
+        app.rebuild_risk_series(connection)
+
+    return seeded
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+CachedBody = namedtuple('CachedBody', ['body', 'etag'])
+
+
+def dump_json(payload):
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+def make_cached_body(payload, dumps=dump_json):
+    """Serialize `payload` to compact JSON with `dumps` (returning bytes) and tag it with a content ETag"""
+    body = dumps(payload)
+    return CachedBody(body, hashlib.sha1(body).hexdigest())
+
+
+class MemoryCacheBackend:
+    """Process-local cache with per-entry TTL and least-recently-used eviction.
+
+    Counters (the namespace versions of FeedCache) are kept apart from entries and
+    bounded separately at `max_counters`. Evicting the counter `<namespace>:version`
+    also drops every entry under `<namespace>:`, and a counter created afresh starts
+    from the clock rather than 1, so no entry cached under an earlier value of an
+    evicted counter can match again.
+    """
+
+    def __init__(self, max_entries=1024, max_counters=None):
+        self.max_entries = max_entries
+        self.max_counters = max_counters or max_entries
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._counters = OrderedDict()  # key -> value, least recently used first
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._counters:
+                self._counters.move_to_end(key)
+                return self._counters[key]
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def incr(self, key):
+        with self._lock:
+            value = self._counters.get(key)
+            self._counters[key] = value + 1 if value is not None else time.time_ns()
+            self._counters.move_to_end(key)
+            while len(self._counters) > self.max_counters:
+                evicted, _ = self._counters.popitem(last=False)
+                self._drop_namespace(evicted.rpartition(':')[0] + ':')
+            return self._counters[key]
+
+    def _drop_namespace(self, prefix):
+        # Called with self._lock held
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Cache stored in Redis (or anything speaking its protocol), shared across workers.
+
+    Pass `client` to use an existing client, e.g. a local stand-in in tests.
+    Eviction is left to the server's maxmemory policy.
+    """
+
+    def __init__(self, url='redis://localhost:6379/0', client=None, prefix='symptrack:'):
+        if client is None:
+            import redis  # optional dependency, only needed for this backend
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl=None):
+        # Milliseconds, so a sub-second TTL expires rather than truncating to 0 (which Redis rejects)
+        self.client.set(self.prefix + key, value, px=max(1, int(ttl * 1000)) if ttl else None)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+
+class FeedCache:
+    """Read-through cache of serialized JSON responses, grouped into namespaces.
+
+    Each namespace carries a version counter in the backend; invalidating bumps it,
+    so every entry cached under the old version stops being read at once (and in
+    every worker, with a shared backend). Payloads are serialized with `dumps`,
+    a function returning JSON bytes.
+    """
+
+    def __init__(self, backend, ttl=30, dumps=dump_json):
+        self.backend = backend
+        self.ttl = ttl
+        self.dumps = dumps
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, namespace):
+        """Current version of `namespace`; it changes every time the namespace is invalidated"""
+        return int(self.backend.get(f'{namespace}:version') or 0)
+
+    def get_or_load(self, namespace, key, loader):
+        """Return the CachedBody for `key`, calling `loader()` for the payload on a miss.
+
+        If `loader` returns None nothing is cached and None is returned.
+        """
+        version = self.version(namespace)
+        cache_key = f'{namespace}:{version}:{key}'
+
+        packed = self.backend.get(cache_key)
+        if packed is not None:
+            with self._lock:
+                self.hits += 1
+            etag, _, body = packed.partition(b'\n')
+            return CachedBody(body, etag.decode('ascii'))
+
+        with self._lock:
+            self.misses += 1
+
+        payload = loader()
+        if payload is None:
+            return None
+
+        cached = make_cached_body(payload, self.dumps)
+        # Stored under the version read before loading, so a write that lands meanwhile
+        # leaves this entry unreachable instead of serving it as fresh
+        self.backend.set(cache_key, cached.etag.encode('ascii') + b'\n' + cached.body, self.ttl)
+        return cached
+
+    def invalidate(self, namespace):
+        """Drop every entry cached in `namespace`"""
+        self.backend.incr(f'{namespace}:version')
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                'backend': type(self.backend).__name__,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+        if isinstance(self.backend, MemoryCacheBackend):
+            stats['entries'] = len(self.backend)
+            stats['max_entries'] = self.backend.max_entries
+        return stats
+
+
+class PredictionCache:
+    """Bounded LRU memo of prediction results, tied to the engine that produced them.
+
+    `fingerprint` returns an identifier of the current rule table or model version;
+    when it changes, every memoized result is dropped before the next lookup.
+    """
+
+    def __init__(self, fingerprint, max_entries=10000):
+        self.fingerprint = fingerprint
+        self.max_entries = max_entries
+        self._backend = MemoryCacheBackend(max_entries)
+        self._current = fingerprint()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _check_fingerprint(self):
+        current = self.fingerprint()
+        if current != self._current:
+            with self._lock:
+                if current != self._current:
+                    self._backend = MemoryCacheBackend(self.max_entries)
+                    self._current = current
+                    self.invalidations += 1
+
+    def get(self, key):
+        """The memoized result for `key`, or None; results are shared, so treat them as read-only"""
+        self._check_fingerprint()
+        value = self._backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self._backend.set(key, value)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'fingerprint': self._current,
+                'entries': len(self._backend),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'invalidations': self.invalidations
+            }
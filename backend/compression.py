@@ -0,0 +1,80 @@
+import gzip
+import threading
+from collections import OrderedDict
+
+try:
+    import brotli  # optional dependency; only gzip is offered without it
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = frozenset(['application/json', 'text/plain', 'text/csv', 'application/x-ndjson'])
+
+
+class ResponseCompressor:
+    """Brotli or gzip encoding of response bodies of at least `min_size` bytes.
+
+    Bodies that carry an ETag (the cached feed pages) are compressed once per
+    encoding and kept in a small LRU keyed by the ETag, so a hot page costs one
+    compression rather than one per request.
+    """
+
+    def __init__(self, min_size=1024, gzip_level=6, brotli_quality=4, memo_entries=256):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.memo_entries = memo_entries
+        self.encodings = ['br', 'gzip'] if brotli else ['gzip']
+
+        self._memo = OrderedDict()  # (etag, encoding) -> compressed body
+        self._lock = threading.Lock()
+
+        self.compressed = 0
+        self.memo_hits = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def choose_encoding(self, accept_encodings):
+        """The preferred encoding the client accepts (a werkzeug Accept), or None"""
+        return accept_encodings.best_match(self.encodings)
+
+    def _compress(self, body, encoding):
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def compress(self, body, encoding, etag=None):
+        """`body` in `encoding`, reusing an earlier result for the same strong ETag"""
+        key = (etag, encoding)
+        if etag:
+            with self._lock:
+                compressed = self._memo.get(key)
+                if compressed is not None:
+                    self._memo.move_to_end(key)
+                    self.memo_hits += 1
+                    self.bytes_in += len(body)
+                    self.bytes_out += len(compressed)
+                    return compressed
+
+        compressed = self._compress(body, encoding)
+        with self._lock:
+            self.compressed += 1
+            self.bytes_in += len(body)
+            self.bytes_out += len(compressed)
+            if etag:
+                self._memo[key] = compressed
+                while len(self._memo) > self.memo_entries:
+                    self._memo.popitem(last=False)
+        return compressed
+
+    def stats(self):
+        with self._lock:
+            return {
+                'min_size': self.min_size,
+                'encodings': self.encodings,
+                'compressed': self.compressed,
+                'memo_hits': self.memo_hits,
+                'memo_entries': len(self._memo),
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'ratio': round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else 0.0
+            }
@@ -0,0 +1,150 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import Error
+
+
+class PoolTimeout(Error):
+    """Raised when no connection could be checked out within the timeout"""
+
+
+class ConnectionPool:
+    """Bounded pool of MySQL connections with health checks and checkout timeouts"""
+
+    def __init__(self, db_config, size=10, timeout=5.0, health_check_interval=30.0):
+        self.db_config = db_config
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+
+        self._idle = []  # (connection, last_used) pairs, most recently used last
+        self._in_use = 0
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _connect(self):
+        connection = mysql.connector.connect(**self.db_config)
+        with self._lock:
+            self._created += 1
+        return connection
+
+    def _is_healthy(self, connection, last_used):
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Error:
+            pass
+        with self._lock:
+            self._discarded += 1
+
+    def acquire(self):
+        """Check out a connection, waiting up to `timeout` seconds for one to free up"""
+        started = time.monotonic()
+        deadline = started + self.timeout
+
+        with self._available:
+            while not self._idle and self._in_use >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(f"No database connection available after {self.timeout}s")
+                self._available.wait(remaining)
+
+            waited = time.monotonic() - started
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+            self._in_use += 1
+            idle = self._idle.pop() if self._idle else None
+
+        try:
+            if idle:
+                connection, last_used = idle
+                if self._is_healthy(connection, last_used):
+                    return connection
+                self._discard(connection)
+            return self._connect()
+        except Exception:
+            self._release_slot()
+            raise
+
+    def release(self, connection, discard=False):
+        """Return a connection to the pool, rolling back anything left uncommitted.
+
+        Pass discard=True to close it instead, e.g. when abandoning a large unread
+        result that would otherwise have to be drained first.
+        """
+        if discard:
+            self._discard(connection)
+            self._release_slot()
+            return
+
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+            connection.consume_results()
+        except Error:
+            self._discard(connection)
+            self._release_slot()
+            return
+
+        with self._available:
+            self._in_use -= 1
+            self._idle.append((connection, time.monotonic()))
+            self._available.notify()
+
+    def _release_slot(self):
+        with self._available:
+            self._in_use -= 1
+            self._available.notify()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of a `with` block"""
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def close(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            try:
+                connection.close()
+            except Error:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': self.size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'checkouts': self._checkouts,
+                'timeouts': self._timeouts,
+                'created': self._created,
+                'discarded': self._discarded,
+                'wait_avg_ms': round(self._wait_total / self._checkouts * 1000, 3) if self._checkouts else 0.0,
+                'wait_max_ms': round(self._wait_max * 1000, 3)
+            }
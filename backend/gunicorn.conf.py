@@ -0,0 +1,37 @@
+import multiprocessing
+import os
+
+# Serving
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('WEB_THREADS', 4))
+# The app's pools, buffers and background threads assume real threads; each open
+# /api/alerts/stream holds one of them, up to ALERT_STREAM_MAX_SUBSCRIBERS per worker
+worker_class = 'gthread'
+timeout = int(os.environ.get('WEB_TIMEOUT', 60))
+keepalive = int(os.environ.get('WEB_KEEPALIVE', 5))
+
+# Import the app once in the master so workers fork after the heavy initialisation
+preload_app = True
+
+# Time workers get to finish in-flight requests after SIGTERM before they are killed
+graceful_timeout = int(os.environ.get('GRACEFUL_TIMEOUT', 30))
+
+accesslog = os.environ.get('ACCESS_LOG', '-')
+# The default format logs the whole request line; %(U)s leaves out the query string,
+# which can carry an alert stream ticket
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s"'
+
+
+def on_starting(server):
+    """Create/migrate the schema once, in the master, before any worker exists"""
+    from wsgi import db_pool, init_database
+    init_database()
+    # Connections opened here must not be shared with forked workers
+    db_pool.close()
+
+
+def worker_exit(server, worker):
+    """Flush buffered likes and queued predictions before the worker goes away"""
+    from wsgi import shutdown
+    shutdown()
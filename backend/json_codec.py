@@ -0,0 +1,76 @@
+import json
+import uuid
+from datetime import date
+from decimal import Decimal
+
+try:
+    import orjson  # optional dependency; the standard library encoder is used without it
+except ImportError:
+    orjson = None
+
+ENCODERS = ('auto', 'orjson', 'json')
+
+
+def default(value):
+    """Serialize the types MySQL rows carry that JSON has no type for.
+
+    Dates and datetimes become ISO 8601 strings, so row mappers can pass timestamps
+    through unconverted (orjson formats datetimes itself, in C, the same way).
+    """
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class JSONCodec:
+    """Compact JSON to and from bytes on the chosen encoder.
+
+    `encoder` is 'orjson', 'json' (the standard library) or 'auto', which picks
+    orjson when it is installed. Both write non-ASCII text as raw UTF-8, but the
+    output is not byte-identical between them: floats are formatted differently
+    (1e16 is `1e16` in orjson and `1e+16` in json), so ETags over a body only stay
+    stable while every worker uses the same encoder.
+    """
+
+    def __init__(self, encoder='auto'):
+        if encoder not in ENCODERS:
+            raise ValueError(f"encoder must be one of {', '.join(ENCODERS)}")
+        if encoder == 'auto':
+            encoder = 'orjson' if orjson else 'json'
+        if encoder == 'orjson' and orjson is None:
+            raise ImportError("The orjson encoder needs the orjson package")
+        self.encoder = encoder
+
+    def dumps(self, obj, sort_keys=False):
+        if self.encoder == 'orjson':
+            return orjson.dumps(obj, default=default, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return json.dumps(
+            obj, default=default, separators=(',', ':'), sort_keys=sort_keys, ensure_ascii=False
+        ).encode('utf-8')
+
+    def loads(self, data):
+        if self.encoder == 'orjson':
+            return orjson.loads(data)
+        return json.loads(data)
+
+
+def row_mapper(*columns, **converters):
+    """Build a function turning a result row into a response dict.
+
+    `columns` names the selected columns in order (None skips one); `converters`
+    maps a column name to a function applied to its value. The (name, index,
+    converter) layout is worked out once per query shape, so mapping a row is a
+    single dict comprehension over it.
+    """
+    spec = tuple(
+        (name, index, converters.get(name))
+        for index, name in enumerate(columns)
+        if name is not None
+    )
+
+    def map_row(row):
+        return {name: convert(row[index]) if convert else row[index] for name, index, convert in spec}
+
+    return map_row
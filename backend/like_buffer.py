@@ -0,0 +1,145 @@
+import threading
+from collections import OrderedDict
+
+
+class LikeBuffer:
+    """In-process write-behind buffer for vlog likes.
+
+    Likes are deduplicated per (user, vlog) and handed to `writer` in batches as
+    {vlog_id: [user_id, ...]}, either every `flush_interval` seconds or as soon as
+    `flush_threshold` likes are pending. `writer(batch, commit)` must persist the
+    whole batch or raise, in which case the batch is kept and retried on the next
+    flush, so writing a batch twice must be harmless.
+
+    The batch stays in pending_deltas() until it is committed, and readers add it on
+    top of the counts they loaded. `writer` commits by calling
+    `commit(connection.commit)`, which runs the database commit, drops the batch from
+    pending_deltas() and calls `on_applied` (to invalidate anything cached from the
+    old counts) as one step that pending_deltas() waits for. A reader that loaded
+    the new counts therefore never adds the batch again. Only that step is
+    serialized with readers; the batch's statements run beforehand, and record()
+    never waits on the database.
+    """
+
+    def __init__(self, writer, flush_interval=2.0, flush_threshold=500, dedup_size=100000, on_applied=None):
+        self.writer = writer
+        self.on_applied = on_applied
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.dedup_size = dedup_size
+
+        self._pending = {}  # vlog_id -> [user_id, ...] not yet handed to the writer
+        self._in_flight = {}  # batch currently being written
+        self._pending_count = 0
+        self._seen = OrderedDict()  # recently liked (user_id, vlog_id) pairs
+        self._lock = threading.Lock()
+        self._commit_lock = threading.Lock()  # held by pending_deltas() and while a batch is applied
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+        self.flushes = 0
+        self.flush_errors = 0
+        self.deduplicated = 0
+
+    def record(self, user_id, vlog_id):
+        """Buffer a like; returns False if this user's like was already recorded"""
+        key = (user_id, vlog_id)
+        with self._lock:
+            if key in self._seen:
+                self._seen.move_to_end(key)
+                self.deduplicated += 1
+                return False
+            self._seen[key] = True
+            if len(self._seen) > self.dedup_size:
+                self._seen.popitem(last=False)
+
+            self._pending.setdefault(vlog_id, []).append(user_id)
+            self._pending_count += 1
+            full = self._pending_count >= self.flush_threshold
+            self._ensure_started()
+
+        if full:
+            self._wake.set()
+        return True
+
+    def pending_deltas(self):
+        """{vlog_id: likes not yet reflected in the database}"""
+        with self._commit_lock, self._lock:
+            deltas = {vlog_id: len(users) for vlog_id, users in self._in_flight.items()}
+            for vlog_id, users in self._pending.items():
+                deltas[vlog_id] = deltas.get(vlog_id, 0) + len(users)
+            return deltas
+
+    def flush(self):
+        """Write out everything buffered so far; returns the number of likes written"""
+        with self._flush_lock:
+            with self._commit_lock, self._lock:
+                if not self._pending:
+                    return 0
+                batch, self._pending = self._pending, {}
+                self._pending_count = 0
+                self._in_flight = batch
+
+            try:
+                self.writer(batch, self._commit)
+            except Exception as e:
+                print(f"Error flushing vlog likes: {e}")
+                with self._commit_lock, self._lock:
+                    self.flush_errors += 1
+                    if self._in_flight:
+                        for vlog_id, users in batch.items():
+                            self._pending.setdefault(vlog_id, [])[:0] = users
+                            self._pending_count += len(users)
+                        self._in_flight = {}
+                return 0
+
+            with self._commit_lock, self._lock:
+                self._in_flight = {}  # in case `writer` returned without committing through `commit`
+                self.flushes += 1
+            return sum(len(users) for users in batch.values())
+
+    def _commit(self, commit):
+        with self._commit_lock:
+            commit()
+            with self._lock:
+                self._in_flight = {}
+            if self.on_applied:
+                self.on_applied()
+
+    def close(self):
+        """Stop the background flusher and drain whatever is still buffered"""
+        with self._lock:
+            self._stopping = True
+            thread = self._thread
+        self._wake.set()
+        if thread:
+            thread.join()
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': self._pending_count,
+                'in_flight': sum(len(users) for users in self._in_flight.values()),
+                'flushes': self.flushes,
+                'flush_errors': self.flush_errors,
+                'deduplicated': self.deduplicated
+            }
+
+    def _ensure_started(self):
+        # Called with self._lock held; the thread starts lazily so forked workers get their own
+        if self._thread is None and not self._stopping:
+            self._thread = threading.Thread(target=self._run, name='like-buffer-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            with self._lock:
+                stopping = self._stopping
+            if stopping:
+                return
+            self.flush()
@@ -0,0 +1,249 @@
+import fcntl
+import hashlib
+import hmac
+import os
+import shutil
+import subprocess
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+BLOCK_SIZE = 1024 * 1024
+
+
+class OffsetMismatch(Exception):
+    """Raised when a chunk does not start where the upload's received bytes end"""
+
+    def __init__(self, offset):
+        super().__init__(f'Upload is at offset {offset}')
+        self.offset = offset
+
+
+class UploadBusy(Exception):
+    """Raised when another request is already writing to the same upload"""
+
+
+class DigestMismatch(Exception):
+    """Raised when a finished upload's bytes do not hash to the sha256 the client declared"""
+
+    def __init__(self, digest):
+        super().__init__(f'Received bytes have sha256 {digest}, not the declared digest')
+        self.digest = digest
+
+
+class MediaStore:
+    """Content-addressed media files under `root`, fed by resumable chunked uploads.
+
+    An upload's bytes are appended to `root/.partial/<upload_id>` as chunks arrive,
+    streamed in `block_size` blocks so no chunk is held in memory whole; the file's
+    length is the upload's offset, which is what lets a client resume after a
+    dropped connection. A finished file is hashed and moved to
+    `root/<sha256[:2]>/<sha256><ext>`; if that name already exists the bytes are a
+    duplicate and the partial file is discarded. Names are relative to `root`.
+
+    A stored file can also be claimed without resending it, but not on its digest
+    alone, which anyone may know: the client must return `content_proof` of the
+    file, an HMAC-SHA256 of its bytes keyed with a nonce the server picked.
+    """
+
+    def __init__(self, root, block_size=BLOCK_SIZE):
+        self.root = root
+        self.block_size = block_size
+        self.partial_root = os.path.join(root, '.partial')
+        os.makedirs(self.partial_root, exist_ok=True)
+
+    def partial_path(self, upload_id):
+        return os.path.join(self.partial_root, upload_id)
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def blob_name(self, digest, ext):
+        return f'{digest[:2]}/{digest}{ext}'
+
+    def exists(self, name):
+        return os.path.isfile(self.path(name))
+
+    def received(self, upload_id):
+        """Bytes received so far for `upload_id`"""
+        try:
+            return os.path.getsize(self.partial_path(upload_id))
+        except FileNotFoundError:
+            return 0
+
+    def append(self, upload_id, stream, offset, length):
+        """Write up to `length` bytes from `stream` at `offset` of the upload; returns the new offset.
+
+        Bytes that arrived before the client went away are kept, so the new
+        offset may fall short of `offset + length`.
+        """
+        with open(self.partial_path(upload_id), 'ab') as partial:
+            try:
+                fcntl.flock(partial, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadBusy('Another chunk of this upload is being written')
+            current = partial.seek(0, os.SEEK_END)
+            if current != offset:
+                raise OffsetMismatch(current)
+
+            remaining = length
+            while remaining > 0:
+                block = stream.read(min(self.block_size, remaining))
+                if not block:
+                    break
+                partial.write(block)
+                remaining -= len(block)
+            partial.flush()
+            return partial.tell()
+
+    def store_file(self, path, ext, expected_sha256=None):
+        """Hash the file at `path` and move it to its content address; returns (sha256, name, deduplicated).
+
+        If `expected_sha256` is given and the file hashes to something else, the
+        file is deleted and DigestMismatch raised.
+        """
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as source:
+            for block in iter(lambda: source.read(self.block_size), b''):
+                sha256.update(block)
+        digest = sha256.hexdigest()
+        if expected_sha256 and digest != expected_sha256:
+            os.remove(path)
+            raise DigestMismatch(digest)
+
+        name = self.blob_name(digest, ext)
+        target = self.path(name)
+        if os.path.exists(target):
+            os.remove(path)
+            return digest, name, True
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)  # atomic, so readers never see a half-moved file
+        return digest, name, False
+
+    def content_proof(self, name, nonce):
+        """HMAC-SHA256 (hex) of the stored file `name`, keyed with `nonce` bytes"""
+        mac = hmac.new(nonce, digestmod=hashlib.sha256)
+        with open(self.path(name), 'rb') as source:
+            for block in iter(lambda: source.read(self.block_size), b''):
+                mac.update(block)
+        return mac.hexdigest()
+
+    def verify_proof(self, name, nonce, proof):
+        """True if `proof` is content_proof(name, nonce), i.e. the client holds the file's bytes"""
+        return hmac.compare_digest(self.content_proof(name, nonce), (proof or '').lower())
+
+    def finish(self, upload_id, ext, expected_sha256=None):
+        """Move a fully received upload into place; returns (sha256, name, deduplicated)"""
+        return self.store_file(self.partial_path(upload_id), ext, expected_sha256)
+
+    def discard(self, upload_id):
+        try:
+            os.remove(self.partial_path(upload_id))
+        except FileNotFoundError:
+            pass
+
+
+def thumbnail_name(video_name):
+    """Where the thumbnail of a stored video goes; derived from the video's content address"""
+    return os.path.splitext(video_name)[0] + '.thumb.jpg'
+
+
+class ThumbnailPool:
+    """Video thumbnails rendered by ffmpeg on a small, bounded thread pool.
+
+    ffmpeg runs as a subprocess, so threads are enough to keep the work off the
+    request path. At most `workers + max_queue` videos may be waiting; beyond that
+    submit() returns False. `on_thumbnail(video_name, thumbnail_name)` is called
+    from a pool thread once a thumbnail is stored.
+    """
+
+    def __init__(self, store, on_thumbnail, workers=2, max_queue=64, ffmpeg='ffmpeg', width=480,
+                 seek_seconds=1.0, timeout=60):
+        self.store = store
+        self.on_thumbnail = on_thumbnail
+        self.workers = workers
+        self.max_queue = max_queue
+        self.ffmpeg = shutil.which(ffmpeg)
+        self.width = width
+        self.seek_seconds = seek_seconds
+        self.timeout = timeout
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._outstanding = 0
+        self.rendered = 0
+        self.reused = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def submit(self, video_name):
+        """Queue a thumbnail for a stored video; returns False if it cannot be rendered or the queue is full"""
+        if self.ffmpeg is None:
+            return False
+        with self._lock:
+            if self._outstanding >= self.workers + self.max_queue:
+                self.rejected += 1
+                return False
+            self._outstanding += 1
+            if self._executor is None:
+                # Created lazily so each forked server worker gets its own pool
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='thumbnailer')
+            executor = self._executor
+        executor.submit(self._run, video_name)
+        return True
+
+    def _render(self, video_name, output, seek_seconds):
+        subprocess.run(
+            [self.ffmpeg, '-v', 'error', '-y', '-ss', str(seek_seconds), '-i', self.store.path(video_name),
+             '-frames:v', '1', '-vf', f'scale={self.width}:-2', output],
+            check=True, capture_output=True, timeout=self.timeout
+        )
+        return os.path.isfile(output) and os.path.getsize(output) > 0
+
+    def _run(self, video_name):
+        name = thumbnail_name(video_name)
+        output = self.store.partial_path(f'thumbnail-{uuid.uuid4().hex}.jpg')
+        try:
+            if self.store.exists(name):
+                reused = True
+            else:
+                reused = False
+                # Videos shorter than the seek point yield no frame; fall back to the first one
+                if not self._render(video_name, output, self.seek_seconds) and not self._render(video_name, output, 0):
+                    raise RuntimeError('ffmpeg produced no frame')
+                os.makedirs(os.path.dirname(self.store.path(name)), exist_ok=True)
+                os.replace(output, self.store.path(name))
+            self.on_thumbnail(video_name, name)
+            with self._lock:
+                if reused:
+                    self.reused += 1
+                else:
+                    self.rendered += 1
+        except Exception as e:
+            print(f"Thumbnail for {video_name} failed: {e}")
+            with self._lock:
+                self.failed += 1
+        finally:
+            if os.path.exists(output):
+                os.remove(output)
+            with self._lock:
+                self._outstanding -= 1
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'available': self.ffmpeg is not None,
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'outstanding': self._outstanding,
+                'rendered': self.rendered,
+                'reused': self.reused,
+                'failed': self.failed,
+                'rejected': self.rejected
+            }
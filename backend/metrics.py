@@ -0,0 +1,239 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+PHASES = ('connect', 'query', 'hash', 'serialize', 'compress')
+
+MAX_TRACED_STATEMENTS = 100
+
+_current = threading.local()
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """Process-local counters and histograms rendered in the Prometheus text format.
+
+    Metrics are keyed by name and a tuple of (label, value) pairs. Collectors are
+    callables returning {name: value} gauges sampled at render time, used to expose
+    the stats() of long-lived components without keeping copies of their counters.
+    Under a multi-worker server each worker keeps and serves its own registry.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help = {}
+        self._counters = {}  # name -> {labels: value}
+        self._histograms = {}  # name -> (buckets, {labels: Histogram})
+        self._collectors = []
+
+    def counter(self, name, help_text):
+        self._help[name] = help_text
+        self._counters.setdefault(name, {})
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self._help[name] = help_text
+        self._histograms.setdefault(name, (buckets, {}))
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def inc(self, name, labels=(), amount=1):
+        with self._lock:
+            series = self._counters[name]
+            series[labels] = series.get(labels, 0) + amount
+
+    def observe(self, name, value, labels=()):
+        buckets, series = self._histograms[name]
+        with self._lock:
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(buckets)
+            histogram.observe(value)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, series in self._counters.items():
+                lines.append(f'# HELP {name} {self._help[name]}')
+                lines.append(f'# TYPE {name} counter')
+                for labels, value in series.items():
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+            for name, (buckets, series) in self._histograms.items():
+                lines.append(f'# HELP {name} {self._help[name]}')
+                lines.append(f'# TYPE {name} histogram')
+                for labels, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        le = bound if bound == '+Inf' else _format_value(float(bound))
+                        lines.append(f'{name}_bucket{_format_labels(labels + (("le", le),))} {cumulative}')
+                    lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}')
+                    lines.append(f'{name}_count{_format_labels(labels)} {histogram.count}')
+
+        for collector in self._collectors:
+            for name, value in collector().items():
+                lines.append(f'# TYPE {name} gauge')
+                lines.append(f'{name} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+class RequestTrace:
+    """Time spent per phase and the queries run while handling one request"""
+
+    def __init__(self, keep_statements=False):
+        self.started = time.perf_counter()
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.queries = 0
+        self.statements = [] if keep_statements else None
+        self.status = None
+
+
+def start_trace(keep_statements=False):
+    _current.trace = RequestTrace(keep_statements)
+    return _current.trace
+
+
+def end_trace():
+    trace = getattr(_current, 'trace', None)
+    _current.trace = None
+    return trace
+
+
+def current_trace():
+    return getattr(_current, 'trace', None)
+
+
+@contextmanager
+def phase(name):
+    """Add the time spent in the `with` block to the current request's `name` phase"""
+    trace = getattr(_current, 'trace', None)
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.phases[name] += time.perf_counter() - started
+
+
+def _record_query(statement, seconds):
+    trace = getattr(_current, 'trace', None)
+    if trace is None:
+        return
+    trace.queries += 1
+    trace.phases['query'] += seconds
+    if trace.statements is not None and len(trace.statements) < MAX_TRACED_STATEMENTS:
+        trace.statements.append((' '.join(str(statement).split()), seconds))
+
+
+def record_query_batch(timings, elapsed):
+    """Record queries that ran concurrently: each statement with its own time, the batch's wall time as the phase.
+
+    `timings` holds (statement, seconds) pairs.
+    """
+    trace = getattr(_current, 'trace', None)
+    if trace is None:
+        return
+    trace.queries += len(timings)
+    trace.phases['query'] += elapsed
+    if trace.statements is not None:
+        for statement, seconds in timings:
+            if len(trace.statements) >= MAX_TRACED_STATEMENTS:
+                break
+            trace.statements.append((' '.join(str(statement).split()), seconds))
+
+
+class InstrumentedCursor:
+    """Cursor wrapper that times execute and fetch calls into the current request's trace"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def _timed(self, fn, *args):
+        trace = getattr(_current, 'trace', None)
+        if trace is None:
+            return fn(*args)
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            trace.phases['query'] += time.perf_counter() - started
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            _record_query(operation, time.perf_counter() - started)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            _record_query(operation, time.perf_counter() - started)
+
+    def fetchone(self):
+        return self._timed(self._cursor.fetchone)
+
+    def fetchmany(self, *args, **kwargs):
+        return self._timed(lambda: self._cursor.fetchmany(*args, **kwargs))
+
+    def fetchall(self):
+        return self._timed(self._cursor.fetchall)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    """Connection wrapper handing out InstrumentedCursors; commits count as query time"""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs))
+
+    def commit(self):
+        with phase('query'):
+            return self._connection.commit()
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
@@ -0,0 +1,139 @@
+import os
+import re
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+MIGRATION_FILENAME = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+# DDL statements the runner can tell are already done, so a migration that failed
+# partway is finished by simply running it again
+CREATE_INDEX = re.compile(r'^CREATE\s+(?:UNIQUE\s+|FULLTEXT\s+)?INDEX\s+(\w+)\s+ON\s+(\w+)', re.IGNORECASE)
+DROP_INDEX = re.compile(r'^DROP\s+INDEX\s+(\w+)\s+ON\s+(\w+)', re.IGNORECASE)
+ADD_COLUMN = re.compile(r'^ALTER\s+TABLE\s+(\w+)\s+ADD\s+COLUMN\s+(\w+)', re.IGNORECASE)
+ALTER_TABLE_CHANGE = re.compile(r'^ALTER\s+TABLE\s+(\w+)\s+CHANGE\s', re.IGNORECASE)
+CHANGE_COLUMN = re.compile(r'\bCHANGE\s+(?:COLUMN\s+)?(\w+)\s+(\w+)', re.IGNORECASE)
+
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    """Return [(version, name, statements)] for every migration file, ordered by version"""
+    migrations = []
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILENAME.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(directory, filename)) as f:
+            migrations.append((int(match.group(1)), match.group(2), split_statements(f.read())))
+
+    migrations.sort()
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def split_statements(sql):
+    """Split a migration script into statements, dropping `--` comment lines"""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [statement.strip() for statement in '\n'.join(lines).split(';') if statement.strip()]
+
+
+def index_exists(cursor, table, index):
+    cursor.execute(
+        'SELECT EXISTS(SELECT 1 FROM information_schema.statistics '
+        'WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s)',
+        (table, index)
+    )
+    return bool(cursor.fetchone()[0])
+
+
+def column_exists(cursor, table, column):
+    cursor.execute(
+        'SELECT EXISTS(SELECT 1 FROM information_schema.columns '
+        'WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s)',
+        (table, column)
+    )
+    return bool(cursor.fetchone()[0])
+
+
+def already_applied(cursor, statement):
+    """True if `statement` is index or column DDL whose effect is already in the schema.
+
+    Everything else must be safe to repeat on its own: CREATE TABLE IF NOT EXISTS,
+    DROP ... IF EXISTS, or updates that recompute rather than increment.
+    """
+    match = CREATE_INDEX.match(statement)
+    if match:
+        return index_exists(cursor, match.group(2), match.group(1))
+    match = DROP_INDEX.match(statement)
+    if match:
+        return not index_exists(cursor, match.group(2), match.group(1))
+    match = ADD_COLUMN.match(statement)
+    if match:
+        return column_exists(cursor, match.group(1), match.group(2))
+    match = ALTER_TABLE_CHANGE.match(statement)
+    if match:
+        table = match.group(1)
+        renamed = [old for old, new in CHANGE_COLUMN.findall(statement) if old != new]
+        done = [not column_exists(cursor, table, old) for old in renamed]
+        if any(done) and not all(done):
+            raise ValueError(f"Only some of the column renames in this {table} statement are applied; "
+                             f"finish them by hand and rerun: {statement}")
+        return bool(renamed) and all(done)
+    return False
+
+
+def apply_migrations(connection, directory=MIGRATIONS_DIR):
+    """Apply every migration not yet recorded in schema_migrations, in version order.
+
+    Returns the list of versions applied by this call; already-applied versions are skipped,
+    so this is safe to run on every startup.
+
+    MySQL commits each DDL statement as it runs, so a migration that fails partway
+    leaves its earlier statements applied and its version unrecorded. To recover,
+    fix the cause and run the migrations again: index and column changes that are
+    already in place are skipped (see already_applied), and the rest of the
+    migration's statements are written to be repeatable.
+    """
+    cursor = connection.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('SELECT version FROM schema_migrations')
+    applied = {row[0] for row in cursor.fetchall()}
+
+    newly_applied = []
+    for version, name, statements in load_migrations(directory):
+        if version in applied:
+            continue
+        # MySQL commits DDL implicitly, so the version is recorded right after its statements
+        for statement in statements:
+            if not already_applied(cursor, statement):
+                cursor.execute(statement)
+        cursor.execute('INSERT INTO schema_migrations (version, name) VALUES (%s, %s)', (version, name))
+        connection.commit()
+        newly_applied.append(version)
+        print(f"Applied migration {version:04d}_{name}")
+
+    cursor.close()
+    return newly_applied
+
+
+def find_full_scans(connection, queries, min_rows=100):
+    """EXPLAIN each (label, sql, params) query and return the plan rows that full-scan a table.
+
+    Tables estimated at fewer than `min_rows` rows are ignored, since the optimizer
+    prefers a table scan there regardless of indexes.
+    """
+    cursor = connection.cursor(dictionary=True)
+    full_scans = []
+    for label, sql, params in queries:
+        cursor.execute('EXPLAIN ' + sql, params)
+        for row in cursor.fetchall():
+            if row.get('type') == 'ALL' and (row.get('rows') or 0) >= min_rows:
+                full_scans.append({'query': label, 'table': row.get('table'), 'rows': row.get('rows')})
+    cursor.close()
+    return full_scans
@@ -0,0 +1,12 @@
+-- Indexes for the query shapes the API runs on every page load
+
+-- /api/predictions/history: WHERE user_id = ? ORDER BY created_at DESC LIMIT 10
+-- (also covers the user_id foreign key)
+CREATE INDEX idx_predictions_user_created ON predictions (user_id, created_at);
+
+-- /api/vlogs: ORDER BY created_at DESC
+CREATE INDEX idx_vlogs_created ON vlogs (created_at);
+
+-- /api/alerts: ORDER BY created_at DESC LIMIT 20
+-- /api/dashboard: WHERE created_at >= DATE_SUB(NOW(), INTERVAL 7 DAY)
+CREATE INDEX idx_community_alerts_created ON community_alerts (created_at);
@@ -0,0 +1,10 @@
+-- Keyset pagination for /api/vlogs: ORDER BY created_at DESC, id DESC with optional equality filters
+
+DROP INDEX idx_vlogs_created ON vlogs;
+CREATE INDEX idx_vlogs_created_id ON vlogs (created_at, id);
+
+-- ?disease=
+CREATE INDEX idx_vlogs_disease_created_id ON vlogs (disease, created_at, id);
+
+-- ?author_id= (also covers the user_id foreign key)
+CREATE INDEX idx_vlogs_user_created_id ON vlogs (user_id, created_at, id);
@@ -0,0 +1,10 @@
+-- One row per (vlog, user) like, so repeat likes are ignored and never touch vlogs.likes
+
+CREATE TABLE IF NOT EXISTS vlog_likes (
+    vlog_id INT NOT NULL,
+    user_id INT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (vlog_id, user_id),
+    FOREIGN KEY (vlog_id) REFERENCES vlogs(id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
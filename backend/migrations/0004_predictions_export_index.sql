@@ -0,0 +1,8 @@
+-- /api/predictions/export and 'flask export-predictions': WHERE user_id = ? AND id > ? ORDER BY id
+-- InnoDB appends the primary key to every secondary index, so an index on (user_id) alone already
+-- orders each user's rows by id. It replaces the index MySQL created for the user_id foreign key,
+-- which holds the same entries, so the hottest write table does not maintain both.
+
+CREATE INDEX idx_predictions_user_id ON predictions (user_id);
+
+DROP INDEX user_id ON predictions;
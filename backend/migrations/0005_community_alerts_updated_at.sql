@@ -0,0 +1,9 @@
+-- Change tracking for /api/alerts/stream: new and edited alerts are read in (updated_at, id) order
+
+ALTER TABLE community_alerts
+    ADD COLUMN updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+
+-- Existing alerts count as last changed when they were created
+UPDATE community_alerts SET updated_at = created_at WHERE created_at IS NOT NULL;
+
+CREATE INDEX idx_community_alerts_updated_id ON community_alerts (updated_at, id);
@@ -0,0 +1,18 @@
+-- Outbreak detection: per-(condition, region, time bucket) prediction counts and the job's watermark
+
+CREATE TABLE IF NOT EXISTS outbreak_rollup (
+    condition_name VARCHAR(255) NOT NULL,
+    region VARCHAR(255) NOT NULL,
+    bucket_start DATETIME NOT NULL,
+    prediction_count INT NOT NULL DEFAULT 0,
+    high_risk_count INT NOT NULL DEFAULT 0,
+    alert_id INT NULL,
+    PRIMARY KEY (condition_name, region, bucket_start),
+    FOREIGN KEY (alert_id) REFERENCES community_alerts(id) ON DELETE SET NULL
+);
+
+CREATE TABLE IF NOT EXISTS aggregation_watermarks (
+    name VARCHAR(64) PRIMARY KEY,
+    last_id BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
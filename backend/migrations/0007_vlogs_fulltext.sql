@@ -0,0 +1,3 @@
+-- /api/vlogs/search: MATCH(title, description, disease, medicines, hospitals) AGAINST (... IN BOOLEAN MODE)
+
+CREATE FULLTEXT INDEX ft_vlogs_search ON vlogs (title, description, disease, medicines, hospitals);
@@ -0,0 +1,14 @@
+-- Per-user risk time series for /api/dashboard and /api/user/health-trends, kept in step with predictions writes.
+-- Read as one primary-key range: WHERE user_id = ? AND granularity = ? AND bucket_start >= ? ORDER BY bucket_start
+
+CREATE TABLE IF NOT EXISTS user_risk_series (
+    user_id INT NOT NULL,
+    granularity ENUM('day', 'week') NOT NULL,
+    bucket_start DATE NOT NULL,
+    prediction_count INT NOT NULL DEFAULT 0,
+    risk_score_sum BIGINT NOT NULL DEFAULT 0,
+    risk_score_max INT NOT NULL DEFAULT 0,
+    high_risk_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, granularity, bucket_start),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
@@ -0,0 +1,19 @@
+-- Resumable vlog media uploads. The bytes received so far live in UPLOAD_FOLDER/.partial/<id>;
+-- finished files are stored under their sha256 and named in media_name.
+
+CREATE TABLE IF NOT EXISTS media_uploads (
+    id CHAR(32) PRIMARY KEY,
+    user_id INT NOT NULL,
+    vlog_id INT NULL,
+    kind ENUM('video', 'thumbnail') NOT NULL,
+    filename VARCHAR(255) NOT NULL,
+    size BIGINT NOT NULL,
+    sha256 CHAR(64) NULL,
+    media_name VARCHAR(255) NULL,
+    status ENUM('uploading', 'complete') NOT NULL DEFAULT 'uploading',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_media_uploads_media_name (media_name),
+    INDEX idx_media_uploads_status_created (status, created_at),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (vlog_id) REFERENCES vlogs(id) ON DELETE SET NULL
+);
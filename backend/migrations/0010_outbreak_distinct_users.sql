@@ -0,0 +1,18 @@
+-- Outbreak counts are of distinct users, not predictions: one row per user a condition was predicted
+-- for in a (region, bucket), from which outbreak_rollup's counts are recomputed.
+-- The aggregator carries on from its watermark. Buckets it counted before this migration keep their
+-- prediction counts until `flask backfill-outbreak-cases` records their users in batches.
+
+CREATE TABLE IF NOT EXISTS outbreak_cases (
+    condition_name VARCHAR(255) NOT NULL,
+    region VARCHAR(255) NOT NULL,
+    bucket_start DATETIME NOT NULL,
+    user_id INT NOT NULL,
+    high_risk BOOLEAN NOT NULL DEFAULT FALSE,
+    PRIMARY KEY (condition_name, region, bucket_start, user_id)
+);
+
+-- One column per statement, so a rerun after a failure skips exactly the renames already done
+ALTER TABLE outbreak_rollup CHANGE prediction_count user_count INT NOT NULL DEFAULT 0;
+
+ALTER TABLE outbreak_rollup CHANGE high_risk_count high_risk_user_count INT NOT NULL DEFAULT 0;
@@ -0,0 +1,283 @@
+"""Incremental outbreak detection over predictions.
+
+Each pass reads only predictions after the stored watermark (by id), records which
+users each condition was predicted for per (condition, region, time bucket) in
+outbreak_cases, recomputes those buckets' distinct-user counts in outbreak_rollup,
+and raises a community alert for any bucket well above its baseline: the average
+count of the same condition and region over the preceding buckets. Counting users
+rather than predictions means one user can add at most one case to a bucket
+however often they resubmit. Regions are the client's free-text location mapped
+onto a configured set; anything else counts under '' and never raises an alert.
+The cases, rollup rows, alerts and new watermark are committed together, so a
+failed pass is simply retried from the old watermark.
+
+backfill_outbreak_cases fills outbreak_cases, in batches and behind its own
+watermark, for predictions an older aggregator read before that table existed.
+"""
+import json
+from datetime import timedelta
+
+WATERMARK_NAME = 'outbreaks'
+BACKFILL_WATERMARK_NAME = 'outbreak_cases_backfill'
+NO_CONDITION = 'No specific condition identified'
+ALERT_SOURCE = 'SymptrackAI outbreak monitor'
+
+NEW_PREDICTIONS_SQL = '''
+    SELECT id, user_id, prediction_result, additional_data, risk_level, created_at
+    FROM predictions
+    WHERE id > %s
+    ORDER BY id
+    LIMIT %s
+'''
+
+BACKFILL_PREDICTIONS_SQL = '''
+    SELECT id, user_id, prediction_result, additional_data, risk_level, created_at
+    FROM predictions
+    WHERE id > %s AND id <= %s
+    ORDER BY id
+    LIMIT %s
+'''
+
+BUCKET_CASES_SQL = '''
+    SELECT COUNT(*), COALESCE(SUM(high_risk), 0) FROM outbreak_cases
+    WHERE condition_name = %s AND region = %s AND bucket_start = %s
+'''
+
+BUCKET_ALERT_SQL = '''
+    SELECT alert_id FROM outbreak_rollup
+    WHERE condition_name = %s AND region = %s AND bucket_start = %s
+'''
+
+BASELINE_SQL = '''
+    SELECT COALESCE(SUM(user_count), 0) FROM outbreak_rollup
+    WHERE condition_name = %s AND region = %s AND bucket_start >= %s AND bucket_start < %s
+'''
+
+
+def bucket_start(created_at, bucket_minutes):
+    """Start of the `bucket_minutes`-wide bucket holding `created_at`; buckets restart each midnight"""
+    minutes = (created_at.hour * 60 + created_at.minute) // bucket_minutes * bucket_minutes
+    return created_at.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(minutes=minutes)
+
+
+def region_key(location):
+    return ' '.join(location.lower().split())
+
+
+def region_index(regions):
+    """{normalized name: region} for the regions alerts may be raised in"""
+    return {region_key(region): region for region in regions if region.strip()}
+
+
+def count_conditions(rows, bucket_minutes, regions):
+    """{(condition, region, bucket_start): {user_id: high risk}} for prediction rows.
+
+    Rows are (id, user_id, prediction_result, additional_data, risk_level, created_at);
+    the region is the location the prediction was made from, looked up in the
+    `regions` index, or '' when not given or not a known region. Rows without a
+    `created_at` belong to no bucket and are skipped.
+    """
+    cases = {}
+    for _, user_id, prediction_result, additional_data, risk_level, created_at in rows:
+        if created_at is None:
+            continue
+        result = json.loads(prediction_result) if prediction_result else {}
+        location = (json.loads(additional_data) if additional_data else {}).get('location') or ''
+        region = regions.get(region_key(location), '')
+        bucket = bucket_start(created_at, bucket_minutes)
+        for condition in result.get('conditions', []):
+            name = condition.get('name')
+            if not name or name == NO_CONDITION:
+                continue
+            users = cases.setdefault((name[:255], region, bucket), {})
+            users[user_id] = users.get(user_id, False) or risk_level == 'high'
+    return cases
+
+
+def settled_rows(rows, cutoff):
+    """The leading rows created at or before `cutoff`; the watermark advances to the last of them.
+
+    Stops at the first unsettled row rather than skipping it, so a later pass
+    still sees every row after the watermark. A row without a `created_at` never
+    settles later, so it is passed over (and left out of the counts) rather than
+    holding the watermark back.
+    """
+    settled = []
+    for row in rows:
+        if row[5] is not None and row[5] > cutoff:
+            break
+        settled.append(row)
+    return settled
+
+
+def bucket_baseline(baseline_count, baseline_buckets):
+    """Average distinct users per bucket over the `baseline_buckets` before a bucket"""
+    return float(baseline_count) / baseline_buckets
+
+
+def is_outbreak(count, baseline, threshold_ratio, min_cases):
+    """True if `count` users is at least `min_cases` and `threshold_ratio` times the baseline"""
+    return count >= min_cases and count >= baseline * threshold_ratio
+
+
+def alert_severity(count, baseline):
+    ratio = count / baseline if baseline else float('inf')
+    if ratio >= 10:
+        return 'Critical'
+    if ratio >= 5:
+        return 'High'
+    return 'Medium'
+
+
+def record_cases(cursor, cases):
+    """Add count_conditions() output to outbreak_cases.
+
+    Idempotent, so a bucket reread after a failed pass or by the backfill is not double counted.
+    """
+    cursor.executemany('''
+        INSERT INTO outbreak_cases (condition_name, region, bucket_start, user_id, high_risk)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE high_risk = high_risk OR VALUES(high_risk)
+    ''', [
+        (name, region, bucket, user_id, high_risk)
+        for (name, region, bucket), users in cases.items()
+        for user_id, high_risk in users.items()
+    ])
+
+
+def recount_bucket(cursor, name, region, bucket):
+    """Recompute one outbreak_rollup bucket from outbreak_cases; returns its distinct-user count"""
+    cursor.execute(BUCKET_CASES_SQL, (name, region, bucket))
+    count, high_risk = cursor.fetchone()
+    cursor.execute('''
+        INSERT INTO outbreak_rollup (condition_name, region, bucket_start, user_count, high_risk_user_count)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            user_count = VALUES(user_count),
+            high_risk_user_count = VALUES(high_risk_user_count)
+    ''', (name, region, bucket, count, high_risk))
+    return count
+
+
+def aggregate_outbreaks(connection, bucket_minutes=60, baseline_buckets=168, threshold_ratio=3.0,
+                        min_cases=10, settle_seconds=10, batch_size=5000, regions=()):
+    """Run one pass over up to `batch_size` new predictions; returns a summary dict.
+
+    Predictions younger than `settle_seconds` are left for the next pass, so rows
+    whose transactions commit out of id order are not skipped. Concurrent passes
+    serialize on the watermark row. `min_cases` is a number of distinct users.
+    """
+    cursor = connection.cursor()
+    cursor.execute(
+        'INSERT IGNORE INTO aggregation_watermarks (name, last_id) VALUES (%s, 0)', (WATERMARK_NAME,)
+    )
+    connection.commit()
+
+    cursor.execute('SELECT last_id FROM aggregation_watermarks WHERE name = %s FOR UPDATE', (WATERMARK_NAME,))
+    watermark = cursor.fetchone()[0]
+    cursor.execute('SELECT NOW()')
+    cutoff = cursor.fetchone()[0] - timedelta(seconds=settle_seconds)
+
+    cursor.execute(NEW_PREDICTIONS_SQL, (watermark, batch_size))
+    rows = settled_rows(cursor.fetchall(), cutoff)
+
+    if not rows:
+        connection.rollback()
+        cursor.close()
+        return {'processed': 0, 'watermark': watermark, 'buckets': 0, 'alerts_raised': 0, 'alerts_updated': 0}
+
+    cases = count_conditions(rows, bucket_minutes, region_index(regions))
+    record_cases(cursor, cases)
+
+    raised = updated = 0
+    for name, region, bucket in cases:
+        count = recount_bucket(cursor, name, region, bucket)
+        if not region:
+            continue  # nowhere to point an alert at
+
+        cursor.execute(BUCKET_ALERT_SQL, (name, region, bucket))
+        alert_id = cursor.fetchone()[0]
+
+        if alert_id:
+            cursor.execute(
+                'UPDATE community_alerts SET affected_count = %s WHERE id = %s AND affected_count <> %s',
+                (count, alert_id, count)
+            )
+            updated += cursor.rowcount
+            continue
+
+        cursor.execute(BASELINE_SQL, (name, region, bucket - timedelta(minutes=bucket_minutes * baseline_buckets), bucket))
+        baseline = bucket_baseline(cursor.fetchone()[0], baseline_buckets)
+        if not is_outbreak(count, baseline, threshold_ratio, min_cases):
+            continue
+
+        cursor.execute('''
+            INSERT INTO community_alerts (type, title, description, severity, location, affected_count, source)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ''', (
+            'Disease Outbreak',
+            f'Rising {name} reports in {region}',
+            f'{count} people reported symptoms of {name} in {region} since {bucket:%Y-%m-%d %H:%M}, '
+            f'against a usual {baseline:.1f} per {bucket_minutes} minutes.',
+            alert_severity(count, baseline),
+            region,
+            count,
+            ALERT_SOURCE
+        ))
+        cursor.execute('''
+            UPDATE outbreak_rollup SET alert_id = %s
+            WHERE condition_name = %s AND region = %s AND bucket_start = %s
+        ''', (cursor.lastrowid, name, region, bucket))
+        raised += 1
+
+    watermark = rows[-1][0]
+    cursor.execute('UPDATE aggregation_watermarks SET last_id = %s WHERE name = %s', (watermark, WATERMARK_NAME))
+    connection.commit()
+    cursor.close()
+    return {
+        'processed': len(rows),
+        'watermark': watermark,
+        'buckets': len(cases),
+        'alerts_raised': raised,
+        'alerts_updated': updated
+    }
+
+
+def backfill_outbreak_cases(connection, bucket_minutes=60, batch_size=5000, regions=()):
+    """Record the cases of up to `batch_size` predictions the aggregator has already read; returns a summary.
+
+    Works forward from its own watermark to the aggregator's, recounting the buckets
+    it touches in outbreak_rollup but raising no alerts, so history is not reported
+    as a new outbreak. Each call is one transaction, holding the aggregator's
+    watermark row so the two never recount a bucket at the same time. Once
+    'processed' is 0 every prediction is in outbreak_cases.
+    """
+    cursor = connection.cursor()
+    cursor.execute(
+        'INSERT IGNORE INTO aggregation_watermarks (name, last_id) VALUES (%s, 0)', (BACKFILL_WATERMARK_NAME,)
+    )
+    connection.commit()
+
+    cursor.execute('SELECT last_id FROM aggregation_watermarks WHERE name = %s FOR UPDATE', (WATERMARK_NAME,))
+    row = cursor.fetchone()
+    until = row[0] if row else 0
+    cursor.execute('SELECT last_id FROM aggregation_watermarks WHERE name = %s FOR UPDATE', (BACKFILL_WATERMARK_NAME,))
+    watermark = cursor.fetchone()[0]
+
+    cursor.execute(BACKFILL_PREDICTIONS_SQL, (watermark, until, batch_size))
+    rows = cursor.fetchall()
+    if not rows:
+        connection.rollback()
+        cursor.close()
+        return {'processed': 0, 'watermark': watermark, 'until': until, 'buckets': 0}
+
+    cases = count_conditions(rows, bucket_minutes, region_index(regions))
+    record_cases(cursor, cases)
+    for name, region, bucket in cases:
+        recount_bucket(cursor, name, region, bucket)
+
+    watermark = rows[-1][0]
+    cursor.execute('UPDATE aggregation_watermarks SET last_id = %s WHERE name = %s', (watermark, BACKFILL_WATERMARK_NAME))
+    connection.commit()
+    cursor.close()
+    return {'processed': len(rows), 'watermark': watermark, 'until': until, 'buckets': len(cases)}
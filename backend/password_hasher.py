@@ -0,0 +1,102 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing pool already has as much work queued as it accepts"""
+
+
+def _hashpw(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _checkpw(password, password_hash):
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+class PasswordHasher:
+    """bcrypt hashing and verification on a dedicated, size-limited process pool.
+
+    At most `workers + max_queue` calls may be outstanding; beyond that calls fail
+    fast with HasherBusy instead of piling up behind the CPU-bound work. The pool
+    belongs to one server process, so a server running N workers runs up to
+    N * `workers` hashing processes.
+
+    Pool processes are started by `start_method`, 'forkserver' by default: forking
+    the multithreaded server process directly could copy a lock some other thread
+    holds into a child that then never sees it released.
+    """
+
+    def __init__(self, rounds=12, workers=2, max_queue=16, start_method='forkserver'):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queue = max_queue
+        if start_method not in multiprocessing.get_all_start_methods():
+            start_method = 'spawn'
+        self.start_method = start_method
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._outstanding = 0
+        self.completed = 0  # calls that returned, including verifications of a wrong password
+        self.failed = 0  # calls that raised, e.g. on a malformed hash or a broken pool
+        self.rejected = 0
+
+    def hash(self, password):
+        return self._run(_hashpw, password, self.rounds)
+
+    def verify(self, password, password_hash):
+        return self._run(_checkpw, password, password_hash)
+
+    def needs_rehash(self, password_hash):
+        """True if `password_hash` was made with a different cost than the configured one"""
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def _run(self, fn, *args):
+        with self._lock:
+            if self._outstanding >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HasherBusy('Password hashing is saturated, try again shortly')
+            self._outstanding += 1
+            if self._executor is None:
+                # Created lazily so each forked server worker gets its own pool
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context(self.start_method)
+                )
+            executor = self._executor
+
+        try:
+            result = executor.submit(fn, *args).result()
+        except BaseException:
+            with self._lock:
+                self._outstanding -= 1
+                self.failed += 1
+            raise
+        with self._lock:
+            self._outstanding -= 1
+            self.completed += 1
+        return result
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'rounds': self.rounds,
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'outstanding': self._outstanding,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected
+            }
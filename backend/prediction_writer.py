@@ -0,0 +1,155 @@
+import queue
+import threading
+import time
+
+
+class PredictionWriter:
+    """Bounded in-process queue of prediction rows drained by a background writer thread.
+
+    Rows are handed to `writer` as lists of up to `batch_size`, as soon as they are
+    available; `writer` must persist the whole list or raise. A failed batch is
+    retried whole, waiting `retry_interval` seconds and doubling up to
+    `max_retry_interval`, so a database outage only delays rows, however long it
+    lasts. During shutdown a batch is dropped (and counted) after
+    `shutdown_attempts` failures so close() cannot hang forever.
+
+    One row that can never be written must not hold up the rest, so a batch that
+    raises one of `permanent_errors` (constraint violations and the like) is split
+    in half and each half retried, and a single row raising one is dead-lettered
+    (logged, dropped and counted). Any other error is taken to be transient.
+    """
+
+    def __init__(self, writer, max_queue=10000, batch_size=500, retry_interval=1.0, max_retry_interval=30.0,
+                 shutdown_attempts=3, permanent_errors=()):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        self.shutdown_attempts = shutdown_attempts
+        self.permanent_errors = tuple(permanent_errors)
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._retry = []  # (batch, attempts) pairs still to write, batch being (enqueued_at, row) pairs
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.enqueued = 0
+        self.rejected = 0
+        self.written = 0
+        self.failed_batches = 0
+        self.dropped = 0
+        self.split_batches = 0
+        self.dead_lettered = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def submit(self, row):
+        """Queue a row for writing; returns False if the queue is full or shutting down"""
+        if self._stop.is_set():
+            return False
+        try:
+            self._queue.put_nowait((time.monotonic(), row))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            return False
+
+        with self._lock:
+            self.enqueued += 1
+            if self._thread is None:
+                # Started lazily so each forked server worker runs its own writer
+                self._thread = threading.Thread(target=self._run, name='prediction-writer', daemon=True)
+                self._thread.start()
+        return True
+
+    def close(self):
+        """Stop accepting rows and wait until everything queued has been written"""
+        self._stop.set()
+        with self._lock:
+            thread = self._thread
+        if thread:
+            thread.join()
+
+    def stats(self):
+        with self._queue.mutex:
+            depth = len(self._queue.queue)
+            oldest = self._queue.queue[0][0] if depth else None
+        with self._lock:
+            return {
+                'depth': depth + sum(len(batch) for batch, _ in self._retry),
+                'oldest_pending_ms': round((time.monotonic() - oldest) * 1000, 3) if oldest else 0.0,
+                'enqueued': self.enqueued,
+                'rejected': self.rejected,
+                'written': self.written,
+                'failed_batches': self.failed_batches,
+                'dropped': self.dropped,
+                'split_batches': self.split_batches,
+                'dead_lettered': self.dead_lettered,
+                'last_lag_ms': round(self.last_lag * 1000, 3),
+                'max_lag_ms': round(self.max_lag * 1000, 3)
+            }
+
+    def _next_batch(self):
+        with self._lock:
+            if self._retry:
+                return self._retry.pop(0)
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=0.5))
+        except queue.Empty:
+            return batch, 0
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch, 0
+
+    def _pending_retries(self):
+        with self._lock:
+            return bool(self._retry)
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty() and not self._pending_retries()):
+            batch, attempts = self._next_batch()
+            if not batch:
+                continue
+
+            try:
+                self.writer([row for _, row in batch])
+            except Exception as e:
+                print(f"Error writing {len(batch)} predictions: {e}")
+                attempts += 1
+                with self._lock:
+                    self.failed_batches += 1
+
+                if isinstance(e, self.permanent_errors):
+                    if len(batch) == 1:
+                        print(f"Dead-lettering prediction row: {batch[0][1]!r}")
+                        with self._lock:
+                            self.dead_lettered += 1
+                    else:
+                        half = len(batch) // 2
+                        with self._lock:
+                            self._retry[:0] = [(batch[:half], 0), (batch[half:], 0)]
+                            self.split_batches += 1
+                    continue
+
+                if self._stop.is_set() and attempts >= self.shutdown_attempts:
+                    with self._lock:
+                        self.dropped += len(batch)
+                    continue
+                with self._lock:
+                    self._retry.insert(0, (batch, attempts))
+                if self._stop.is_set():
+                    time.sleep(self.retry_interval)
+                else:
+                    self._stop.wait(min(self.retry_interval * 2 ** (attempts - 1), self.max_retry_interval))
+                continue
+
+            lag = time.monotonic() - batch[0][0]
+            with self._lock:
+                self.written += len(batch)
+                self.last_lag = lag
+                self.max_lag = max(self.max_lag, lag)
@@ -0,0 +1,202 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# A token bucket refilling at `per_minute` tokens a minute and holding at most `burst`
+Limit = namedtuple('Limit', ['per_minute', 'burst'])
+
+# Per route class: the bucket per JWT identity, the bucket per client IP (either may
+# be None) and how many of its requests may be in flight at once in this process
+RouteLimits = namedtuple('RouteLimits', ['identity', 'ip', 'concurrency'])
+
+
+class MemoryRateLimitBackend:
+    """Token buckets kept in this process; each server worker limits on its own.
+
+    At most `max_keys` buckets are kept, dropping the least recently used; a
+    dropped bucket comes back full, which only ever errs towards admitting.
+    `clock` returns the current time in seconds (tests pass a fake one).
+    """
+
+    def __init__(self, max_keys=100000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, buckets, cost=1):
+        """Take `cost` tokens from every (key, limit) in `buckets`, or from none of them.
+
+        Returns the seconds each bucket needs until it could grant `cost`, all 0 if granted.
+        """
+        now = self.clock()
+        with self._lock:
+            levels = []
+            for key, limit in buckets:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    levels.append(limit.burst)
+                else:
+                    levels.append(min(limit.burst, bucket[0] + (now - bucket[1]) * limit.per_minute / 60))
+            waits = [
+                max(0.0, (cost - tokens) / (limit.per_minute / 60))
+                for tokens, (_, limit) in zip(levels, buckets)
+            ]
+            granted = not any(waits)
+            for tokens, (key, _) in zip(levels, buckets):
+                self._buckets[key] = (tokens - cost if granted else tokens, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return waits
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+# Refill every bucket and take from all of them or none, atomically in Redis. KEYS: buckets;
+# ARGV: now, cost, then tokens per second and burst for each key. Returns each bucket's wait
+# in seconds as a string (Lua numbers in replies are truncated to integers).
+TAKE_SCRIPT = '''
+local now = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local levels = {}
+local waits = {}
+local granted = true
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[1 + 2 * i])
+    local burst = tonumber(ARGV[2 + 2 * i])
+    local state = redis.call('HMGET', key, 'tokens', 'updated_at')
+    local tokens = tonumber(state[1]) or burst
+    local updated_at = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+    levels[i] = tokens
+    if tokens >= cost then
+        waits[i] = 0
+    else
+        waits[i] = (cost - tokens) / rate
+        granted = false
+    end
+end
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[1 + 2 * i])
+    local burst = tonumber(ARGV[2 + 2 * i])
+    local tokens = levels[i]
+    if granted then
+        tokens = tokens - cost
+    end
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'updated_at', tostring(now))
+    redis.call('PEXPIRE', key, math.ceil(burst / rate * 1000) + 1000)
+    waits[i] = tostring(waits[i])
+end
+return waits
+'''
+
+
+class RedisRateLimitBackend:
+    """Token buckets in Redis, shared by every worker and host using the same server.
+
+    Pass `client` to use an existing client. Buckets expire once they would have
+    refilled, so idle clients cost no memory.
+    """
+
+    def __init__(self, url='redis://localhost:6379/0', client=None, prefix='symptrack:ratelimit:'):
+        if client is None:
+            import redis  # optional dependency, only needed for this backend
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._take = client.register_script(TAKE_SCRIPT)
+
+    def take(self, buckets, cost=1):
+        args = [time.time(), cost]
+        for _, limit in buckets:
+            args += [limit.per_minute / 60, limit.burst]
+        waits = self._take(keys=[self.prefix + key for key, _ in buckets], args=args)
+        return [float(wait) for wait in waits]
+
+
+class RateLimiter:
+    """Admission control per route class: token buckets per identity and per IP, and a concurrency cap.
+
+    `limits` maps route class names to RouteLimits. The concurrency cap is counted
+    in this process only, as it protects this worker's threads and connections.
+    If the backend fails, requests are admitted and the failure counted, so a
+    shared-store outage does not take the API down with it.
+    """
+
+    def __init__(self, backend, limits):
+        self.backend = backend
+        self.limits = limits
+
+        self._active = dict.fromkeys(limits, 0)
+        self._lock = threading.Lock()
+        self.admitted = dict.fromkeys(limits, 0)
+        self.rejected = {route_class: {'identity': 0, 'ip': 0, 'concurrency': 0} for route_class in limits}
+        self.backend_errors = 0
+
+    def check(self, route_class, identity=None, ip=None, cost=1):
+        """Take tokens for a request; returns None if admitted, else (reason, seconds to wait).
+
+        Both buckets are checked before either is charged, so a request refused by
+        its IP bucket costs its identity nothing. `cost` is capped at each bucket's
+        burst, which it could otherwise never be granted.
+        """
+        limits = self.limits[route_class]
+        checks = [
+            (reason, limit, key)
+            for reason, limit, key in (('identity', limits.identity, identity), ('ip', limits.ip, ip))
+            if limit is not None and key is not None
+        ]
+        if not checks:
+            return None
+        cost = min([cost] + [limit.burst for _, limit, _ in checks])
+        try:
+            waits = self.backend.take([(f'{route_class}:{reason}:{key}', limit) for reason, limit, key in checks], cost)
+        except Exception as e:
+            print(f"Rate limit backend failed, admitting request: {e}")
+            with self._lock:
+                self.backend_errors += 1
+            return None
+        for (reason, _, _), wait in zip(checks, waits):
+            if wait > 0:
+                with self._lock:
+                    self.rejected[route_class][reason] += 1
+                return reason, wait
+        return None
+
+    def enter(self, route_class):
+        """Count a request in flight; returns False if the route class is already at its cap"""
+        cap = self.limits[route_class].concurrency
+        with self._lock:
+            if cap and self._active[route_class] >= cap:
+                self.rejected[route_class]['concurrency'] += 1
+                return False
+            self._active[route_class] += 1
+            self.admitted[route_class] += 1
+            return True
+
+    def leave(self, route_class):
+        with self._lock:
+            self._active[route_class] -= 1
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                'backend': type(self.backend).__name__,
+                'backend_errors': self.backend_errors,
+                'routes': {
+                    route_class: {
+                        'identity_limit': limits.identity._asdict() if limits.identity else None,
+                        'ip_limit': limits.ip._asdict() if limits.ip else None,
+                        'concurrency_limit': limits.concurrency,
+                        'active': self._active[route_class],
+                        'admitted': self.admitted[route_class],
+                        'rejected': dict(self.rejected[route_class])
+                    }
+                    for route_class, limits in self.limits.items()
+                }
+            }
+        if isinstance(self.backend, MemoryRateLimitBackend):
+            stats['buckets'] = len(self.backend)
+        return stats
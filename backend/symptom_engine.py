@@ -0,0 +1,96 @@
+import hashlib
+import json
+import re
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lowercase `text` and split it into word tokens"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def age_band(age):
+    """Band an age by the thresholds the risk score adjusts on; raises ValueError if invalid"""
+    if not age:
+        return None
+    age = int(age)
+    if age > 60:
+        return 'over60'
+    if age < 18:
+        return 'under18'
+    return '18to60'
+
+
+class SymptomMatcher:
+    """Rule table compiled into a single keyword pattern over symptom text.
+
+    `keyword_groups` maps a group name to the keywords (words or multi-word
+    phrases) that trigger it. `rules` is an ordered list of dicts with:
+        name, probability, risk_level  - the condition reported when the rule fires
+        requires                       - groups that must all be present
+        excludes                       - groups that must all be absent (optional)
+        risk_score                     - score the rule sets when it fires, or None
+    Keywords match as substrings of the lowercased text, as the original if-chain
+    did, so "coughing" fires "cough" and "headaches" fires "headache".
+    """
+
+    def __init__(self, keyword_groups, rules):
+        self.keyword_groups = keyword_groups
+        self.rules = rules
+        # Changes whenever the rule table does, so results derived from it can be invalidated
+        self.fingerprint = hashlib.sha1(
+            json.dumps([keyword_groups, rules], sort_keys=True).encode('utf-8')
+        ).hexdigest()
+
+        groups_by_keyword = {}
+        for group, keywords in keyword_groups.items():
+            for keyword in keywords:
+                groups_by_keyword.setdefault(keyword.lower(), set()).add(group)
+
+        # A zero-width lookahead tries every position, so overlapping keywords are all
+        # seen. At one position only the longest matching keyword is reported, and any
+        # other keyword matching there is a prefix of it, so each keyword carries the
+        # groups of all the keywords it starts with.
+        self._groups = {
+            keyword: frozenset().union(*(
+                groups for other, groups in groups_by_keyword.items() if keyword.startswith(other)
+            ))
+            for keyword in groups_by_keyword
+        }
+        alternatives = sorted(groups_by_keyword, key=lambda keyword: (-len(keyword), keyword))
+        self._pattern = re.compile('(?=(' + '|'.join(map(re.escape, alternatives)) + '))')
+
+        for rule in rules:
+            unknown = (set(rule['requires']) | set(rule.get('excludes', ()))) - set(keyword_groups)
+            if unknown:
+                raise ValueError(f"Rule '{rule['name']}' references unknown keyword groups: {sorted(unknown)}")
+
+    def match_groups(self, text):
+        """Return the set of keyword groups present in `text` in one pass of the pattern"""
+        found = set()
+        for match in self._pattern.finditer(text.lower()):
+            found |= self._groups[match.group(1)]
+        return found
+
+    def evaluate(self, text):
+        """Return the (conditions, risk_score) produced by the rule table for `text`.
+
+        risk_score is that of the last fired rule that sets one, or None.
+        """
+        found = self.match_groups(text)
+        conditions = []
+        risk_score = None
+        for rule in self.rules:
+            if not found.issuperset(rule['requires']):
+                continue
+            if found.intersection(rule.get('excludes', ())):
+                continue
+            conditions.append({
+                'name': rule['name'],
+                'probability': rule['probability'],
+                'risk_level': rule['risk_level']
+            })
+            if rule.get('risk_score') is not None:
+                risk_score = rule['risk_score']
+        return conditions, risk_score
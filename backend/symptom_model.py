@@ -0,0 +1,182 @@
+import json
+import os
+import time
+
+from symptom_engine import age_band, tokenize
+
+try:
+    import numpy as np  # optional dependencies, only needed for trained models
+    from scipy import sparse
+except ImportError:
+    np = sparse = None
+
+ARTIFACT_FORMAT = 1
+
+
+def _require_numpy():
+    if np is None or sparse is None:
+        raise ImportError('Trained symptom models need numpy and scipy; install them or unset PREDICTION_MODEL_PATH')
+
+
+def extract_terms(item):
+    """Feature terms for one prediction input.
+
+    `item` has the predict_disease arguments as keys: symptoms, age, gender,
+    lifestyle and medical_history. Symptoms contribute unigrams and bigrams; the
+    other fields contribute prefixed terms so they never collide with symptom words.
+    """
+    tokens = tokenize(item.get('symptoms') or '')
+    terms = tokens + [f'{first} {second}' for first, second in zip(tokens, tokens[1:])]
+    terms += [f'history:{token}' for token in tokenize(item.get('medical_history') or '')]
+    terms += [f'lifestyle:{token}' for token in tokenize(item.get('lifestyle') or '')]
+    if item.get('gender'):
+        terms.append(f"gender:{str(item['gender']).lower()}")
+    try:
+        band = age_band(item.get('age'))
+    except (TypeError, ValueError):
+        band = None
+    if band:
+        terms.append(f'age:{band}')
+    return terms
+
+
+class SymptomModel:
+    """Multi-label logistic model over a sparse bag of terms, loaded from an artifact directory.
+
+    An artifact directory holds meta.json (version, vocabulary, conditions, threshold),
+    weights.npy (vocabulary x conditions) and bias.npy. weights.npy is memory-mapped,
+    so large vocabularies are paged in on demand rather than read up front.
+    """
+
+    def __init__(self, version, vocabulary, conditions, weights, bias, threshold=0.5):
+        self.version = version
+        self.vocabulary = vocabulary
+        self.conditions = conditions
+        self.weights = weights
+        self.bias = bias
+        self.threshold = threshold
+        self.load_seconds = 0.0
+
+    @classmethod
+    def load(cls, path):
+        _require_numpy()
+        started = time.perf_counter()
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta.get('format') != ARTIFACT_FORMAT:
+            raise ValueError(f"Unsupported model artifact format {meta.get('format')!r} in {path}")
+
+        model = cls(
+            meta['version'],
+            {term: column for column, term in enumerate(meta['vocabulary'])},
+            meta['conditions'],
+            np.load(os.path.join(path, 'weights.npy'), mmap_mode='r'),
+            np.load(os.path.join(path, 'bias.npy')),
+            meta.get('threshold', 0.5)
+        )
+        model.load_seconds = time.perf_counter() - started
+        return model
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        vocabulary = sorted(self.vocabulary, key=self.vocabulary.get)
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump({
+                'format': ARTIFACT_FORMAT,
+                'version': self.version,
+                'threshold': self.threshold,
+                'conditions': self.conditions,
+                'vocabulary': vocabulary
+            }, f)
+        np.save(os.path.join(path, 'weights.npy'), np.asarray(self.weights, dtype=np.float32))
+        np.save(os.path.join(path, 'bias.npy'), np.asarray(self.bias, dtype=np.float32))
+
+    def featurize(self, items):
+        """Binary CSR matrix of shape (len(items), vocabulary size); unknown terms are dropped"""
+        indptr = [0]
+        indices = []
+        for item in items:
+            columns = {self.vocabulary[term] for term in extract_terms(item) if term in self.vocabulary}
+            indices.extend(sorted(columns))
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.float32)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(items), len(self.vocabulary)))
+
+    def predict_proba(self, items):
+        """Condition probabilities for every item, scored with one sparse-dense matrix multiply"""
+        logits = self.featurize(items) @ self.weights + self.bias
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def predict(self, items):
+        """(conditions, risk_score) per item, in the same shape as SymptomMatcher.evaluate.
+
+        Conditions are listed most probable first. risk_score follows the rule
+        table's semantics: it is that of the predicted condition listed last in
+        `conditions` (the rule table's order) that sets one, or None, just as
+        SymptomMatcher takes it from the last fired rule.
+        """
+        results = []
+        for probabilities in self.predict_proba(items):
+            predicted = []
+            for column in np.argsort(-probabilities):
+                if probabilities[column] < self.threshold:
+                    break
+                predicted.append(column)
+
+            conditions = [{
+                'name': self.conditions[column]['name'],
+                'probability': int(round(float(probabilities[column]) * 100)),
+                'risk_level': self.conditions[column]['risk_level']
+            } for column in predicted]
+            risk_score = None
+            for column in sorted(predicted):
+                if self.conditions[column].get('risk_score') is not None:
+                    risk_score = self.conditions[column]['risk_score']
+            results.append((conditions, risk_score))
+        return results
+
+
+def train(items, labels, conditions, version, epochs=300, learning_rate=0.5, l2=1e-4, min_count=1):
+    """Fit a SymptomModel by full-batch gradient descent on the logistic loss.
+
+    `labels` holds, for each item, the names of the conditions it has; `conditions`
+    is the list of condition dicts (name, risk_level, risk_score) the model predicts.
+    Raises ValueError if `labels` names a condition that is not in `conditions`.
+    """
+    _require_numpy()
+    columns = {condition['name']: column for column, condition in enumerate(conditions)}
+    for row, names in enumerate(labels):
+        unknown = sorted(set(names) - set(columns))
+        if unknown:
+            raise ValueError(
+                f"Example {row} is labelled with unknown conditions {', '.join(map(repr, unknown))}; "
+                f"expected names from: {', '.join(columns)}"
+            )
+
+    counts = {}
+    for item in items:
+        for term in set(extract_terms(item)):
+            counts[term] = counts.get(term, 0) + 1
+    vocabulary = {term: column for column, term in enumerate(sorted(t for t, c in counts.items() if c >= min_count))}
+
+    model = SymptomModel(
+        version,
+        vocabulary,
+        conditions,
+        np.zeros((len(vocabulary), len(conditions)), dtype=np.float32),
+        np.zeros(len(conditions), dtype=np.float32)
+    )
+
+    targets = np.zeros((len(items), len(conditions)), dtype=np.float32)
+    for row, names in enumerate(labels):
+        for name in names:
+            targets[row, columns[name]] = 1.0
+
+    features = model.featurize(items)
+    features_t = features.T.tocsr()
+    for _ in range(epochs):
+        probabilities = 1.0 / (1.0 + np.exp(-(features @ model.weights + model.bias)))
+        error = (probabilities - targets) / len(items)
+        model.weights -= learning_rate * (features_t @ error + l2 * model.weights)
+        model.bias -= learning_rate * error.sum(axis=0)
+    return model
@@ -0,0 +1,131 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+import app
+from alert_broker import AlertBroker
+
+
+class FakeAlerts:
+    """AlertBroker loader over an in-memory list of (changed_at, event_id, alert) rows"""
+
+    def __init__(self, overlap=5):
+        self.rows = []
+        self.overlap = overlap
+        self.now = 100
+
+    def change(self, event_id, location='Springfield'):
+        self.now += 1
+        self.rows.append((self.now, event_id, {'location': location, 'severity': 'high'}))
+
+    def __call__(self, watermark):
+        if watermark is None:
+            watermark = max((row[0] for row in self.rows), default=self.now)
+        rows = [row for row in self.rows if row[0] >= watermark - self.overlap]
+        if rows:
+            watermark = max(watermark, rows[-1][0])
+        return [(event_id, alert) for _, event_id, alert in rows], watermark
+
+
+def quiet_broker(loader, **kwargs):
+    """A broker whose poller thread never starts, so the test drives poll() itself"""
+    broker = AlertBroker(loader, **kwargs)
+    broker._ensure_started = lambda: None
+    return broker
+
+
+def drain(subscription):
+    events = []
+    while True:
+        event = subscription.get(timeout=0)
+        if event is None:
+            return [event_id for event_id, _ in events]
+        events.append(event)
+
+
+def test_change_between_subscribe_and_first_poll_is_delivered():
+    alerts = FakeAlerts()
+    alerts.change('old')
+    broker = quiet_broker(alerts)
+
+    subscription = broker.subscribe()
+    # Lands after the caller has read its backlog but before the poller runs
+    alerts.change('new')
+    broker.poll()
+
+    assert drain(subscription) == ['new']
+
+
+def test_rewatermarks_after_going_idle():
+    alerts = FakeAlerts()
+    broker = quiet_broker(alerts)
+
+    first = broker.subscribe()
+    broker.unsubscribe(first)
+    with broker._lock:
+        broker._watermark = None  # what the poller does once nobody is listening
+    alerts.change('while idle')
+
+    second = broker.subscribe()
+    alerts.change('after resubscribe')
+    broker.poll()
+
+    assert drain(second) == ['after resubscribe']
+
+
+def test_poll_skips_duplicates_and_filters_by_location():
+    alerts = FakeAlerts()
+    broker = quiet_broker(alerts)
+    local = broker.subscribe(locations={'springfield'})
+    everywhere = broker.subscribe()
+
+    alerts.change('a')
+    alerts.change('b', location='Shelbyville')
+    broker.poll()
+    broker.poll()  # re-reads the overlap window
+
+    assert drain(local) == ['a']
+    assert drain(everywhere) == ['a', 'b']
+
+
+def test_failed_watermark_read_does_not_leave_a_subscriber():
+    def failing_loader(watermark):
+        raise ConnectionError('database down')
+
+    broker = quiet_broker(failing_loader)
+    with pytest.raises(ConnectionError):
+        broker.subscribe()
+    assert broker.stats()['subscribers'] == 0
+
+
+def test_subscribers_over_the_cap_are_refused():
+    broker = quiet_broker(FakeAlerts(), max_subscribers=1)
+    first = broker.subscribe()
+    assert broker.subscribe() is None
+    assert broker.stats()['rejected'] == 1
+
+    broker.unsubscribe(first)
+    assert broker.subscribe() is not None
+
+
+def test_stream_over_the_cap_sends_the_client_back_to_polling(monkeypatch):
+    broker = quiet_broker(FakeAlerts(), max_subscribers=1)
+    broker.subscribe()
+    monkeypatch.setattr(app, 'alert_broker', broker)
+    with app.app.app_context():
+        token = create_access_token(identity='1')
+
+    response = app.app.test_client().get('/api/alerts/stream', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '30'
+    assert '/api/alerts' in response.get_json()['message']
+    assert broker.stats()['subscribers'] == 1
+
+
+def test_stream_cap_leaves_a_worker_thread_free(monkeypatch):
+    monkeypatch.setattr(app, 'WEB_THREADS', 8)
+    monkeypatch.delenv('ALERT_STREAM_MAX_SUBSCRIBERS', raising=False)
+    assert app.alert_stream_max_subscribers() == 4
+    monkeypatch.setenv('ALERT_STREAM_MAX_SUBSCRIBERS', '6')
+    assert app.alert_stream_max_subscribers() == 6
+    monkeypatch.setenv('ALERT_STREAM_MAX_SUBSCRIBERS', '100')
+    assert app.alert_stream_max_subscribers() == 7
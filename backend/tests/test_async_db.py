@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from async_db import AsyncReadPool, AsyncReadUnavailable
+
+
+@pytest.fixture
+def pool():
+    """An AsyncReadPool on a running loop, with the batch runner swapped per test"""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    pool = AsyncReadPool({}, size=2, timeout=0.1, query_timeout=0.2)
+    pool._ensure_started = lambda: None
+    pool._loop = loop
+    yield pool
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=1)
+    loop.close()
+
+
+def test_timeout_inside_the_loop_is_unavailable(pool):
+    async def driver_timeout(queries):
+        raise asyncio.TimeoutError()
+    pool._run_batch = driver_timeout
+
+    with pytest.raises(AsyncReadUnavailable):
+        pool.fetch([('SELECT 1', ())])
+    assert pool.stats()['timeouts'] == 1
+
+
+def test_slow_batch_is_unavailable(pool):
+    async def slow(queries):
+        await asyncio.sleep(5)
+    pool._run_batch = slow
+
+    with pytest.raises(AsyncReadUnavailable):
+        pool.fetch([('SELECT SLEEP(5)', ())])
+    assert pool.stats()['timeouts'] == 1
+
+
+def test_results_come_back_in_query_order(pool):
+    async def echo(queries):
+        return [([(sql,)], 0.0) for sql, _ in queries]
+    pool._run_batch = echo
+
+    assert pool.fetch([('a', ()), ('b', ())]) == [([('a',)], 0.0), ([('b',)], 0.0)]
+    assert pool.stats()['queries'] == 2
+
+
+def test_driver_errors_are_unavailable(pool):
+    class OperationalError(Exception):
+        pass
+
+    async def server_gone(queries):
+        raise OperationalError(2013, 'Lost connection to MySQL server during query')
+    pool._run_batch = server_gone
+
+    with pytest.raises(AsyncReadUnavailable):
+        pool.fetch([('SELECT 1', ())])
+
+
+def test_requests_do_not_queue_behind_a_slow_start():
+    pool = AsyncReadPool({}, timeout=5, retry_interval=60)
+    connecting, release = threading.Event(), threading.Event()
+    def unreachable_server():
+        connecting.set()
+        release.wait(5)
+        raise AsyncReadUnavailable('Could not start the async database pool: timed out')
+    pool._start = unreachable_server
+
+    starter = threading.Thread(target=lambda: pytest.raises(AsyncReadUnavailable, pool.fetch, []))
+    starter.start()
+    assert connecting.wait(5)
+    try:
+        began = time.monotonic()
+        with pytest.raises(AsyncReadUnavailable):
+            pool.fetch([])
+        assert time.monotonic() - began < 1
+    finally:
+        release.set()
+        starter.join()
+
+    # Failed just now: the next requests fall back without trying to connect again
+    pool._start = lambda: pytest.fail('restarted within the retry interval')
+    with pytest.raises(AsyncReadUnavailable):
+        pool.fetch([])
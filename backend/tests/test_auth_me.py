@@ -0,0 +1,25 @@
+from flask_jwt_extended import create_access_token
+
+import app
+from cache import FeedCache, MemoryCacheBackend
+
+
+def test_me_answers_the_same_from_the_database_and_the_cache(monkeypatch):
+    loads = []
+
+    def load_current_user(user_id):
+        loads.append(user_id)
+        return {'user': {'id': 1, 'name': 'Ann', 'email': 'ann@example.com', 'phone': '555', 'age': 40, 'gender': 'F'}}
+
+    monkeypatch.setattr(app, 'load_current_user', load_current_user)
+    monkeypatch.setattr(app, 'profile_cache', FeedCache(MemoryCacheBackend(), ttl=30, dumps=app.dump_json))
+    client = app.app.test_client()
+    with app.app.app_context():
+        headers = {'Authorization': f"Bearer {create_access_token(identity='1')}"}
+
+    from_database = client.get('/api/auth/me', headers=headers)
+    from_cache = client.get('/api/auth/me', headers=headers)
+    assert loads == ['1']
+    assert from_database.status_code == from_cache.status_code == 200
+    assert from_cache.get_json() == from_database.get_json()
+    assert set(from_cache.get_json()['user']) == {'id', 'name', 'email', 'phone', 'age', 'gender'}
@@ -0,0 +1,84 @@
+from contextlib import contextmanager
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+import app
+
+
+class FakeConnection:
+    def __init__(self):
+        self.commits = 0
+
+    def cursor(self):
+        return self
+
+    def commit(self):
+        self.commits += 1
+
+    def close(self):
+        pass
+
+
+class Saved(list):
+    """save_predictions calls, each the list of rows it was given"""
+
+    def __init__(self, connection):
+        super().__init__()
+        self.connection = connection
+
+
+@pytest.fixture
+def saved(monkeypatch):
+    """Rows handed to save_predictions, one list per call, on a fake connection"""
+    calls = Saved(FakeConnection())
+
+    @contextmanager
+    def db_connection():
+        yield calls.connection
+
+    monkeypatch.setattr(app, 'db_connection', db_connection)
+    monkeypatch.setattr(app, 'save_predictions', lambda cursor, rows: calls.append(rows))
+    return calls
+
+
+@pytest.fixture
+def post():
+    client = app.app.test_client()
+    with app.app.app_context():
+        headers = {'Authorization': f"Bearer {create_access_token(identity='42')}"}
+    return lambda body: client.post('/api/predictions/predict/batch', json=body, headers=headers)
+
+
+def test_results_keep_input_order_and_bad_items_do_not_abort_the_batch(saved, post):
+    response = post({'items': [
+        {'symptoms': 'fever, cough and sore throat', 'age': 30},
+        {'age': 50},
+        {'symptoms': 'headache and nausea', 'location': 'Springfield'}
+    ]})
+    assert response.status_code == 200
+    body = response.get_json()
+
+    assert [result['index'] for result in body['results']] == [0, 1, 2]
+    assert body['results'][1] == {'index': 1, 'error': 'Symptoms are required'}
+    assert 'conditions' in body['results'][0]['result']
+    assert 'conditions' in body['results'][2]['result']
+    assert (body['succeeded'], body['failed']) == (2, 1)
+
+    # Both predictions saved in one insert and one commit
+    assert len(saved) == 1
+    assert [row[1] for row in saved[0]] == ['fever, cough and sore throat', 'headache and nausea']
+    assert saved.connection.commits == 1
+
+
+def test_a_bare_array_is_accepted(saved, post):
+    response = post([{'symptoms': 'fever'}])
+    assert response.status_code == 200
+    assert response.get_json()['succeeded'] == 1
+
+
+def test_empty_and_oversized_batches_are_refused(saved, post, monkeypatch):
+    assert post({'items': []}).status_code == 400
+    monkeypatch.setattr(app, 'MAX_PREDICTION_BATCH_SIZE', 2)
+    assert post([{'symptoms': 'fever'}] * 3).status_code == 400
+    assert saved == []
@@ -0,0 +1,147 @@
+import pytest
+
+import app
+from cache import FeedCache, MemoryCacheBackend, RedisCacheBackend
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """The slice of the redis client RedisCacheBackend uses, with expiry on an injectable clock"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.values = {}
+
+    def get(self, key):
+        value, expires_at = self.values.get(key, (None, None))
+        if expires_at is not None and expires_at <= self.clock():
+            del self.values[key]
+            return None
+        return value
+
+    def set(self, key, value, px=None):
+        if px is not None and px <= 0:
+            raise ValueError('invalid expire time in set')
+        self.values[key] = (value, self.clock() + px / 1000 if px else None)
+
+    def incr(self, key):
+        value = int(self.get(key) or 0) + 1
+        self.values[key] = (str(value).encode('ascii'), None)
+        return value
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr('cache.time.monotonic', clock)
+    return clock
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def backend(request, clock):
+    if request.param == 'memory':
+        return MemoryCacheBackend(max_entries=16)
+    return RedisCacheBackend(client=FakeRedis(clock))
+
+
+class Loader:
+    def __init__(self, payload):
+        self.payload = payload
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.payload
+
+
+def test_hits_are_served_without_loading(backend):
+    cache = FeedCache(backend, ttl=30)
+    loader = Loader({'alerts': [1, 2]})
+    first = cache.get_or_load('alerts', 'page', loader)
+    second = cache.get_or_load('alerts', 'page', loader)
+    assert loader.calls == 1
+    assert second == first
+    assert cache.stats()['hits'] == 1
+
+
+def test_invalidate_bumps_the_namespace_version(backend):
+    cache = FeedCache(backend, ttl=30)
+    cache.get_or_load('vlogs', 'page', Loader({'vlogs': []}))
+    cache.get_or_load('alerts', 'page', Loader({'alerts': []}))
+    version = cache.version('vlogs')
+
+    cache.invalidate('vlogs')
+    assert cache.version('vlogs') != version
+    reloaded = Loader({'vlogs': [{'id': 1}]})
+    assert app.json_codec.loads(cache.get_or_load('vlogs', 'page', reloaded).body) == {'vlogs': [{'id': 1}]}
+    assert reloaded.calls == 1
+
+    untouched = Loader({'alerts': ['new']})
+    cache.get_or_load('alerts', 'page', untouched)
+    assert untouched.calls == 0
+
+
+def test_entries_expire_after_the_ttl(backend, clock):
+    cache = FeedCache(backend, ttl=0.5)
+    loader = Loader({'alerts': []})
+    cache.get_or_load('alerts', 'page', loader)
+    clock.now += 0.4
+    cache.get_or_load('alerts', 'page', loader)
+    assert loader.calls == 1
+    clock.now += 0.2
+    cache.get_or_load('alerts', 'page', loader)
+    assert loader.calls == 2
+
+
+def test_failed_loads_are_not_cached(backend):
+    cache = FeedCache(backend, ttl=30)
+    assert cache.get_or_load('alerts', 'page', Loader(None)) is None
+    assert cache.get_or_load('alerts', 'page', Loader({'alerts': []})) is not None
+
+
+def test_etag_follows_the_content(backend):
+    cache = FeedCache(backend, ttl=30)
+    first = cache.get_or_load('alerts', 'page', Loader({'alerts': [1]}))
+    cache.invalidate('alerts')
+    same = cache.get_or_load('alerts', 'page', Loader({'alerts': [1]}))
+    cache.invalidate('alerts')
+    changed = cache.get_or_load('alerts', 'page', Loader({'alerts': [2]}))
+    assert same.etag == first.etag
+    assert changed.etag != first.etag
+
+
+def test_matching_if_none_match_is_not_modified(backend):
+    cached = FeedCache(backend, ttl=30).get_or_load('alerts', 'page', Loader({'alerts': [1]}))
+
+    with app.app.test_request_context(headers={'If-None-Match': f'"{cached.etag}"'}):
+        response = app.cached_json_response(cached)
+    assert response.status_code == 304
+
+    with app.app.test_request_context(headers={'If-None-Match': '"stale"'}):
+        response = app.cached_json_response(cached)
+    assert response.status_code == 200
+    assert response.get_etag() == (cached.etag, False)
+    assert response.get_data() == cached.body
+
+
+def test_evicting_a_namespace_counter_drops_its_entries(clock):
+    backend = MemoryCacheBackend(max_entries=16, max_counters=2)
+    cache = FeedCache(backend, ttl=30)
+    stale = Loader({'user': 'old'})
+    cache.get_or_load('user:1', 'me', stale)
+    cache.invalidate('user:1')
+    cache.get_or_load('user:1', 'me', stale)
+    cache.invalidate('user:2')
+    cache.invalidate('user:3')  # evicts user:1's counter
+
+    assert len(backend._counters) == 2
+    fresh = Loader({'user': 'new'})
+    assert app.json_codec.loads(cache.get_or_load('user:1', 'me', fresh).body) == {'user': 'new'}
+    assert fresh.calls == 1
@@ -0,0 +1,158 @@
+import threading
+
+import pytest
+from mysql.connector import Error
+
+from db_pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    """The slice of a mysql.connector connection the pool uses"""
+
+    def __init__(self):
+        self.in_transaction = False
+        self.rolled_back = False
+        self.consumed = False
+        self.closed = False
+        self.healthy = True
+        self.pings = 0
+
+    def rollback(self):
+        self.rolled_back = True
+        self.in_transaction = False
+
+    def consume_results(self):
+        self.consumed = True
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+        if not self.healthy:
+            raise Error('MySQL server has gone away')
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnector:
+    def __init__(self):
+        self.connections = []
+        self.fail = False
+
+    def __call__(self, **config):
+        if self.fail:
+            raise Error("Can't connect to MySQL server")
+        connection = FakeConnection()
+        self.connections.append(connection)
+        return connection
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def connector(monkeypatch):
+    connector = FakeConnector()
+    monkeypatch.setattr('db_pool.mysql.connector.connect', connector)
+    return connector
+
+
+def test_checkout_times_out_when_every_connection_is_in_use(connector):
+    pool = ConnectionPool({}, size=1, timeout=0.05)
+    held = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    assert pool.stats()['timeouts'] == 1
+
+    pool.release(held)
+    assert pool.acquire() is held
+
+
+def test_waiting_checkout_gets_the_released_connection(connector):
+    pool = ConnectionPool({}, size=1, timeout=5)
+    held = pool.acquire()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    waiter.start()
+    pool.release(held)
+    waiter.join(5)
+    assert acquired == [held]
+
+
+def test_failed_connect_gives_the_slot_back(connector):
+    pool = ConnectionPool({}, size=1, timeout=0.05)
+    connector.fail = True
+    with pytest.raises(Error):
+        pool.acquire()
+    assert pool.stats()['in_use'] == 0
+
+    connector.fail = False
+    assert pool.acquire() is connector.connections[0]
+
+
+def test_release_rolls_back_and_drains_before_reuse(connector):
+    pool = ConnectionPool({}, size=1)
+    connection = pool.acquire()
+    connection.in_transaction = True
+    pool.release(connection)
+
+    assert connection.rolled_back
+    assert connection.consumed
+    assert not connection.closed
+    assert pool.stats()['idle'] == 1
+
+
+def test_discarded_connection_is_closed_and_replaced(connector):
+    pool = ConnectionPool({}, size=1)
+    first = pool.acquire()
+    pool.release(first, discard=True)
+
+    assert first.closed
+    assert pool.stats()['in_use'] == 0
+    assert pool.stats()['idle'] == 0
+    assert pool.acquire() is not first
+    assert pool.stats()['discarded'] == 1
+
+
+def test_connection_failing_its_health_check_is_replaced(connector, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr('db_pool.time.monotonic', clock)
+    pool = ConnectionPool({}, size=1, health_check_interval=30)
+    first = pool.acquire()
+    pool.release(first)
+
+    clock.now += 10
+    assert pool.acquire() is first  # used recently: handed out without a ping
+    assert first.pings == 0
+    pool.release(first)
+
+    first.healthy = False
+    clock.now += 31
+    second = pool.acquire()
+    assert second is not first
+    assert first.pings == 1
+    assert first.closed
+
+
+def test_stats_count_checkouts_connections_and_discards(connector):
+    pool = ConnectionPool({}, size=2, timeout=0.01)
+    first = pool.acquire()
+    second = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    pool.release(first)
+    pool.release(second, discard=True)
+
+    stats = pool.stats()
+    assert stats['size'] == 2
+    assert stats['in_use'] == 0
+    assert stats['idle'] == 1
+    assert stats['checkouts'] == 2
+    assert stats['timeouts'] == 1
+    assert stats['created'] == 2
+    assert stats['discarded'] == 1
+    assert stats['wait_max_ms'] >= 0
@@ -0,0 +1,83 @@
+import gzip
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+import app
+from cache import make_cached_body
+from compression import ResponseCompressor
+from json_codec import JSONCodec, orjson, row_mapper
+
+ENCODERS = ['json'] + (['orjson'] if orjson else [])
+
+
+@pytest.mark.parametrize('encoder', ENCODERS)
+def test_codec_round_trips_rows(encoder):
+    codec = JSONCodec(encoder)
+    payload = {'title': 'Café ✓', 'created_at': datetime(2024, 5, 1, 9, 30), 'score': Decimal('1.5'), 'n': 3}
+    body = codec.dumps(payload)
+    assert 'Café ✓'.encode('utf-8') in body
+    assert codec.loads(body) == {'title': 'Café ✓', 'created_at': '2024-05-01T09:30:00', 'score': '1.5', 'n': 3}
+
+
+@pytest.mark.skipif(orjson is None, reason='needs orjson')
+def test_encoders_agree_on_text_and_ints():
+    payload = {'vlogs': [{'id': 1, 'title': 'Café ✓', 'likes': None, 'tags': ['a', 'b']}]}
+    assert JSONCodec('json').dumps(payload) == JSONCodec('orjson').dumps(payload)
+
+
+def test_unknown_encoder_is_rejected():
+    with pytest.raises(ValueError):
+        JSONCodec('yaml')
+
+
+def test_row_mapper_skips_columns_and_converts():
+    mapper = row_mapper('id', None, 'title', 'score', score=lambda score: round(score, 1))
+    assert mapper((7, 'ignored', 'Flu', 0.1234)) == {'id': 7, 'title': 'Flu', 'score': 0.1}
+
+
+def test_compressor_memoizes_by_etag():
+    compressor = ResponseCompressor(min_size=10)
+    body = b'{"vlogs":[' + b'{"id":1},' * 200 + b'{"id":2}]}'
+    first = compressor.compress(body, 'gzip', etag='abc')
+    second = compressor.compress(body, 'gzip', etag='abc')
+    assert first is second
+    assert gzip.decompress(first) == body
+    assert compressor.stats()['memo_hits'] == 1
+
+
+def json_response(body, etag=None):
+    response = app.app.response_class(body, status=200, mimetype='application/json')
+    if etag:
+        response.set_etag(etag)
+    return response
+
+
+def test_small_bodies_are_not_compressed():
+    with app.app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = app.compress_response(json_response(b'{"ok":true}'))
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.vary
+
+
+def test_large_bodies_use_an_accepted_encoding():
+    body = b'[' + b'{"id":1},' * 500 + b'{"id":2}]'
+    with app.app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = app.compress_response(json_response(body, etag='feed-1'))
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.get_data()) == body
+    assert response.get_etag() == ('feed-1', True)
+
+    with app.app.test_request_context(headers={'Accept-Encoding': 'identity'}):
+        response = app.compress_response(json_response(body))
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == body
+
+
+def test_revalidation_with_the_weak_etag_is_not_modified():
+    cached = make_cached_body({'vlogs': [{'id': 1}] * 300}, app.dump_json)
+    with app.app.test_request_context(headers={'Accept-Encoding': 'gzip', 'If-None-Match': f'W/"{cached.etag}"'}):
+        response = app.compress_response(app.cached_json_response(cached))
+    assert response.status_code == 304
+    assert 'Content-Encoding' not in response.headers
@@ -0,0 +1,122 @@
+import threading
+
+from like_buffer import LikeBuffer
+
+
+class FakeWriter:
+    """LikeBuffer writer that records batches, optionally failing or pausing mid-write or mid-commit"""
+
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+        self.during_write = None
+        self.during_commit = None
+
+    def __call__(self, batch, commit):
+        if self.during_write:
+            self.during_write()
+        if self.fail:
+            raise ConnectionError('database down')
+        commit(lambda: self.commit(batch))
+
+    def commit(self, batch):
+        self.batches.append({vlog_id: list(users) for vlog_id, users in batch.items()})
+        if self.during_commit:
+            self.during_commit()
+
+
+def unstarted_buffer(writer, on_applied=None):
+    """A buffer whose flusher thread never starts, so the test flushes it by hand"""
+    buffer = LikeBuffer(writer, flush_interval=60, on_applied=on_applied)
+    buffer._ensure_started = lambda: None
+    return buffer
+
+
+def test_repeat_likes_are_deduplicated():
+    buffer = unstarted_buffer(FakeWriter())
+    assert buffer.record(1, 10)
+    assert not buffer.record(1, 10)
+    assert buffer.record(2, 10)
+    assert buffer.stats()['deduplicated'] == 1
+    assert buffer.pending_deltas() == {10: 2}
+
+
+def test_in_flight_likes_stay_in_pending_deltas_until_written():
+    writer = FakeWriter()
+    buffer = unstarted_buffer(writer)
+    buffer.record(1, 10)
+    buffer.record(2, 11)
+
+    seen_during_write = []
+    def like_while_writing():
+        buffer.record(3, 10)
+        seen_during_write.append(buffer.pending_deltas())
+    writer.during_write = like_while_writing
+
+    assert buffer.flush() == 2
+    assert seen_during_write == [{10: 2, 11: 1}]
+    assert writer.batches == [{10: [1], 11: [2]}]
+    assert buffer.pending_deltas() == {10: 1}
+
+
+def test_feed_reads_do_not_wait_on_the_write():
+    writer = FakeWriter()
+    buffer = unstarted_buffer(writer)
+    buffer.record(1, 10)
+
+    writing, release = threading.Event(), threading.Event()
+    def slow_commit():
+        writing.set()
+        release.wait(5)
+    writer.during_write = slow_commit
+
+    flusher = threading.Thread(target=buffer.flush)
+    flusher.start()
+    assert writing.wait(5)
+    try:
+        assert buffer.pending_deltas() == {10: 1}
+        assert buffer.record(2, 10)
+    finally:
+        release.set()
+        flusher.join()
+
+
+def test_reads_during_the_commit_wait_and_do_not_count_the_batch_twice():
+    writer = FakeWriter()
+    events = []
+    buffer = unstarted_buffer(writer, on_applied=lambda: events.append('invalidated'))
+    buffer.record(1, 10)
+
+    readings = []
+    reader = threading.Thread(target=lambda: readings.append(buffer.pending_deltas()))
+    def read_while_committing():
+        # The database already holds the new count here, so the batch must not be added on top
+        reader.start()
+        reader.join(0.1)
+        assert reader.is_alive()
+        assert buffer.record(2, 10)  # likes never wait on the commit
+        events.append('committed')
+    writer.during_commit = read_while_committing
+
+    assert buffer.flush() == 1
+    reader.join(5)
+    assert readings == [{10: 1}]
+    assert events == ['committed', 'invalidated']
+    assert buffer.stats()['in_flight'] == 0
+
+
+def test_failed_write_keeps_the_batch_for_the_next_flush():
+    writer = FakeWriter()
+    buffer = unstarted_buffer(writer)
+    buffer.record(1, 10)
+    writer.fail = True
+
+    assert buffer.flush() == 0
+    buffer.record(2, 10)
+    assert buffer.pending_deltas() == {10: 2}
+    assert buffer.stats()['flush_errors'] == 1
+
+    writer.fail = False
+    assert buffer.flush() == 2
+    assert writer.batches == [{10: [1, 2]}]
+    assert buffer.pending_deltas() == {}
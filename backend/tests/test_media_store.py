@@ -0,0 +1,90 @@
+import hashlib
+import hmac
+import io
+import os
+
+import pytest
+
+from media_store import DigestMismatch, MediaStore, OffsetMismatch
+
+CONTENT = bytes(range(256)) * 40  # 10 KiB
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MediaStore(str(tmp_path), block_size=1000)
+
+
+def send(store, upload_id, data, chunk_size):
+    offset = 0
+    while offset < len(data):
+        chunk = data[offset:offset + chunk_size]
+        offset = store.append(upload_id, io.BytesIO(chunk), offset, len(chunk))
+    return offset
+
+
+def test_chunks_assemble_into_a_content_addressed_file(store):
+    assert send(store, 'up1', CONTENT, 3000) == len(CONTENT)
+    assert store.received('up1') == len(CONTENT)
+
+    digest, name, deduplicated = store.finish('up1', '.mp4')
+    assert digest == hashlib.sha256(CONTENT).hexdigest()
+    assert name == f'{digest[:2]}/{digest}.mp4'
+    assert not deduplicated
+    with open(store.path(name), 'rb') as stored:
+        assert stored.read() == CONTENT
+    assert not os.path.exists(store.partial_path('up1'))
+
+
+def test_out_of_order_and_repeated_chunks_are_refused(store):
+    store.append('up1', io.BytesIO(CONTENT[:4000]), 0, 4000)
+
+    with pytest.raises(OffsetMismatch) as ahead:
+        store.append('up1', io.BytesIO(CONTENT[8000:]), 8000, len(CONTENT) - 8000)
+    assert ahead.value.offset == 4000
+
+    with pytest.raises(OffsetMismatch) as repeated:
+        store.append('up1', io.BytesIO(CONTENT[:4000]), 0, 4000)
+    assert repeated.value.offset == 4000
+    assert store.received('up1') == 4000
+
+
+def test_a_dropped_connection_keeps_what_arrived(store):
+    # The client said 4000 bytes but went away after 2500
+    assert store.append('up1', io.BytesIO(CONTENT[:2500]), 0, 4000) == 2500
+    rest = CONTENT[2500:]
+    assert store.append('up1', io.BytesIO(rest), store.received('up1'), len(rest)) == len(CONTENT)
+    assert store.finish('up1', '.mp4')[0] == hashlib.sha256(CONTENT).hexdigest()
+
+
+def test_declared_digest_must_match(store):
+    send(store, 'up1', CONTENT, 4000)
+    with pytest.raises(DigestMismatch):
+        store.finish('up1', '.mp4', expected_sha256='0' * 64)
+    assert store.received('up1') == 0
+
+    send(store, 'up1', CONTENT, 4000)
+    digest, _, _ = store.finish('up1', '.mp4', expected_sha256=hashlib.sha256(CONTENT).hexdigest())
+    assert digest == hashlib.sha256(CONTENT).hexdigest()
+
+
+def test_identical_uploads_are_stored_once(store):
+    send(store, 'up1', CONTENT, 4000)
+    _, first, _ = store.finish('up1', '.mp4')
+    send(store, 'up2', CONTENT, 5000)
+    _, second, deduplicated = store.finish('up2', '.mp4')
+    assert second == first
+    assert deduplicated
+    assert not os.path.exists(store.partial_path('up2'))
+
+
+def test_claiming_a_stored_file_needs_its_bytes(store):
+    send(store, 'up1', CONTENT, 4000)
+    _, name, _ = store.finish('up1', '.mp4')
+    nonce = os.urandom(32)
+
+    proof = hmac.new(nonce, CONTENT, hashlib.sha256).hexdigest()
+    assert store.verify_proof(name, nonce, proof)
+    assert not store.verify_proof(name, nonce, hashlib.sha256(CONTENT).hexdigest())
+    assert not store.verify_proof(name, os.urandom(32), proof)
+    assert not store.verify_proof(name, nonce, None)
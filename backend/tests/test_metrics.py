@@ -0,0 +1,114 @@
+import re
+
+from flask_jwt_extended import create_access_token
+
+import app
+from metrics import InstrumentedConnection, MetricsRegistry, end_trace, phase, start_trace
+
+
+class FakeCursor:
+    def execute(self, operation, params=None):
+        pass
+
+    def fetchall(self):
+        return [(1,)]
+
+
+class FakeConnection:
+    def cursor(self):
+        return FakeCursor()
+
+    def commit(self):
+        pass
+
+
+def test_registry_renders_the_prometheus_text_format():
+    registry = MetricsRegistry()
+    registry.counter('jobs_total', 'Jobs run.')
+    registry.histogram('job_seconds', 'Job time.', buckets=(0.1, 1.0))
+    registry.add_collector(lambda: {'queue_depth': 3})
+
+    registry.inc('jobs_total', (('kind', 'say "hi"'),))
+    registry.inc('jobs_total', (('kind', 'say "hi"'),), amount=2)
+    registry.observe('job_seconds', 0.05, (('kind', 'a'),))
+    registry.observe('job_seconds', 0.5, (('kind', 'a'),))
+    registry.observe('job_seconds', 7.0, (('kind', 'a'),))
+
+    assert registry.render().splitlines() == [
+        '# HELP jobs_total Jobs run.',
+        '# TYPE jobs_total counter',
+        'jobs_total{kind="say \\"hi\\""} 3',
+        '# HELP job_seconds Job time.',
+        '# TYPE job_seconds histogram',
+        'job_seconds_bucket{kind="a",le="0.1"} 1',
+        'job_seconds_bucket{kind="a",le="1.0"} 2',
+        'job_seconds_bucket{kind="a",le="+Inf"} 3',
+        'job_seconds_sum{kind="a"} 7.55',
+        'job_seconds_count{kind="a"} 3',
+        '# TYPE queue_depth gauge',
+        'queue_depth 3'
+    ]
+
+
+def test_phases_and_queries_are_traced_per_request():
+    trace = start_trace(keep_statements=True)
+    try:
+        connection = InstrumentedConnection(FakeConnection())
+        cursor = connection.cursor()
+        cursor.execute('SELECT  1\n FROM dual')
+        cursor.fetchall()
+        cursor.execute('SELECT 2')
+        connection.commit()
+        with phase('serialize'):
+            pass
+    finally:
+        assert end_trace() is trace
+
+    assert trace.queries == 2
+    assert [statement for statement, _ in trace.statements] == ['SELECT 1 FROM dual', 'SELECT 2']
+    assert trace.phases['query'] > 0
+    assert trace.phases['serialize'] > 0
+    assert trace.phases['hash'] == 0
+
+    # Outside a request nothing is recorded
+    with phase('serialize'):
+        pass
+
+
+def sample(text, line_prefix):
+    for line in text.splitlines():
+        if line.startswith(line_prefix):
+            return float(line.rsplit(' ', 1)[1])
+    return 0.0
+
+
+def test_metrics_endpoint_reports_a_finished_request(monkeypatch):
+    monkeypatch.setitem(app.METRICS_CONFIG, 'token', None)
+    client = app.app.test_client()
+    with app.app.app_context():
+        token = create_access_token(identity='1')
+
+    labels = 'method="GET",route="/api/system/rate-limits"'
+    before = client.get('/metrics').get_data(as_text=True)
+    response = client.get('/api/system/rate-limits', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+
+    text = client.get('/metrics').get_data(as_text=True)
+    assert '# TYPE symptrack_http_requests_total counter' in text
+    assert '# TYPE symptrack_http_request_duration_seconds histogram' in text
+
+    requests = f'symptrack_http_requests_total{{{labels},status="200"}}'
+    assert sample(text, requests) == sample(before, requests) + 1
+    count = f'symptrack_http_request_duration_seconds_count{{{labels}}}'
+    assert sample(text, count) == sample(before, count) + 1
+    assert sample(text, f'symptrack_http_request_duration_seconds_bucket{{{labels},le="+Inf"}}') == sample(text, count)
+    serialize = f'symptrack_request_phase_seconds_count{{{labels},phase="serialize"}}'
+    assert sample(text, serialize) == sample(before, serialize) + 1
+    assert re.search(rf'symptrack_db_queries_per_request_bucket\{{{labels},le="0.0"\}} \d+', text)
+
+
+def test_metrics_token_is_enforced(monkeypatch):
+    monkeypatch.setitem(app.METRICS_CONFIG, 'token', 'secret')
+    client = app.app.test_client()
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
@@ -0,0 +1,99 @@
+import pytest
+
+from migrate import CREATE_INDEX, already_applied, apply_migrations
+
+
+class FakeSchema:
+    """Just enough of MySQL for apply_migrations: indexes, columns, schema_migrations and a failure switch"""
+
+    def __init__(self):
+        self.indexes = set()
+        self.columns = set()
+        self.versions = []
+        self.fail_on = None
+        self.executed = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+
+class FakeCursor:
+    def __init__(self, schema):
+        self.schema = schema
+        self.result = []
+
+    def execute(self, sql, params=()):
+        schema = self.schema
+        if 'information_schema.statistics' in sql:
+            self.result = [(params in schema.indexes,)]
+        elif 'information_schema.columns' in sql:
+            self.result = [(params in schema.columns,)]
+        elif sql.startswith('SELECT version'):
+            self.result = [(version,) for version in schema.versions]
+        elif sql.startswith('INSERT INTO schema_migrations'):
+            schema.versions.append(params[0])
+        elif CREATE_INDEX.match(sql):
+            if schema.fail_on and schema.fail_on in sql:
+                raise RuntimeError('Lock wait timeout exceeded')
+            index, table = CREATE_INDEX.match(sql).groups()
+            if (table, index) in schema.indexes:
+                raise RuntimeError(f"Duplicate key name '{index}'")
+            schema.indexes.add((table, index))
+            schema.executed.append(index)
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def migrations(tmp_path):
+    (tmp_path / '0001_indexes.sql').write_text(
+        '-- Two indexes in one migration\n'
+        'CREATE INDEX idx_a ON predictions (user_id);\n'
+        'CREATE INDEX idx_b ON vlogs (created_at);\n'
+    )
+    return tmp_path
+
+
+def test_rerun_after_a_partial_failure_finishes_the_migration(migrations):
+    schema = FakeSchema()
+    schema.fail_on = 'idx_b'
+    with pytest.raises(RuntimeError):
+        apply_migrations(schema, str(migrations))
+    assert schema.versions == []
+    assert schema.executed == ['idx_a']
+
+    schema.fail_on = None
+    assert apply_migrations(schema, str(migrations)) == [1]
+    assert schema.executed == ['idx_a', 'idx_b']
+    assert apply_migrations(schema, str(migrations)) == []
+
+
+RENAME_BOTH = (
+    'ALTER TABLE outbreak_rollup\n'
+    '    CHANGE prediction_count user_count INT NOT NULL DEFAULT 0,\n'
+    '    CHANGE COLUMN high_risk_count high_risk_user_count INT NOT NULL DEFAULT 0'
+)
+
+
+def test_a_rename_is_only_skipped_once_every_column_is_renamed():
+    schema = FakeSchema()
+    cursor = schema.cursor()
+    schema.columns = {('outbreak_rollup', 'prediction_count'), ('outbreak_rollup', 'high_risk_count')}
+    assert not already_applied(cursor, RENAME_BOTH)
+
+    schema.columns = {('outbreak_rollup', 'user_count'), ('outbreak_rollup', 'high_risk_count')}
+    with pytest.raises(ValueError):
+        already_applied(cursor, RENAME_BOTH)
+
+    schema.columns = {('outbreak_rollup', 'user_count'), ('outbreak_rollup', 'high_risk_user_count')}
+    assert already_applied(cursor, RENAME_BOTH)
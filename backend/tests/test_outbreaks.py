@@ -0,0 +1,87 @@
+import json
+from datetime import datetime
+
+from outbreaks import (
+    alert_severity, bucket_baseline, bucket_start, count_conditions, is_outbreak, region_index, settled_rows
+)
+
+REGIONS = region_index(['Springfield', 'Shelbyville'])
+
+
+def prediction(prediction_id, user_id, conditions, location, created_at, risk_level='medium'):
+    """A row as NEW_PREDICTIONS_SQL selects it"""
+    return (
+        prediction_id,
+        user_id,
+        json.dumps({'conditions': [{'name': name} for name in conditions]}),
+        json.dumps({'location': location}) if location is not None else None,
+        risk_level,
+        created_at
+    )
+
+
+def test_buckets_restart_at_midnight():
+    assert bucket_start(datetime(2024, 3, 1, 13, 47, 12), 60) == datetime(2024, 3, 1, 13, 0)
+    assert bucket_start(datetime(2024, 3, 1, 13, 47, 12), 90) == datetime(2024, 3, 1, 13, 30)
+    assert bucket_start(datetime(2024, 3, 2, 0, 5), 90) == datetime(2024, 3, 2, 0, 0)
+
+
+def test_cases_are_distinct_users_per_condition_region_and_bucket():
+    rows = [
+        prediction(1, 7, ['Common Cold/Flu'], 'springfield', datetime(2024, 3, 1, 9, 5)),
+        prediction(2, 7, ['Common Cold/Flu'], 'Springfield', datetime(2024, 3, 1, 9, 40), risk_level='high'),
+        prediction(3, 8, ['Common Cold/Flu', 'Migraine'], '  SPRINGFIELD ', datetime(2024, 3, 1, 9, 59)),
+        prediction(4, 9, ['Common Cold/Flu'], 'Springfield', datetime(2024, 3, 1, 10, 0)),
+        prediction(5, 9, ['Common Cold/Flu'], 'Atlantis', datetime(2024, 3, 1, 9, 10)),
+        prediction(6, 10, ['No specific condition identified'], 'Springfield', datetime(2024, 3, 1, 9, 10)),
+        prediction(7, 11, ['Migraine'], None, datetime(2024, 3, 1, 9, 10))
+    ]
+    nine, ten = datetime(2024, 3, 1, 9, 0), datetime(2024, 3, 1, 10, 0)
+    assert count_conditions(rows, 60, REGIONS) == {
+        ('Common Cold/Flu', 'Springfield', nine): {7: True, 8: False},
+        ('Migraine', 'Springfield', nine): {8: False},
+        ('Common Cold/Flu', 'Springfield', ten): {9: False},
+        ('Common Cold/Flu', '', nine): {9: False},
+        ('Migraine', '', nine): {11: False}
+    }
+
+
+def test_baseline_is_the_average_over_the_preceding_buckets():
+    assert bucket_baseline(168, 168) == 1.0
+    assert bucket_baseline(0, 24) == 0.0
+
+
+def test_outbreak_needs_both_the_ratio_and_the_minimum_cases():
+    assert is_outbreak(12, 2.0, threshold_ratio=3.0, min_cases=10)
+    assert not is_outbreak(12, 5.0, threshold_ratio=3.0, min_cases=10)
+    assert not is_outbreak(9, 0.0, threshold_ratio=3.0, min_cases=10)
+    assert is_outbreak(10, 0.0, threshold_ratio=3.0, min_cases=10)
+
+
+def test_severity_scales_with_the_ratio():
+    assert alert_severity(12, 4.0) == 'Medium'
+    assert alert_severity(20, 4.0) == 'High'
+    assert alert_severity(40, 4.0) == 'Critical'
+    assert alert_severity(10, 0.0) == 'Critical'
+
+
+def test_watermark_stops_before_the_first_unsettled_row():
+    cutoff = datetime(2024, 3, 1, 12, 0)
+    rows = [
+        prediction(1, 7, ['Migraine'], None, datetime(2024, 3, 1, 11, 59)),
+        prediction(2, 7, ['Migraine'], None, datetime(2024, 3, 1, 12, 0, 5)),
+        prediction(3, 7, ['Migraine'], None, datetime(2024, 3, 1, 11, 58))
+    ]
+    assert [row[0] for row in settled_rows(rows, cutoff)] == [1]
+    assert settled_rows(rows[1:], cutoff) == []
+
+
+def test_rows_without_a_creation_time_do_not_hold_back_the_watermark():
+    cutoff = datetime(2024, 3, 1, 12, 0)
+    rows = [
+        prediction(1, 7, ['Migraine'], 'Springfield', None),
+        prediction(2, 8, ['Migraine'], 'Springfield', datetime(2024, 3, 1, 11, 0))
+    ]
+    settled = settled_rows(rows, cutoff)
+    assert [row[0] for row in settled] == [1, 2]
+    assert count_conditions(settled, 60, REGIONS) == {('Migraine', 'Springfield', datetime(2024, 3, 1, 11, 0)): {8: False}}
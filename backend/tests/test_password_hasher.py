@@ -0,0 +1,29 @@
+import pytest
+
+from password_hasher import PasswordHasher
+
+
+@pytest.fixture(scope='module')
+def hasher():
+    hasher = PasswordHasher(rounds=4, workers=1, max_queue=1)
+    yield hasher
+    hasher.close()
+
+
+def test_failed_calls_are_not_counted_as_completed(hasher):
+    password_hash = hasher.hash('correct horse')
+    assert hasher.verify('correct horse', password_hash)
+    assert not hasher.verify('wrong horse', password_hash)
+    with pytest.raises(ValueError):
+        hasher.verify('correct horse', 'not a bcrypt hash')
+
+    stats = hasher.stats()
+    assert stats['completed'] == 3
+    assert stats['failed'] == 1
+    assert stats['outstanding'] == 0
+
+
+def test_needs_rehash_compares_the_cost(hasher):
+    assert not hasher.needs_rehash('$2b$04$' + 'a' * 53)
+    assert hasher.needs_rehash('$2b$12$' + 'a' * 53)
+    assert hasher.needs_rehash('plaintext')
@@ -0,0 +1,99 @@
+import threading
+import time
+
+from prediction_writer import PredictionWriter
+
+
+class ConstraintViolation(Exception):
+    pass
+
+
+class FakeCommit:
+    """PredictionWriter writer that commits whole batches unless they hold a row marked bad"""
+
+    def __init__(self, error=ConstraintViolation):
+        self.error = error
+        self.committed = []
+        self.lock = threading.Lock()
+        self.gate = threading.Event()  # holds the first write until the rest are queued, so they batch
+
+    def __call__(self, rows):
+        self.gate.wait(5)
+        if any(row['bad'] for row in rows):
+            raise self.error('cannot write row')
+        with self.lock:
+            self.committed.extend(row['id'] for row in rows)
+
+
+def rows(count, bad):
+    return [{'id': i, 'bad': i in bad} for i in range(count)]
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'writer did not catch up'
+        time.sleep(0.01)
+
+
+def test_permanent_error_splits_the_batch_and_dead_letters_the_bad_row():
+    commit = FakeCommit()
+    writer = PredictionWriter(commit, retry_interval=0.01, permanent_errors=(ConstraintViolation,))
+    for row in rows(8, bad={5}):
+        assert writer.submit(row)
+    commit.gate.set()
+    writer.close()
+
+    stats = writer.stats()
+    assert sorted(commit.committed) == [0, 1, 2, 3, 4, 6, 7]
+    assert stats['written'] == 7
+    assert stats['dead_lettered'] == 1
+    assert stats['dropped'] == 0
+    assert stats['depth'] == 0
+
+
+class Outage(FakeCommit):
+    """FakeCommit whose first `failures` writes fail as if the database were down"""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self, rows):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError('Database connection failed')
+        super().__call__(rows)
+
+
+def test_an_outage_delays_rows_but_never_drops_them():
+    commit = Outage(failures=15)
+    writer = PredictionWriter(commit, retry_interval=0.001, max_retry_interval=0.005,
+                              permanent_errors=(ConstraintViolation,))
+    for row in rows(6, bad=set()):
+        writer.submit(row)
+    commit.gate.set()
+    wait_until(lambda: writer.stats()['written'] == 6)
+    writer.close()
+
+    stats = writer.stats()
+    assert sorted(commit.committed) == list(range(6))
+    assert stats['failed_batches'] == 15
+    assert stats['dead_lettered'] == 0
+    assert stats['split_batches'] == 0
+    assert stats['dropped'] == 0
+
+
+def test_shutdown_drops_a_batch_that_keeps_failing():
+    commit = FakeCommit(error=RuntimeError)
+    writer = PredictionWriter(commit, retry_interval=0.01, shutdown_attempts=2)
+    for row in rows(4, bad={2}):
+        writer.submit(row)
+    commit.gate.set()
+    writer.close()
+
+    stats = writer.stats()
+    assert stats['written'] + stats['dropped'] == 4
+    assert stats['dropped'] >= 1
+    assert not writer.submit({'id': 9, 'bad': False})
@@ -0,0 +1,80 @@
+import pytest
+
+import app
+from rate_limit import Limit, MemoryRateLimitBackend, RateLimiter, RouteLimits
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def limiter(clock, **limits):
+    return RateLimiter(MemoryRateLimitBackend(clock=clock), limits)
+
+
+def test_burst_is_granted_then_refused(clock):
+    rate_limiter = limiter(clock, auth=RouteLimits(None, Limit(60, 3), 0))
+    for _ in range(3):
+        assert rate_limiter.check('auth', ip='10.0.0.1') is None
+    reason, wait = rate_limiter.check('auth', ip='10.0.0.1')
+    assert reason == 'ip'
+    assert wait == pytest.approx(1.0)
+
+
+def test_tokens_refill_with_time_up_to_the_burst(clock):
+    rate_limiter = limiter(clock, auth=RouteLimits(None, Limit(60, 2), 0))
+    rate_limiter.check('auth', ip='10.0.0.1')
+    rate_limiter.check('auth', ip='10.0.0.1')
+    assert rate_limiter.check('auth', ip='10.0.0.1') is not None
+
+    clock.now += 1.0
+    assert rate_limiter.check('auth', ip='10.0.0.1') is None
+    assert rate_limiter.check('auth', ip='10.0.0.1') is not None
+
+    clock.now += 3600
+    assert rate_limiter.check('auth', ip='10.0.0.1') is None
+    assert rate_limiter.check('auth', ip='10.0.0.1') is None
+    assert rate_limiter.check('auth', ip='10.0.0.1') is not None
+
+
+def test_buckets_are_kept_per_identity_and_per_ip(clock):
+    rate_limiter = limiter(clock, predict=RouteLimits(Limit(60, 1), Limit(60, 2), 0))
+    assert rate_limiter.check('predict', identity='1', ip='10.0.0.1') is None
+    assert rate_limiter.check('predict', identity='1', ip='10.0.0.2')[0] == 'identity'
+    assert rate_limiter.check('predict', identity='2', ip='10.0.0.1') is None
+    # The IP bucket is now empty; refusing on it must not charge user 3
+    assert rate_limiter.check('predict', identity='3', ip='10.0.0.1')[0] == 'ip'
+    assert rate_limiter.check('predict', identity='3', ip='10.0.0.3') is None
+    assert rate_limiter.stats()['routes']['predict']['rejected'] == {'identity': 1, 'ip': 1, 'concurrency': 0}
+
+
+def test_batch_cost_is_capped_at_the_burst(clock):
+    rate_limiter = limiter(clock, predict_batch=RouteLimits(Limit(60, 5), None, 0))
+    assert rate_limiter.check('predict_batch', identity='1', cost=50) is None
+    reason, wait = rate_limiter.check('predict_batch', identity='1', cost=2)
+    assert (reason, wait) == ('identity', pytest.approx(2.0))
+
+
+def test_refusal_answers_429_with_retry_after(clock, monkeypatch):
+    limits = {'auth': RouteLimits(None, Limit(6, 1), 0)}
+    monkeypatch.setattr(app, 'RATE_LIMITS', limits)
+    monkeypatch.setattr(app, 'rate_limiter', limiter(clock, **limits))
+    view = app.rate_limited('auth')(lambda: ('ok', 200))
+
+    with app.app.test_request_context(environ_base={'REMOTE_ADDR': '10.0.0.1'}):
+        assert view() == ('ok', 200)
+        response, status = view()
+    assert status == 429
+    assert response.headers['Retry-After'] == '10'
+
+    with app.app.test_request_context(environ_base={'REMOTE_ADDR': '10.0.0.2'}):
+        assert view() == ('ok', 200)
@@ -0,0 +1,69 @@
+import os
+import runpy
+
+import app
+import wsgi
+from like_buffer import LikeBuffer
+from prediction_writer import PredictionWriter
+
+GUNICORN_CONF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gunicorn.conf.py')
+
+
+class Closeable:
+    def __init__(self):
+        self.closes = 0
+
+    def close(self):
+        self.closes += 1
+
+
+def test_gunicorn_settings_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv('WEB_WORKERS', '3')
+    monkeypatch.setenv('WEB_THREADS', '6')
+    monkeypatch.setenv('BIND', '127.0.0.1:8000')
+    monkeypatch.setenv('GRACEFUL_TIMEOUT', '45')
+    config = runpy.run_path(GUNICORN_CONF)
+
+    assert config['workers'] == 3
+    assert config['threads'] == 6
+    assert config['bind'] == '127.0.0.1:8000'
+    assert config['graceful_timeout'] == 45
+    assert config['worker_class'] == 'gthread'
+    assert config['preload_app'] is True
+
+
+def test_schema_is_initialised_once_in_the_master(monkeypatch):
+    calls = []
+    pool = Closeable()
+    monkeypatch.setattr(wsgi, 'init_database', lambda: calls.append('init'))
+    monkeypatch.setattr(wsgi, 'db_pool', pool)
+    config = runpy.run_path(GUNICORN_CONF)
+
+    config['on_starting'](server=None)
+    assert calls == ['init']
+    assert pool.closes == 1  # no connection of the master's is inherited by the workers
+
+
+def test_worker_exit_writes_out_buffered_likes_and_queued_predictions(monkeypatch):
+    likes, predictions = [], []
+
+    def write_likes(batch, commit):
+        commit(lambda: likes.append(batch))
+
+    buffer = LikeBuffer(write_likes, flush_interval=60)
+    writer = PredictionWriter(predictions.extend)
+    monkeypatch.setattr(app, 'like_buffer', buffer)
+    monkeypatch.setattr(app, 'prediction_writer', writer)
+    for name in ('alert_broker', 'thumbnail_pool', 'password_hasher', 'async_read_pool', 'db_pool'):
+        monkeypatch.setattr(app, name, Closeable())
+
+    buffer.record(1, 10)
+    writer.submit(('row',))
+    runpy.run_path(GUNICORN_CONF)['worker_exit'](server=None, worker=None)
+
+    assert likes == [{10: [1]}]
+    assert predictions == [('row',)]
+    assert app.db_pool.closes == 1
+    assert not writer.submit(('late',))
+
+    app.shutdown()  # safe to call again, e.g. from atexit
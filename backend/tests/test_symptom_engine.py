@@ -0,0 +1,106 @@
+import itertools
+
+import pytest
+
+import app
+
+# Phrasings the original if-chain matched as substrings, plus text that matches nothing
+FRAGMENTS = [
+    'fever', 'high temperature', 'feeling hot', 'coughing', 'sore throat', 'headaches', 'body aches',
+    'tired', 'migraine', 'nausea', 'light sensitivity', 'chest pain', 'heartburn', 'shortness of breathing',
+    'stomachache', 'vomiting', 'diarrhea', 'back pain', 'I feel fine'
+]
+
+
+def reference_prediction(symptoms, age=None):
+    """The original rule-based predict_disease, kept verbatim as the reference"""
+    symptoms_lower = symptoms.lower()
+    conditions = []
+    risk_score = 20
+    
+    if any(word in symptoms_lower for word in ['fever', 'temperature', 'hot']):
+        if any(word in symptoms_lower for word in ['cough', 'throat', 'sore']):
+            conditions.append({'name': 'Common Cold/Flu', 'probability': 75, 'risk_level': 'low'})
+            risk_score = 30
+        elif any(word in symptoms_lower for word in ['headache', 'body ache', 'tired']):
+            conditions.append({'name': 'Viral Infection', 'probability': 65, 'risk_level': 'medium'})
+            risk_score = 45
+    
+    if any(word in symptoms_lower for word in ['headache', 'head pain', 'migraine']):
+        conditions.append({'name': 'Tension Headache', 'probability': 60, 'risk_level': 'low'})
+        if any(word in symptoms_lower for word in ['nausea', 'light sensitivity']):
+            conditions.append({'name': 'Migraine', 'probability': 70, 'risk_level': 'medium'})
+            risk_score = 40
+    
+    if any(word in symptoms_lower for word in ['chest pain', 'heart', 'breathing']):
+        conditions.append({'name': 'Possible Cardiac Issue', 'probability': 50, 'risk_level': 'high'})
+        risk_score = 75
+    
+    if any(word in symptoms_lower for word in ['stomach', 'nausea', 'vomiting', 'diarrhea']):
+        conditions.append({'name': 'Gastroenteritis', 'probability': 65, 'risk_level': 'medium'})
+        risk_score = 35
+    
+    if age:
+        if int(age) > 60:
+            risk_score += 10
+        elif int(age) < 18:
+            risk_score += 5
+    
+    recommendations = [
+        "Monitor symptoms and stay hydrated",
+        "Get adequate rest",
+        "Consult healthcare provider if symptoms persist or worsen",
+        "Take over-the-counter medications as appropriate"
+    ]
+    if risk_score > 60:
+        recommendations.insert(0, "Seek immediate medical attention")
+    
+    return {
+        'conditions': conditions if conditions else [{'name': 'No specific condition identified', 'probability': 0, 'risk_level': 'low'}],
+        'risk_score': min(risk_score, 100),
+        'risk_level': 'high' if risk_score > 60 else 'medium' if risk_score > 30 else 'low',
+        'recommendations': recommendations
+    }
+
+
+def symptom_combinations():
+    for size in (1, 2, 3):
+        for combination in itertools.combinations(FRAGMENTS, size):
+            yield ' and '.join(combination)
+
+
+def test_matcher_agrees_with_reference_on_combinations():
+    for symptoms in symptom_combinations():
+        for age in (None, 10, 40, 70):
+            conditions, risk_score = app.symptom_matcher.evaluate(symptoms)
+            expected = reference_prediction(symptoms, age)
+            assert app.build_prediction(conditions, risk_score, app.age_band(age)) == expected, symptoms
+
+
+@pytest.mark.parametrize('symptoms, condition', [
+    ('coughing and fever', 'Common Cold/Flu'),
+    ('I have headaches', 'Tension Headache'),
+    ('stomachache', 'Gastroenteritis'),
+    ('heartburn', 'Possible Cardiac Issue'),
+    ('HEADACHE with Light Sensitivity', 'Migraine')
+])
+def test_keywords_match_inside_words(symptoms, condition):
+    conditions, _ = app.symptom_matcher.evaluate(symptoms)
+    assert condition in [c['name'] for c in conditions]
+
+
+@pytest.mark.parametrize('symptoms', [
+    'back pain and chest tightness',
+    'pain in my head',
+    'sensitivity to light and headache'
+])
+def test_prediction_scores_symptoms_as_written(symptoms):
+    assert app.predict_disease(symptoms, age=40) == reference_prediction(symptoms, 40)
+
+
+def test_equivalent_inputs_share_a_memo_key():
+    _, first = app.canonical_prediction_input({'symptoms': 'fever and cough', 'age': 30})
+    _, second = app.canonical_prediction_input({'symptoms': 'Coughing, FEVER', 'age': 45})
+    _, other = app.canonical_prediction_input({'symptoms': 'fever and cough', 'age': 70})
+    assert first == second
+    assert first != other
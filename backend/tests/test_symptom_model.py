@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from symptom_engine import SymptomMatcher
+from symptom_model import SymptomModel, train
+
+CONDITIONS = [
+    {'name': 'Common Cold/Flu', 'risk_level': 'low', 'risk_score': 30},
+    {'name': 'Migraine', 'risk_level': 'medium', 'risk_score': 40}
+]
+
+
+def test_train_rejects_unknown_condition_labels():
+    items = [{'symptoms': 'fever and cough'}, {'symptoms': 'migraine'}]
+    with pytest.raises(ValueError, match=r"Example 1 .*'Migrane'"):
+        train(items, [['Common Cold/Flu'], ['Migrane']], CONDITIONS, 'test', epochs=1)
+
+
+def test_train_fits_known_labels():
+    items = [{'symptoms': 'fever and cough'}, {'symptoms': 'migraine'}]
+    model = train(items, [['Common Cold/Flu'], ['Migraine']], CONDITIONS, 'test', epochs=200)
+    (cold, _), (migraine, _) = model.predict(items)
+    assert [condition['name'] for condition in cold] == ['Common Cold/Flu']
+    assert [condition['name'] for condition in migraine] == ['Migraine']
+
+
+def test_saved_model_loads_back_with_the_same_predictions(tmp_path):
+    items = [{'symptoms': 'fever and cough'}, {'symptoms': 'migraine'}]
+    model = train(items, [['Common Cold/Flu'], ['Migraine']], CONDITIONS, 'v7', epochs=200)
+    model.save(str(tmp_path))
+
+    loaded = SymptomModel.load(str(tmp_path))
+    assert loaded.version == 'v7'
+    assert isinstance(loaded.weights, np.memmap)
+    assert loaded.predict(items) == model.predict(items)
+
+
+def test_risk_score_is_the_last_condition_in_table_order_like_the_rule_engine():
+    rules = [
+        {'name': 'Possible Cardiac Issue', 'probability': 50, 'risk_level': 'high', 'requires': ['cardiac'], 'risk_score': 75},
+        {'name': 'Gastroenteritis', 'probability': 65, 'risk_level': 'medium', 'requires': ['digestive'], 'risk_score': 35},
+        {'name': 'Tension Headache', 'probability': 60, 'risk_level': 'low', 'requires': ['headache'], 'risk_score': None}
+    ]
+    matcher = SymptomMatcher({'cardiac': ['chest pain'], 'digestive': ['nausea'], 'headache': ['headache']}, rules)
+    text = 'chest pain, nausea and a headache'
+    _, rule_risk_score = matcher.evaluate(text)
+
+    # Every condition predicted, the cardiac one most confidently
+    model = SymptomModel('test', {'chest': 0}, rules, np.array([[9.0, 3.0, 3.0]], dtype=np.float32), np.zeros(3, dtype=np.float32))
+    [(conditions, risk_score)] = model.predict([{'symptoms': text}])
+    assert [condition['name'] for condition in conditions][0] == 'Possible Cardiac Issue'
+    assert risk_score == rule_risk_score == 35
@@ -0,0 +1,103 @@
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+from flask_jwt_extended import create_access_token
+from mysql.connector import Error
+
+import app
+from cache import FeedCache, MemoryCacheBackend
+
+
+def test_terms_drop_operators_short_stop_and_repeated_words():
+    assert app.vlog_search_terms('The FLU and flu, a cough: +fever* in "kids"') == ['flu', 'and', 'cough', 'fever', 'kids']
+    assert app.vlog_search_terms('to be or not') == ['not']
+    assert len(app.vlog_search_terms(' '.join(f'word{i}' for i in range(20)))) == app.VLOG_SEARCH_MAX_TERMS
+
+
+def test_every_term_is_required_as_a_prefix():
+    sql, params = app.vlog_search_query(['flu', 'fever'], 11, after=(1.25, 40), disease='Influenza')
+    assert params[0] == '+flu* +fever*'
+    assert 'v.disease = %s' in sql
+    assert params[2] == 'Influenza'
+    assert params[-4:] == ('+flu* +fever*', 1.25, 40, 11)
+    assert 'ORDER BY score DESC, v.id DESC' in sql
+
+
+def test_search_cursor_round_trips():
+    assert app.decode_search_cursor(app.encode_search_cursor(0.1 + 0.2, 7)) == (0.1 + 0.2, 7)
+    with pytest.raises(ValueError):
+        app.decode_search_cursor('not a cursor')
+
+
+def vlog_row(vlog_id, score):
+    return (vlog_id, f'Vlog {vlog_id}', 'About the flu', 'Influenza', None, None, None, None, 3, 0,
+            datetime(2024, 3, 1, 9, 0), 'Ann', score)
+
+
+class FakeCursor:
+    def __init__(self, rows, error=None):
+        self.rows = rows
+        self.error = error
+        self.executed = []
+
+    def execute(self, sql, params=()):
+        if self.error:
+            raise self.error
+        self.executed.append(params)
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def search(monkeypatch):
+    """GET /api/vlogs/search over a fake database; set `search.cursor` to choose its rows"""
+    client = app.app.test_client()
+    with app.app.app_context():
+        headers = {'Authorization': f"Bearer {create_access_token(identity='1')}"}
+
+    class Connection:
+        def cursor(self):
+            return get.cursor
+
+    @contextmanager
+    def db_connection():
+        yield Connection()
+
+    def get(**args):
+        return client.get('/api/vlogs/search', query_string=args, headers=headers)
+
+    get.cursor = FakeCursor([])
+    monkeypatch.setattr(app, 'db_connection', db_connection)
+    monkeypatch.setattr(app, 'feed_cache', FeedCache(MemoryCacheBackend(), ttl=30, dumps=app.dump_json))
+    return get
+
+
+def test_results_are_paged_by_score_with_a_cursor(search):
+    search.cursor = FakeCursor([vlog_row(9, 2.5), vlog_row(4, 1.75), vlog_row(3, 1.0)])
+    body = search(q='flu', limit=2).get_json()
+
+    assert [vlog['id'] for vlog in body['vlogs']] == [9, 4]
+    assert body['vlogs'][0]['score'] == 2.5
+    assert app.decode_search_cursor(body['next_cursor']) == (1.75, 4)
+    assert search.cursor.executed[0][-1] == 3  # one extra row tells whether there is a next page
+
+
+def test_last_page_has_no_cursor(search):
+    search.cursor = FakeCursor([vlog_row(9, 2.5)])
+    assert search(q='flu', limit=2).get_json()['next_cursor'] is None
+
+
+def test_bad_requests_are_refused(search):
+    assert search(q='a to').status_code == 400
+    assert search(q='flu', limit=0).status_code == 400
+    assert search(q='flu', after='garbage').status_code == 400
+
+
+def test_search_over_its_time_budget_is_unavailable(search):
+    search.cursor = FakeCursor([], error=Error(msg='Query execution was interrupted', errno=3024))
+    assert search(q='flu').status_code == 503
@@ -0,0 +1,4 @@
+"""Production entry point: gunicorn -c gunicorn.conf.py wsgi:app"""
+from app import app, db_pool, init_database, shutdown
+
+__all__ = ['app', 'db_pool', 'init_database', 'shutdown']
@@ -14,8 +14,74 @@ function CommunityAlerts() {
   const severityLevels = ['Low', 'Medium', 'High', 'Critical'];
 
   useEffect(() => {
-    fetchAlerts();
+    let source = null;
+    let retry = null;
+    let cancelled = false;
+
+    // Streams authenticate with a short-lived ticket, so a dropped stream is reopened
+    // with a fresh one rather than by the browser's own retry of the expired URL
+    const openStream = async (lastEventId) => {
+      if (cancelled || !localStorage.getItem('token') || !window.EventSource) {
+        return;
+      }
+
+      let ticket;
+      try {
+        const response = await axios.post('/api/alerts/stream/ticket');
+        ticket = response.data.ticket;
+      } catch (error) {
+        console.error('Error opening alert stream:', error);
+        retry = setTimeout(() => openStream(lastEventId), 30000);
+        return;
+      }
+      if (cancelled) {
+        return;
+      }
+
+      const params = new URLSearchParams({ jwt: ticket });
+      if (lastEventId) {
+        params.set('last_event_id', lastEventId);
+      }
+      source = new EventSource(`${axios.defaults.baseURL}/api/alerts/stream?${params}`);
+      source.addEventListener('alert', (event) => {
+        lastEventId = event.lastEventId;
+        const alert = JSON.parse(event.data);
+        setAlerts((current) => current.some((existing) => existing.id === alert.id)
+          ? current.map((existing) => (existing.id === alert.id ? alert : existing))
+          : [alert, ...current]);
+      });
+      source.addEventListener('reset', () => {
+        source.close();
+        connect();
+      });
+      let opened = false;
+      source.onopen = () => {
+        opened = true;
+      };
+      source.onerror = () => {
+        source.close();
+        // A stream that never opened was refused, e.g. the server is at its stream cap:
+        // poll the snapshot for a while instead of retrying the stream straight away
+        retry = opened ? setTimeout(() => openStream(lastEventId), 3000) : setTimeout(connect, 30000);
+      };
+    };
+
+    // Load the snapshot, then follow new and changed alerts from where it left off
+    const connect = async () => {
+      const lastEventId = await fetchAlerts();
+      openStream(lastEventId);
+    };
+
+    connect();
     getUserLocation();
+
+    return () => {
+      cancelled = true;
+      clearTimeout(retry);
+      if (source) {
+        source.close();
+      }
+    };
   }, []);
 
   useEffect(() => {
@@ -26,6 +92,7 @@ function CommunityAlerts() {
     try {
       const response = await axios.get('/api/alerts');
       setAlerts(response.data.alerts || []);
+      return response.data.last_event_id;
     } catch (error) {
       console.error('Error fetching alerts:', error);
     } finally {
@@ -64,7 +64,19 @@ function Dashboard() {
     ],
   };
 
-  const healthTrendData = {
+  const healthTrends = dashboardData.healthTrends || [];
+  const healthTrendData = healthTrends.length ? {
+    labels: healthTrends.map(point => point.date),
+    datasets: [
+      {
+        label: 'Average Risk Score',
+        data: healthTrends.map(point => point.avg_risk_score),
+        borderColor: '#3B82F6',
+        backgroundColor: 'rgba(59, 130, 246, 0.1)',
+        tension: 0.4,
+      },
+    ],
+  } : {
     labels: ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun'],
     datasets: [
       {
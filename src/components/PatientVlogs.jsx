@@ -1,11 +1,12 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import axios from 'axios';
 import { Video, Heart, MessageCircle, Filter, Search, Plus, Play, User, Calendar, Tag } from 'lucide-react';
 
 function PatientVlogs() {
   const [vlogs, setVlogs] = useState([]);
-  const [filteredVlogs, setFilteredVlogs] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searchTerm, setSearchTerm] = useState('');
   const [selectedDisease, setSelectedDisease] = useState('');
   const [showCreateModal, setShowCreateModal] = useState(false);
@@ -14,47 +15,81 @@ function PatientVlogs() {
     'Migraine', 'Arthritis', 'Heart Disease', 'Cancer', 'COVID-19', 'Other'
   ]);
 
+  // Search and disease filtering run on the server, so they cover every vlog, not just the pages loaded
   useEffect(() => {
-    fetchVlogs();
-  }, []);
-
-  useEffect(() => {
-    filterVlogs();
-  }, [vlogs, searchTerm, selectedDisease]);
+    const delay = setTimeout(() => fetchVlogs(), searchTerm ? 300 : 0);
+    return () => clearTimeout(delay);
+  }, [searchTerm, selectedDisease]);
+
+  // Requests for filters that have since changed are dropped when they come back
+  const latestRequest = useRef(0);
+
+  // Words shorter than three letters are not indexed, so shorter queries list the feed instead
+  const feedRequest = (after) => {
+    const query = searchTerm.trim();
+    const params = {};
+    if (after) {
+      params.after = after;
+    }
+    if (selectedDisease) {
+      params.disease = selectedDisease;
+    }
+    if (/\w{3}/.test(query)) {
+      return axios.get('/api/vlogs/search', { params: { ...params, q: query } });
+    }
+    return axios.get('/api/vlogs', { params });
+  };
 
+  // The feed is paged; each page carries the cursor of the next one, or null at the end
   const fetchVlogs = async () => {
+    const requestId = ++latestRequest.current;
     try {
-      const response = await axios.get('/api/vlogs');
+      const response = await feedRequest(null);
+      if (requestId !== latestRequest.current) {
+        return;
+      }
       setVlogs(response.data.vlogs || []);
+      setNextCursor(response.data.next_cursor || null);
     } catch (error) {
+      if (requestId === latestRequest.current) {
+        setVlogs([]);
+        setNextCursor(null);
+      }
       console.error('Error fetching vlogs:', error);
     } finally {
       setLoading(false);
     }
   };
 
-  const filterVlogs = () => {
-    let filtered = vlogs;
-
-    if (searchTerm) {
-      filtered = filtered.filter(vlog => 
-        vlog.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        vlog.description.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        vlog.disease.toLowerCase().includes(searchTerm.toLowerCase())
-      );
+  const loadMoreVlogs = async () => {
+    if (!nextCursor || loadingMore) {
+      return;
     }
-
-    if (selectedDisease) {
-      filtered = filtered.filter(vlog => vlog.disease === selectedDisease);
+    const requestId = latestRequest.current;
+    setLoadingMore(true);
+    try {
+      const response = await feedRequest(nextCursor);
+      if (requestId !== latestRequest.current) {
+        return;
+      }
+      setVlogs((current) => [...current, ...(response.data.vlogs || [])]);
+      setNextCursor(response.data.next_cursor || null);
+    } catch (error) {
+      console.error('Error fetching vlogs:', error);
+    } finally {
+      setLoadingMore(false);
     }
-
-    setFilteredVlogs(filtered);
   };
 
   const handleLike = async (vlogId) => {
     try {
-      await axios.post(`/api/vlogs/${vlogId}/like`);
-      fetchVlogs();
+      const response = await axios.post(`/api/vlogs/${vlogId}/like`);
+      // Update in place rather than refetching, which would drop the pages loaded so far
+      if (response.data.message === 'Vlog liked successfully') {
+        setVlogs((current) => current.map((vlog) => (
+          vlog.id === vlogId ? { ...vlog, likes: (vlog.likes || 0) + 1 } : vlog
+        )));
+      }
     } catch (error) {
       console.error('Error liking vlog:', error);
     }
@@ -122,7 +157,7 @@ function PatientVlogs() {
 
               <div className="flex items-center justify-between">
                 <span className="text-sm text-gray-600">
-                  {filteredVlogs.length} stories found
+                  {vlogs.length}{nextCursor ? '+' : ''} stories found
                 </span>
                 <button
                   onClick={() => {
@@ -139,7 +174,7 @@ function PatientVlogs() {
 
           {/* Vlogs Grid */}
           <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-            {filteredVlogs.length > 0 ? filteredVlogs.map((vlog, index) => (
+            {vlogs.length > 0 ? vlogs.map((vlog, index) => (
               <div key={vlog.id || index} className="bg-white rounded-xl shadow-sm border border-gray-100 overflow-hidden hover:shadow-md transition-shadow">
                 {/* Video Thumbnail */}
                 <div className="relative aspect-video bg-gradient-to-br from-purple-100 to-pink-100 flex items-center justify-center">
@@ -245,8 +280,20 @@ function PatientVlogs() {
             )}
           </div>
 
+          {nextCursor && (
+            <div className="mt-8 text-center">
+              <button
+                onClick={loadMoreVlogs}
+                disabled={loadingMore}
+                className="inline-flex items-center px-4 py-2 rounded-lg border border-purple-200 text-purple-700 hover:bg-purple-50 transition-colors disabled:opacity-50"
+              >
+                {loadingMore ? 'Loading...' : 'Load more stories'}
+              </button>
+            </div>
+          )}
+
           {/* Sample vlogs when none exist */}
-          {vlogs.length === 0 && (
+          {vlogs.length === 0 && !searchTerm && !selectedDisease && (
             <>
               <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
                 {[